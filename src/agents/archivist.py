@@ -1,21 +1,122 @@
+from collections import deque
+
+from ..config import Config
+from ..core.episodic_store import EpisodicStore
+from ..core.records import Experience, RecordBatch
+from ..core.wal import DurableLog
+
+
 class Archivist:
-    def __init__(self):
-        self.episodic_memory = []
+    def __init__(self, max_episodes=None, retention_seconds=None, path=None, **log_options):
+        """
+        Args:
+            max_episodes: Episode count kept by retention; defaults to ``Config.ARCHIVIST_MAX_EPISODES``.
+            retention_seconds: Age limit for episodes; defaults to ``Config.ARCHIVIST_RETENTION_SECONDS``.
+            path: Directory for a ``DurableLog``. When given, every write is
+                logged there and the memory is recovered from it on start-up;
+                experiences, tags, keys and traces must then be JSON-serializable.
+            **log_options: Passed to ``DurableLog`` (``sync_interval``, ``compact_bytes``, ...).
+        """
+        self.episodic_memory = EpisodicStore(
+            max_episodes=max_episodes if max_episodes is not None else Config.ARCHIVIST_MAX_EPISODES,
+            max_age=retention_seconds if retention_seconds is not None else Config.ARCHIVIST_RETENTION_SECONDS,
+        )
         self.semantic_memory = {}
+        self._log = None
+        if path is not None:
+            self._log = DurableLog(path, reducer=self._compact_records, **log_options)
+            for record in self._log.replay():
+                self._apply(record)
+
+    # ---- persistence ----
+    # log records: {"e": [id, timestamp, tags, experience]}, {"s": [key, value]}, {"c": next_id}
+    def _apply(self, record):
+        if "e" in record:
+            episode_id, timestamp, tags, experience = record["e"]
+            self.episodic_memory.advance_to(episode_id)
+            self.episodic_memory.append(experience, timestamp, tags)
+        elif "s" in record:
+            key, value = record["s"]
+            self.semantic_memory[key] = value
+        else:
+            self.episodic_memory.clear()
+            self.semantic_memory.clear()
+            self.episodic_memory.advance_to(record["c"])
+
+    def _compact_records(self, records):
+        """Reduce the log to the current contents: drop cleared, expired and overwritten records."""
+        store = self.episodic_memory
+        episodes, traces, next_id = deque(maxlen=store.max_episodes), {}, 0
+        for record in records:
+            if "e" in record:
+                episodes.append(record["e"])
+                next_id = record["e"][0] + 1
+            elif "s" in record:
+                key, value = record["s"]
+                traces.pop(key, None)
+                traces[key] = value
+            else:
+                episodes.clear()
+                traces.clear()
+                next_id = record["c"]
+        if store.max_age is not None:
+            cutoff = store.clock() - store.max_age
+            while episodes and episodes[0][1] < cutoff:
+                episodes.popleft()
+        yield {"c": episodes[0][0] if episodes else next_id}
+        for episode in episodes:
+            yield {"e": episode}
+        for key, value in traces.items():
+            yield {"s": [key, value]}
 
-    def store_experience(self, experience):
-        """Store a new experience in episodic memory."""
-        self.episodic_memory.append(experience)
+    def sync(self):
+        """Block until every write so far is on disk (a no-op without ``path``)."""
+        if self._log is not None:
+            self._log.sync()
+
+    def close(self):
+        """Flush and close the log; the Archivist must not be written to afterwards."""
+        if self._log is not None:
+            self._log.close()
+
+    # ---- memory ----
+    def store_experience(self, experience, timestamp=None, tags=()):
+        """Store a new experience in episodic memory and return its index."""
+        if self._log is not None:
+            if timestamp is None:
+                timestamp = self.episodic_memory.clock()
+            tags = sorted(tags)
+            self._log.append({"e": [self.episodic_memory.next_id, timestamp, tags, experience]})
+        return self.episodic_memory.append(experience, timestamp, tags)
 
     def store_semantic_trace(self, key, value):
         """Store a semantic trace in semantic memory."""
+        if self._log is not None:
+            self._log.append({"s": [key, value]})
         self.semantic_memory[key] = value
 
     def retrieve_experience(self, index):
         """Retrieve an experience from episodic memory."""
-        if 0 <= index < len(self.episodic_memory):
-            return self.episodic_memory[index]
-        return None
+        return self.episodic_memory.get(index)
+
+    def retrieve_experiences(self, start=None, end=None, tags=(), predicate=None):
+        """Lazily yield ``(index, experience)`` in the time window ``[start, end)`` carrying all ``tags``."""
+        return self.episodic_memory.query(start, end, tags, predicate)
+
+    def retrieve_recent(self, seconds):
+        """Lazily yield ``(index, experience)`` stored in the last ``seconds``."""
+        return self.episodic_memory.recent(seconds)
+
+    def export_experiences(self, start=None, end=None, tags=(), predicate=None):
+        """
+        Collect matching experiences (as for ``retrieve_experiences``) into a
+        columnar ``RecordBatch`` of ``Experience`` records for bulk transfer.
+        """
+        store = self.episodic_memory
+        batch = RecordBatch(Experience)
+        for index, experience in store.query(start, end, tags, predicate):
+            batch.add(index, store.timestamp(index), experience, store.tags(index))
+        return batch
 
     def retrieve_semantic_trace(self, key):
         """Retrieve a semantic trace from semantic memory."""
@@ -23,5 +124,7 @@ class Archivist:
 
     def clear_memory(self):
         """Clear episodic memory and semantic memory."""
+        if self._log is not None:
+            self._log.append({"c": self.episodic_memory.next_id})
         self.episodic_memory.clear()
-        self.semantic_memory.clear()
\ No newline at end of file
+        self.semantic_memory.clear()
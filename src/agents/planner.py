@@ -1,3 +1,6 @@
+from ..core.dag_executor import DAGExecutor
+
+
 class Planner:
     def __init__(self):
         self.hierarchical_plans = []
@@ -19,6 +22,15 @@ class Planner:
         # Logic to evaluate the effectiveness of a plan
         pass
 
+    def execute_plan(self, plan, backend="thread", max_concurrency=None, cost=None):
+        """
+        Run a plan ``DAG`` whose nodes hold callables, in parallel.
+
+        Returns:
+            The ``ExecutionResult`` with each step's result and timing.
+        """
+        return DAGExecutor(backend=backend, max_concurrency=max_concurrency, cost=cost).run(plan)
+
     def get_hierarchical_plans(self):
         return self.hierarchical_plans
 
@@ -1,3 +1,6 @@
+from ..core.records import TrainingSignal
+
+
 class Reflector:
     def __init__(self):
         self.training_signals = []
@@ -9,7 +12,7 @@ class Reflector:
 
     def extract_training_signal(self, results):
         # Placeholder for logic to extract training signals from results
-        return {"signal": "example_signal", "data": results}
+        return TrainingSignal("example_signal", results)
 
     def get_training_signals(self):
         return self.training_signals
@@ -0,0 +1,99 @@
+"""
+Recall-vs-exact benchmark for the ANN indexes in ``src.models.ann``.
+
+Builds each index over a synthetic clustered dataset, then sweeps its
+recall/latency knob and reports recall@k against brute force together with
+the mean query latency.
+
+Run (from the repository root):
+    python -m src.benchmarks.ann_recall --size 100000 --dim 64
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from ..models.ann import ExactIndex, HNSWIndex, IVFIndex, recall_at_k
+
+
+def make_dataset(size, dim, n_queries, n_clusters=100, seed=0):
+    """Gaussian blobs around random centres, which is closer to real embeddings than uniform noise."""
+    rng = np.random.RandomState(seed)
+    centres = rng.randn(n_clusters, dim).astype(np.float32)
+    data = centres[rng.randint(n_clusters, size=size)] + 0.5 * rng.randn(size, dim).astype(np.float32)
+    queries = centres[rng.randint(n_clusters, size=n_queries)] + 0.5 * rng.randn(n_queries, dim).astype(np.float32)
+    return data, queries
+
+
+def _timed_search(index, queries, k):
+    start = time.perf_counter()
+    results = [index.search(q, k)[0] for q in queries]
+    return results, (time.perf_counter() - start) / len(queries)
+
+
+def run(size=20000, dim=64, n_queries=200, k=10, hnsw_size=None):
+    data, queries = make_dataset(size, dim, n_queries)
+    ids = np.arange(size)
+
+    exact = ExactIndex(dim)
+    exact.add(ids, data)
+    truth, exact_latency = _timed_search(exact, queries, k)
+    rows = [{"index": "exact", "param": None, "recall": 1.0, "latency_ms": exact_latency * 1e3}]
+
+    nlist = max(16, int(np.sqrt(size)))
+    start = time.perf_counter()
+    ivf = IVFIndex(dim, nlist=nlist)
+    ivf.add(ids, data)
+    if not ivf.is_trained:
+        ivf.train()
+    build = time.perf_counter() - start
+    for nprobe in (1, 2, 4, 8, 16, 32):
+        ivf.nprobe = nprobe
+        found, latency = _timed_search(ivf, queries, k)
+        rows.append({"index": f"ivf(nlist={nlist})", "param": f"nprobe={nprobe}", "build_s": build,
+                     "recall": recall_at_k(found, truth), "latency_ms": latency * 1e3})
+
+    # graph construction is pure Python, so it is benchmarked on a prefix by default
+    hnsw_size = min(size, hnsw_size or 20000)
+    hnsw_truth, _ = _timed_search(_prefix(data, hnsw_size), queries, k)
+    start = time.perf_counter()
+    hnsw = HNSWIndex(dim)
+    hnsw.add(ids[:hnsw_size], data[:hnsw_size])
+    build = time.perf_counter() - start
+    for ef in (16, 32, 64, 128, 256):
+        hnsw.ef_search = ef
+        found, latency = _timed_search(hnsw, queries, k)
+        rows.append({"index": f"hnsw(n={hnsw_size})", "param": f"ef_search={ef}", "build_s": build,
+                     "recall": recall_at_k(found, hnsw_truth), "latency_ms": latency * 1e3})
+    return rows
+
+
+def _prefix(data, n):
+    index = ExactIndex(data.shape[1])
+    index.add(np.arange(n), data[:n])
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall-vs-exact benchmark for ANN indexes.")
+    parser.add_argument("--size", type=int, default=20000, help="Number of indexed vectors")
+    parser.add_argument("--dim", type=int, default=64, help="Vector dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument("--hnsw-size", type=int, default=None, help="Vectors inserted into the HNSW graph")
+    parser.add_argument("--json", type=str, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    rows = run(args.size, args.dim, args.queries, args.k, args.hnsw_size)
+    print(f"{'index':<22}{'param':<16}{'recall@' + str(args.k):>10}{'latency ms':>12}")
+    for row in rows:
+        print(f"{row['index']:<22}{row['param'] or '-':<16}{row['recall']:>10.3f}{row['latency_ms']:>12.3f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Scaling micro-benchmarks for the core data structures.
+
+For each structure and each size (10^3 to 10^6 elements by default) it times
+the main operations (insert, lookup, sort, prune, similarity, snapshot) and,
+in a separate build under ``tracemalloc``, measures the memory the structure
+retains. Everything runs offline on synthetic data.
+
+Run (from the repository root):
+    python -m src.benchmarks.core_bench
+    python -m src.benchmarks.core_bench --sizes 1000,10000 --only dag,tot --json core.json
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from ..agents.archivist import Archivist
+from ..core.dag import DAG
+from ..core.memory import HierarchicalMemory
+from ..core.tot import TreeOfThoughts
+from ..models.embeddings import EmbeddingModel
+
+
+def _timed(fn, ops=1):
+    """Run ``fn`` once; return (result, seconds per op)."""
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) / max(1, ops)
+
+
+def _footprint(build):
+    """Bytes still allocated by the object ``build()`` returns, and the peak while building it."""
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return {"retained_bytes": current - base, "peak_bytes": peak - base}
+
+
+# ---- DAG ----
+def _dag_edges(n, rng):
+    # each node depends on up to two earlier nodes: a random, layered DAG with ~2n edges
+    return [(rng.randrange(i), i) for i in range(1, n) for _ in range(2)]
+
+
+def _build_dag(n, edges):
+    dag = DAG()
+    for i in range(n):
+        dag.add_node(i, None)
+    dag.add_edges(edges)
+    return dag
+
+
+def bench_dag(n, rng):
+    edges = _dag_edges(n, rng)
+    row = {}
+    dag = DAG()
+    _, row["add_node_us"] = _timed(lambda: [dag.add_node(i, None) for i in range(n)], n)
+    _, row["add_edges_bulk_us"] = _timed(lambda: dag.add_edges(edges), len(edges))
+    incremental = min(n, 100000)
+    small = DAG()
+    for i in range(incremental):
+        small.add_node(i, None)
+    sample = [e for e in edges if e[1] < incremental]
+    rng.shuffle(sample)
+    _, row["add_edge_incremental_us"] = _timed(lambda: [small.add_edge(a, b) for a, b in sample], len(sample))
+    _, row["topological_sort_ms"] = _timed(dag.topological_sort)
+    _, row["kahn_sort_ms"] = _timed(dag.kahn_sort)
+    _, row["levels_ms"] = _timed(dag.levels)
+    probes = [rng.randrange(n) for _ in range(10000)]
+    _, row["depth_lookup_us"] = _timed(lambda: [dag.depth(p) for p in probes], len(probes))
+    for key in ("add_node_us", "add_edges_bulk_us", "add_edge_incremental_us", "depth_lookup_us"):
+        row[key] *= 1e6
+    for key in ("topological_sort_ms", "kahn_sort_ms", "levels_ms"):
+        row[key] *= 1e3
+    return row, lambda: _build_dag(n, edges)
+
+
+# ---- Tree of thoughts ----
+def _build_tot(n, branching=10):
+    tree = TreeOfThoughts()
+    tree.add_thought(0, score=0.0)
+    for i in range(1, n):
+        tree.add_thought(i, (i - 1) // branching, thought=i, score=float(i % 97))
+    return tree
+
+
+def bench_tot(n, rng):
+    row = {}
+    tree, row["add_thought_us"] = _timed(lambda: _build_tot(n), n)
+    probes = [rng.randrange(n) for _ in range(10000)]
+    _, row["get_path_us"] = _timed(lambda: [tree.get_path(p) for p in probes], len(probes))
+    _, row["children_lookup_us"] = _timed(lambda: [tree.get_children(p) for p in probes], len(probes))
+    # prune one child of each of 1000 random inner nodes (whole subtrees go with them)
+    inner = [p for p in probes if tree.thought_tree.get(p)][:1000]
+    removed, row["prune_us"] = _timed(
+        lambda: sum(tree.prune_thoughts(next(iter(tree.thought_tree[p]))) for p in inner if tree.thought_tree.get(p)),
+        len(inner))
+    row["pruned_thoughts"] = removed
+    for key in ("add_thought_us", "get_path_us", "children_lookup_us", "prune_us"):
+        row[key] *= 1e6
+    return row, lambda: _build_tot(n)
+
+
+# ---- Hierarchical memory ----
+def _build_memory(n):
+    memory = HierarchicalMemory(
+        capacity={"working_memory": max(1, n // 10), "episodic_memory": n, "semantic_memory": n})
+    for i in range(n):
+        memory.working_memory[f"k{i}"] = {"step": i, "note": "observation"}
+    return memory
+
+
+def bench_memory(n, rng):
+    row = {}
+    memory, row["insert_us"] = _timed(lambda: _build_memory(n), n)
+    keys = list(memory.working_memory)
+    probes = [keys[rng.randrange(len(keys))] for _ in range(10000)]
+    _, row["lookup_us"] = _timed(lambda: [memory.working_memory.get(k) for k in probes], len(probes))
+    version = memory.version
+    _, row["snapshot_us"] = _timed(lambda: [memory.get_memory_snapshot() for _ in range(100)], 100)
+    for i in range(1000):
+        memory.working_memory[f"new{i}"] = i
+    _, row["diff_1000_changes_ms"] = _timed(lambda: memory.diff(version))
+    row["insert_us"] *= 1e6
+    row["lookup_us"] *= 1e6
+    row["snapshot_us"] *= 1e6
+    row["diff_1000_changes_ms"] *= 1e3
+    return row, lambda: _build_memory(n)
+
+
+# ---- Embeddings ----
+def _build_embeddings(n, data):
+    model = EmbeddingModel(data.shape[1])
+    for i in range(n):
+        model.add_embedding(i, data[i])
+    return model
+
+
+def bench_embeddings(n, rng, dim=64):
+    data = np.random.RandomState(0).randn(n, dim).astype(np.float32)
+    row = {}
+    model, row["add_us"] = _timed(lambda: _build_embeddings(n, data), n)
+    probes = [rng.randrange(n) for _ in range(100)]
+    _, row["most_similar_ms"] = _timed(lambda: [model.most_similar(p, k=10) for p in probes], len(probes))
+    keys = probes[:100]
+    _, row["similarity_matrix_100x100_ms"] = _timed(lambda: model.similarity_matrix(keys, keys))
+    pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(10000)]
+    _, row["similarity_us"] = _timed(lambda: [model.similarity(a, b) for a, b in pairs], len(pairs))
+    row["add_us"] *= 1e6
+    row["similarity_us"] *= 1e6
+    row["most_similar_ms"] *= 1e3
+    row["similarity_matrix_100x100_ms"] *= 1e3
+    return row, lambda: _build_embeddings(n, data)
+
+
+# ---- Archivist ----
+def _build_archivist(n):
+    archivist = Archivist()
+    for i in range(n):
+        archivist.store_experience({"step": i, "note": "experience"})
+        archivist.store_semantic_trace(f"fact{i}", i)
+    return archivist
+
+
+def bench_archivist(n, rng):
+    row = {}
+    archivist, row["store_us"] = _timed(lambda: _build_archivist(n), 2 * n)
+    probes = [rng.randrange(n) for _ in range(10000)]
+    _, row["retrieve_experience_us"] = _timed(lambda: [archivist.retrieve_experience(p) for p in probes], len(probes))
+    _, row["retrieve_trace_us"] = _timed(
+        lambda: [archivist.retrieve_semantic_trace(f"fact{p}") for p in probes], len(probes))
+    for key in row:
+        row[key] *= 1e6
+    return row, lambda: _build_archivist(n)
+
+
+BENCHMARKS = {
+    "dag": bench_dag,
+    "tot": bench_tot,
+    "memory": bench_memory,
+    "embeddings": bench_embeddings,
+    "archivist": bench_archivist,
+}
+
+
+def run(sizes, only=None, measure_memory=True, seed=0):
+    rows = []
+    for name, bench in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        for n in sizes:
+            rng = random.Random(seed)
+            row, build = bench(n, rng)
+            gc.collect()
+            if measure_memory:
+                mem = _footprint(build)
+                row.update(mem)
+                row["bytes_per_element"] = mem["retained_bytes"] / n
+            rows.append({"structure": name, "n": n, **row})
+            print(f"{name:<11}n={n:<9}" + "  ".join(
+                f"{k}={v:.3g}" for k, v in row.items() if isinstance(v, float)), flush=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling micro-benchmarks for the core data structures.")
+    parser.add_argument("--sizes", type=str, default="1000,10000,100000,1000000",
+                        help="Comma-separated element counts")
+    parser.add_argument("--only", type=str, help=f"Comma-separated subset of {','.join(BENCHMARKS)}")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc footprint pass")
+    parser.add_argument("--json", type=str, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    only = set(args.only.split(",")) if args.only else None
+    if only and not only <= set(BENCHMARKS):
+        parser.error(f"Unknown benchmarks: {sorted(only - set(BENCHMARKS))}")
+    rows = run(sizes, only, measure_memory=not args.no_memory)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,15 @@ class Config:
         'episodic_memory': 200,
         'semantic_memory': 1000
     }
+    MEMORY_EVICTION_POLICY = 'lru'  # 'lru', 'lfu' or 'recency'
+    LONG_TERM_MEMORY_BYTES = 64 * 1024 * 1024
+    MEMORY_CHANGELOG_SIZE = 10000  # changes kept for HierarchicalMemory.diff
+    EPISODIC_SEGMENT_SIZE = 4096  # episodes per EpisodicStore segment
+    ARCHIVIST_MAX_EPISODES = None  # None keeps every episode
+    ARCHIVIST_RETENTION_SECONDS = None  # None disables age-based retention
+    WAL_SYNC_INTERVAL = 0.01  # seconds between group-commit fsyncs; 0 fsyncs every write
+    WAL_COMPACT_BYTES = 16 * 1024 * 1024  # log size that triggers compaction into a segment
+    WAL_MAX_SEGMENTS = 8  # segments kept before they are merged into one
     
     # Heuristic settings
     HEURISTIC_THRESHOLD = 0.7
@@ -25,6 +34,14 @@ class Config:
     # Tree-of-Thoughts settings
     TOT_MAX_DEPTH = 5
     TOT_PRUNING_FACTOR = 0.5
+    TOT_TRANSPOSITION_CAPACITY = 100000  # states cached by TranspositionTable
+    
+    # Metrics settings
+    METRICS_WINDOW_SECONDS = 60  # sliding window for Metrics; 0 disables it
+    METRICS_SKETCH_ACCURACY = 0.01  # relative error of Metrics percentiles
+    
+    # Tracing settings
+    TRACE_SAMPLE_RATE = 1.0  # fraction of traces recorded once tracing is configured
     
     # Other parameters can be added as needed
     # ...
\ No newline at end of file
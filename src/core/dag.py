@@ -1,41 +1,202 @@
+import heapq
+from collections import deque
+
+
 class DAG:
+    """
+    Directed acyclic graph that keeps a topological order and a levelization
+    (nodes grouped by longest-path depth) up to date as it is edited.
+
+    ``add_edge`` rejects edges that would close a cycle and repairs the order
+    locally (Pearce-Kelly), touching only the nodes between the two endpoints.
+    Depths are pushed down incrementally too; an edit that would ripple through
+    a large part of the graph instead marks the levelization stale, and it is
+    rebuilt with one Kahn pass the next time it is read.
+    """
+
     def __init__(self):
         self.nodes = {}
         self.edges = {}
+        self.parents = {}
+        self._order = []  # topological order
+        self._position = {}  # node -> index in _order
+        self._depth = {}  # node -> longest path length from a root
+        self._levels = []  # depth -> insertion-ordered set (dict) of nodes; None when stale
 
     def add_node(self, node_id, node_data):
         if node_id not in self.nodes:
             self.nodes[node_id] = node_data
             self.edges[node_id] = []
+            self.parents[node_id] = []
+            self._position[node_id] = len(self._order)
+            self._order.append(node_id)
+            self._depth[node_id] = 0
+            if self._levels is not None:
+                if not self._levels:
+                    self._levels.append({})
+                self._levels[0][node_id] = None
         else:
             raise ValueError(f"Node {node_id} already exists.")
 
     def add_edge(self, from_node, to_node):
         if from_node in self.nodes and to_node in self.nodes:
+            if from_node == to_node:
+                raise ValueError(f"Edge {from_node} -> {to_node} would create a cycle.")
+            if self._position[to_node] < self._position[from_node]:
+                self._reorder(from_node, to_node)
             self.edges[from_node].append(to_node)
+            self.parents[to_node].append(from_node)
+            if self._levels is not None:
+                self._raise_depths(to_node, self._depth[from_node] + 1)
         else:
             raise ValueError("One or both nodes not found in the DAG.")
 
+    def add_edges(self, edges):
+        """
+        Add many edges at once, then rebuild the order with a single Kahn pass.
+
+        Cheaper than repeated ``add_edge`` for bulk loads. If the edges would
+        create a cycle none of them are kept and a ValueError is raised.
+        """
+        edges = list(edges)
+        for from_node, to_node in edges:
+            if from_node not in self.nodes or to_node not in self.nodes:
+                raise ValueError("One or both nodes not found in the DAG.")
+        for from_node, to_node in edges:
+            self.edges[from_node].append(to_node)
+            self.parents[to_node].append(from_node)
+        try:
+            order, depth = self.kahn_sort()
+        except ValueError:
+            for from_node, to_node in reversed(edges):
+                self.edges[from_node].pop()
+                self.parents[to_node].pop()
+            raise
+        self._order = order
+        self._position = {node: i for i, node in enumerate(order)}
+        self._set_levels(order, depth)
+
+    def _set_levels(self, order, depth):
+        self._depth = depth
+        self._levels = []
+        for node in order:
+            while len(self._levels) <= depth[node]:
+                self._levels.append({})
+            self._levels[depth[node]][node] = None
+
+    def _ensure_levels(self):
+        if self._levels is None:
+            self._set_levels(*self.kahn_sort())
+
+    def _reorder(self, from_node, to_node):
+        """Restore a valid order before adding from_node -> to_node, or raise if it closes a cycle."""
+        lower, upper = self._position[to_node], self._position[from_node]
+        forward, stack, seen = [], [to_node], {to_node}
+        while stack:
+            node = stack.pop()
+            forward.append(node)
+            for succ in self.edges[node]:
+                if succ == from_node:
+                    raise ValueError(f"Edge {from_node} -> {to_node} would create a cycle.")
+                if succ not in seen and self._position[succ] < upper:
+                    seen.add(succ)
+                    stack.append(succ)
+        backward, stack, seen = [], [from_node], {from_node}
+        while stack:
+            node = stack.pop()
+            backward.append(node)
+            for pred in self.parents[node]:
+                if pred not in seen and self._position[pred] > lower:
+                    seen.add(pred)
+                    stack.append(pred)
+        position = self._position.__getitem__
+        backward.sort(key=position)
+        forward.sort(key=position)
+        moved = backward + forward
+        for node, slot in zip(moved, sorted(map(position, moved))):
+            self._order[slot] = node
+            self._position[node] = slot
+
+    def _raise_depths(self, node, depth):
+        """
+        Push ``node`` (and its descendants) down to at least ``depth``, visiting
+        in topological order. Gives up and marks the levels stale once the
+        ripple exceeds a budget proportional to the graph size.
+        """
+        budget = max(64, len(self._order) // 64)
+        pending = {node: depth}
+        heap = [(self._position[node], node)]
+        while heap:
+            _, current = heapq.heappop(heap)
+            new_depth = pending.pop(current)
+            if new_depth <= self._depth[current]:
+                continue
+            budget -= 1
+            if budget < 0:
+                self._levels = None
+                return
+            del self._levels[self._depth[current]][current]
+            self._depth[current] = new_depth
+            while len(self._levels) <= new_depth:
+                self._levels.append({})
+            self._levels[new_depth][current] = None
+            for succ in self.edges[current]:
+                if new_depth + 1 > pending.get(succ, self._depth[succ]):
+                    if succ not in pending:
+                        heapq.heappush(heap, (self._position[succ], succ))
+                    pending[succ] = new_depth + 1
+        while self._levels and not self._levels[-1]:
+            self._levels.pop()
+
     def get_nodes(self):
         return self.nodes
 
     def get_edges(self):
         return self.edges
 
-    def topological_sort_util(self, node, visited, stack):
-        visited.add(node)
-        for neighbor in self.edges[node]:
-            if neighbor not in visited:
-                self.topological_sort_util(neighbor, visited, stack)
-        stack.append(node)
+    def kahn_sort(self):
+        """
+        Compute a topological order from scratch with Kahn's algorithm (iterative).
+
+        Returns:
+            Tuple ``(order, depth)`` where ``depth`` maps each node to its level.
+        """
+        indegree = {node: len(parents) for node, parents in self.parents.items()}
+        depth = dict.fromkeys(self.nodes, 0)
+        queue = deque(node for node, degree in indegree.items() if degree == 0)
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for succ in self.edges[node]:
+                depth[succ] = max(depth[succ], depth[node] + 1)
+                indegree[succ] -= 1
+                if indegree[succ] == 0:
+                    queue.append(succ)
+        if len(order) != len(self.nodes):
+            raise ValueError("The graph contains a cycle.")
+        return order, depth
 
     def topological_sort(self):
-        visited = set()
-        stack = []
-        for node in self.nodes:
-            if node not in visited:
-                self.topological_sort_util(node, visited, stack)
-        return stack[::-1]  # Return reversed stack for correct order
+        return list(self._order)
+
+    def levels(self):
+        """Nodes grouped by depth: level 0 holds the roots, level k nodes whose longest path from a root has k edges."""
+        self._ensure_levels()
+        return [list(level) for level in self._levels]
+
+    def wave(self, depth):
+        """Live view of the nodes at ``depth`` (O(1) once cached); every dependency lives in an earlier wave."""
+        self._ensure_levels()
+        return self._levels[depth].keys()
+
+    def depth(self, node_id):
+        self._ensure_levels()
+        return self._depth[node_id]
+
+    def num_levels(self):
+        self._ensure_levels()
+        return len(self._levels)
 
     def __repr__(self):
-        return f"DAG(nodes={self.nodes}, edges={self.edges})"
\ No newline at end of file
+        return f"DAG(nodes={self.nodes}, edges={self.edges})"
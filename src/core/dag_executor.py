@@ -0,0 +1,268 @@
+import asyncio
+import heapq
+import inspect
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+
+def _timed_call(fn, inputs):
+    """Run ``fn(inputs)`` and report how long it took where it ran."""
+    start = time.perf_counter()
+    value = fn(inputs)
+    return value, time.perf_counter() - start
+
+
+class NodeExecutionError(Exception):
+    """Raised by ``DAGExecutor.run`` when a node's callable fails."""
+
+    def __init__(self, node_id, error):
+        super().__init__(f"Node {node_id} failed: {error!r}")
+        self.node_id = node_id
+        self.error = error
+
+
+class ExecutionBackend:
+    """Runs node callables for ``DAGExecutor``."""
+
+    def submit(self, fn, inputs):
+        """Start ``fn(inputs)`` and return a handle for it."""
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def wait(self, handles):
+        """Block until at least one handle has finished; return the finished ones."""
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def result(self, handle):
+        """Return ``(value, duration)`` of a finished handle, raising the node's error."""
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def shutdown(self):
+        pass
+
+
+class FuturesBackend(ExecutionBackend):
+    """Backend over a ``concurrent.futures`` executor."""
+
+    def __init__(self, executor):
+        self._executor = executor
+
+    def submit(self, fn, inputs):
+        return self._executor.submit(_timed_call, fn, inputs)
+
+    def wait(self, handles):
+        return wait(handles, return_when=FIRST_COMPLETED).done
+
+    def result(self, handle):
+        return handle.result()
+
+    def shutdown(self):
+        self._executor.shutdown()
+
+
+class ThreadBackend(FuturesBackend):
+    """Thread pool; suits I/O-bound nodes and code that releases the GIL (NumPy, model calls)."""
+
+    def __init__(self, max_workers=None):
+        super().__init__(ThreadPoolExecutor(max_workers=max_workers))
+
+
+class ProcessBackend(FuturesBackend):
+    """Process pool for CPU-bound Python nodes; callables, inputs and results must be picklable."""
+
+    def __init__(self, max_workers=None):
+        super().__init__(ProcessPoolExecutor(max_workers=max_workers))
+
+
+class AsyncioBackend(FuturesBackend):
+    """
+    Event loop on a background thread. Coroutine functions are awaited on the
+    loop; plain callables run in the loop's default thread pool.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    async def _call(self, fn, inputs):
+        start = time.perf_counter()
+        if inspect.iscoroutinefunction(fn):
+            value = await fn(inputs)
+        else:
+            value = await self._loop.run_in_executor(None, fn, inputs)
+        return value, time.perf_counter() - start
+
+    def submit(self, fn, inputs):
+        return asyncio.run_coroutine_threadsafe(self._call(fn, inputs), self._loop)
+
+    def shutdown(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+class RayBackend(ExecutionBackend):
+    """
+    Ray tasks; ``ray.init`` must already have been called and workers must be
+    able to import this package (see ``init_ray`` in ``src/ray/main.py``).
+    """
+
+    def __init__(self, **remote_options):
+        import ray
+
+        self._ray = ray
+        self._remote = ray.remote(**remote_options)(_timed_call) if remote_options else ray.remote(_timed_call)
+
+    def submit(self, fn, inputs):
+        return self._remote.remote(fn, inputs)
+
+    def wait(self, handles):
+        handles = list(handles)
+        ready, _ = self._ray.wait(handles, num_returns=1)
+        more, _ = self._ray.wait(handles, num_returns=len(handles), timeout=0)
+        return set(ready) | set(more)
+
+    def result(self, handle):
+        return self._ray.get(handle)
+
+
+BACKENDS = {
+    "thread": ThreadBackend,
+    "process": ProcessBackend,
+    "asyncio": AsyncioBackend,
+    "ray": RayBackend,
+}
+
+
+class ExecutionResult:
+    """
+    Outcome of ``DAGExecutor.run``.
+
+    Attributes:
+        results: Node id -> value returned by its callable.
+        timings: Node id -> dict with ``submitted`` and ``finished`` (scheduler
+            clock, seconds since the run started) and ``duration`` (time spent
+            in the callable, measured where it ran).
+        wall_time: Seconds from the first submission to the last completion.
+        critical_path: Longest chain of nodes by estimated cost.
+    """
+
+    def __init__(self, results, timings, wall_time, critical_path):
+        self.results = results
+        self.timings = timings
+        self.wall_time = wall_time
+        self.critical_path = critical_path
+
+    def __repr__(self):
+        return f"ExecutionResult(nodes={len(self.results)}, wall_time={self.wall_time:.4f}s)"
+
+
+def _default_callable(node_id, node_data):
+    if callable(node_data):
+        return node_data
+    if isinstance(node_data, dict) and callable(node_data.get("fn")):
+        return node_data["fn"]
+    raise ValueError(f"Node {node_id} has no callable; pass fn_of to DAGExecutor.run.")
+
+
+class DAGExecutor:
+    """
+    Runs the callables of a ``DAG`` in parallel, starting each node as soon as
+    all of its dependencies have finished.
+
+    Each node callable is invoked as ``fn(inputs)`` where ``inputs`` maps every
+    parent id to that parent's result. Among ready nodes, those with the longest
+    remaining chain of work (by ``cost``) are started first so the critical path
+    is never left waiting behind short branches.
+    """
+
+    def __init__(self, backend="thread", max_concurrency=None, cost=None):
+        """
+        Args:
+            backend: A registered backend name (``"thread"``, ``"process"``,
+                ``"asyncio"``, ``"ray"``) or an ``ExecutionBackend`` instance.
+            max_concurrency: Maximum number of nodes in flight; defaults to the
+                CPU count.
+            cost: Optional ``cost(node_id, node_data)`` estimate used for
+                critical-path prioritisation; every node costs 1 by default.
+        """
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.backend = backend
+        self.cost = cost or (lambda node_id, node_data: 1.0)
+
+    def _make_backend(self):
+        if not isinstance(self.backend, str):
+            return self.backend, False
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{self.backend}'. Available: {sorted(BACKENDS)}")
+        if self.backend in ("thread", "process"):
+            return BACKENDS[self.backend](max_workers=self.max_concurrency), True
+        return BACKENDS[self.backend](), True
+
+    def priorities(self, dag):
+        """Remaining critical-path cost (bottom level) of every node."""
+        order = dag.topological_sort()
+        bottom = {}
+        for node in reversed(order):
+            below = max((bottom[s] for s in dag.edges[node]), default=0.0)
+            bottom[node] = self.cost(node, dag.nodes[node]) + below
+        return bottom
+
+    @staticmethod
+    def _critical_path(dag, bottom):
+        roots = [n for n in dag.nodes if not dag.parents[n]]
+        if not roots:
+            return []
+        path = [max(roots, key=bottom.__getitem__)]
+        while dag.edges[path[-1]]:
+            path.append(max(dag.edges[path[-1]], key=bottom.__getitem__))
+        return path
+
+    def run(self, dag, fn_of=None):
+        """
+        Execute every node of ``dag``.
+
+        Args:
+            dag: The ``DAG`` to run.
+            fn_of: Optional ``fn_of(node_id, node_data)`` returning the node's
+                callable; by default the node data itself (or its ``"fn"``
+                entry) is used.
+
+        Returns:
+            An ``ExecutionResult``.
+        """
+        fn_of = fn_of or _default_callable
+        bottom = self.priorities(dag)
+        position = {node: i for i, node in enumerate(dag.topological_sort())}
+        waiting = {node: len(parents) for node, parents in dag.parents.items()}
+        ready = [(-bottom[n], position[n], n) for n, count in waiting.items() if count == 0]
+        heapq.heapify(ready)
+        results, timings, running = {}, {}, {}
+        backend, owned = self._make_backend()
+        start = time.perf_counter()
+        try:
+            while ready or running:
+                while ready and len(running) < self.max_concurrency:
+                    _, _, node = heapq.heappop(ready)
+                    inputs = {parent: results[parent] for parent in dag.parents[node]}
+                    handle = backend.submit(fn_of(node, dag.nodes[node]), inputs)
+                    running[handle] = node
+                    timings[node] = {"submitted": time.perf_counter() - start}
+                for handle in backend.wait(list(running)):
+                    node = running.pop(handle)
+                    try:
+                        value, duration = backend.result(handle)
+                    except Exception as e:
+                        raise NodeExecutionError(node, e) from e
+                    results[node] = value
+                    timings[node].update(finished=time.perf_counter() - start, duration=duration)
+                    for succ in dag.edges[node]:
+                        waiting[succ] -= 1
+                        if waiting[succ] == 0:
+                            heapq.heappush(ready, (-bottom[succ], position[succ], succ))
+        finally:
+            if owned:
+                backend.shutdown()
+        return ExecutionResult(results, timings, time.perf_counter() - start, self._critical_path(dag, bottom))
@@ -0,0 +1,258 @@
+import bisect
+import heapq
+import itertools
+import time
+from array import array
+
+from ..config import Config
+
+
+class Segment:
+    """
+    A run of consecutive episodes: ids ``start`` .. ``start + len - 1``.
+
+    ``times``/``offsets`` hold the segment's timestamps in sorted order with the
+    position of each episode, so a time range is two bisects. Episodes normally
+    arrive in time order and are appended; a late one is inserted in place.
+    """
+
+    __slots__ = ("start", "experiences", "tags", "timestamps", "times", "offsets")
+
+    def __init__(self, start):
+        self.start = start
+        self.experiences = []
+        self.tags = []
+        self.timestamps = array("d")
+        self.times = array("d")  # sorted timestamps
+        self.offsets = array("l")  # offset of the episode at each sorted position
+
+    def __len__(self):
+        return len(self.experiences)
+
+    def append(self, experience, timestamp, tags):
+        offset = len(self.experiences)
+        self.experiences.append(experience)
+        self.tags.append(tags)
+        self.timestamps.append(timestamp)
+        if not self.times or timestamp >= self.times[-1]:
+            self.times.append(timestamp)
+            self.offsets.append(offset)
+        else:
+            pos = bisect.bisect_right(self.times, timestamp)
+            self.times.insert(pos, timestamp)
+            self.offsets.insert(pos, offset)
+
+    @property
+    def min_time(self):
+        return self.times[0]
+
+    @property
+    def max_time(self):
+        return self.times[-1]
+
+    def between(self, start, end):
+        """Yield ``(timestamp, episode_id)`` with ``start <= timestamp < end``, in time order."""
+        lo = 0 if start is None else bisect.bisect_left(self.times, start)
+        hi = len(self.times) if end is None else bisect.bisect_left(self.times, end)
+        for pos in range(lo, hi):
+            yield self.times[pos], self.start + self.offsets[pos]
+
+
+class EpisodicStore:
+    """
+    Append-only episode log indexed by time and by tag.
+
+    Episodes get consecutive integer ids and are kept in fixed-size segments.
+    Each segment has a sorted timestamp index, and a global index maps each tag
+    to the ascending ids carrying it. Range and filter queries are generators,
+    so scanning millions of episodes never builds a list. Retention drops whole
+    segments from the old end, which is O(1) per segment; tag postings for
+    dropped ids are trimmed lazily.
+    """
+
+    def __init__(self, segment_size=None, max_episodes=None, max_age=None, clock=time.time):
+        """
+        Args:
+            segment_size: Episodes per segment; defaults to ``Config.EPISODIC_SEGMENT_SIZE``.
+            max_episodes: Keep at least this many of the newest episodes and drop
+                older segments beyond it; None keeps everything.
+            max_age: Drop segments whose newest episode is older than this many
+                seconds; None disables age-based retention.
+            clock: Source of timestamps for episodes stored without one.
+        """
+        self.segment_size = segment_size or Config.EPISODIC_SEGMENT_SIZE
+        self.max_episodes = max_episodes
+        self.max_age = max_age
+        self.clock = clock
+        self.segments = []
+        self._tag_index = {}  # tag -> array of episode ids, ascending
+        self._next_id = 0
+        self._first_id = 0
+        self._len = 0
+
+    # ---- writes ----
+    def append(self, experience, timestamp=None, tags=()):
+        """Store an episode and return its id."""
+        if timestamp is None:
+            timestamp = self.clock()
+        tags = frozenset(tags)
+        if not self.segments or len(self.segments[-1]) >= self.segment_size:
+            self.segments.append(Segment(self._next_id))
+        episode_id = self._next_id
+        self.segments[-1].append(experience, timestamp, tags)
+        for tag in tags:
+            self._tag_index.setdefault(tag, array("q")).append(episode_id)
+        self._next_id += 1
+        self._len += 1
+        self.enforce_retention()
+        return episode_id
+
+    def enforce_retention(self, now=None):
+        """Drop the oldest whole segments that fall outside the retention limits; returns episodes dropped."""
+        dropped = 0
+        while len(self.segments) > 1:
+            oldest = self.segments[0]
+            over_count = self.max_episodes is not None and self._len - len(oldest) >= self.max_episodes
+            if self.max_age is not None:
+                now = self.clock() if now is None else now
+                expired = oldest.max_time < now - self.max_age
+            else:
+                expired = False
+            if not (over_count or expired):
+                break
+            self.segments.pop(0)
+            self._len -= len(oldest)
+            self._first_id = self.segments[0].start
+            dropped += len(oldest)
+        if dropped and self._tag_index:
+            self._trim_tags()
+        return dropped
+
+    def _trim_tags(self):
+        # postings are ascending, so the dropped ids are a prefix; trim once it is a large share
+        for tag, ids in list(self._tag_index.items()):
+            cut = bisect.bisect_left(ids, self._first_id)
+            if cut == len(ids):
+                del self._tag_index[tag]
+            elif cut and cut * 2 >= len(ids):
+                self._tag_index[tag] = ids[cut:]
+
+    def clear(self):
+        self.segments.clear()
+        self._tag_index.clear()
+        self._first_id = self._next_id
+        self._len = 0
+
+    def advance_to(self, episode_id):
+        """Make ``episode_id`` the next id handed out; only allowed while the store is empty."""
+        if episode_id < self._next_id:
+            raise ValueError(f"Episode ids are already allocated up to {self._next_id - 1}.")
+        if self._len:
+            if episode_id != self._next_id:
+                raise ValueError("Cannot skip episode ids while the store holds episodes.")
+            return
+        self._first_id = self._next_id = episode_id
+
+    # ---- point lookups ----
+    def __len__(self):
+        return self._len
+
+    def _locate(self, episode_id):
+        if not self._first_id <= episode_id < self._next_id:
+            return None, None
+        index = (episode_id - self._first_id) // self.segment_size
+        segment = self.segments[index]
+        return segment, episode_id - segment.start
+
+    def get(self, episode_id, default=None):
+        segment, offset = self._locate(episode_id)
+        return default if segment is None else segment.experiences[offset]
+
+    def timestamp(self, episode_id):
+        segment, offset = self._locate(episode_id)
+        if segment is None:
+            raise KeyError(episode_id)
+        return segment.timestamps[offset]
+
+    def tags(self, episode_id):
+        segment, offset = self._locate(episode_id)
+        if segment is None:
+            raise KeyError(episode_id)
+        return segment.tags[offset]
+
+    def __contains__(self, episode_id):
+        return self._locate(episode_id)[0] is not None
+
+    def __iter__(self):
+        """Experiences in insertion order."""
+        return itertools.chain.from_iterable(s.experiences for s in self.segments)
+
+    @property
+    def first_id(self):
+        return self._first_id
+
+    @property
+    def next_id(self):
+        return self._next_id
+
+    # ---- queries ----
+    def _ids_between(self, start, end):
+        """Yield ``(timestamp, id)`` in time order, touching only segments that overlap the range."""
+        parts = [
+            s.between(start, end) for s in self.segments
+            if (end is None or s.min_time < end) and (start is None or s.max_time >= start)
+        ]
+        return parts[0] if len(parts) == 1 else heapq.merge(*parts)
+
+    def _tagged_ids(self, tag):
+        ids = self._tag_index.get(tag, ())
+        for pos in range(bisect.bisect_left(ids, self._first_id), len(ids)):
+            yield ids[pos]
+
+    def range(self, start=None, end=None):
+        """Yield ``(episode_id, experience)`` with ``start <= timestamp < end``, oldest first."""
+        for _, episode_id in self._ids_between(start, end):
+            yield episode_id, self.get(episode_id)
+
+    def recent(self, seconds, now=None):
+        """Episodes from the last ``seconds``, oldest first."""
+        now = self.clock() if now is None else now
+        return self.range(now - seconds, None)
+
+    def with_tag(self, tag):
+        """Yield ``(episode_id, experience)`` carrying ``tag``, in id order."""
+        for episode_id in self._tagged_ids(tag):
+            yield episode_id, self.get(episode_id)
+
+    def query(self, start=None, end=None, tags=(), predicate=None):
+        """
+        Yield ``(episode_id, experience)`` matching every condition.
+
+        Args:
+            start, end: Time window ``[start, end)``; either may be None.
+            tags: Tags that must all be present. The rarest tag's postings drive
+                the scan, so a selective tag avoids touching other episodes.
+            predicate: Optional ``predicate(experience)`` filter.
+
+        Results are in time order, or in id order when ``tags`` are given.
+        """
+        tags = frozenset(tags)
+        if tags:
+            rarest = min(tags, key=lambda t: len(self._tag_index.get(t, ())))
+            for episode_id in self._tagged_ids(rarest):
+                segment, offset = self._locate(episode_id)
+                ts = segment.timestamps[offset]
+                if (start is not None and ts < start) or (end is not None and ts >= end):
+                    continue
+                if not tags <= segment.tags[offset]:
+                    continue
+                experience = segment.experiences[offset]
+                if predicate is None or predicate(experience):
+                    yield episode_id, experience
+        else:
+            for episode_id, experience in self.range(start, end):
+                if predicate is None or predicate(experience):
+                    yield episode_id, experience
+
+    def __repr__(self):
+        return f"EpisodicStore({self._len} episodes, {len(self.segments)} segments)"
@@ -1,10 +1,177 @@
+import itertools
+from collections import deque
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+from ..config import Config
+from .tiers import BoundedTier, CowDict, RingBuffer
+from .wal import DurableLog
+
+KEYED_TIERS = ("working_memory", "episodic_memory", "long_term_memory", "meta_memory")
+
+
+class MemorySnapshot(Mapping):
+    """
+    Immutable, versioned view of every memory tier.
+
+    Keyed tiers are ``FrozenMap`` views that share unchanged buckets with the
+    live memory, so taking a snapshot copies no items.
+    """
+
+    def __init__(self, version, tiers):
+        self.version = version
+        self._tiers = tiers
+
+    def __getitem__(self, tier):
+        return self._tiers[tier]
+
+    def __iter__(self):
+        return iter(self._tiers)
+
+    def __len__(self):
+        return len(self._tiers)
+
+    def __repr__(self):
+        return f"MemorySnapshot(version={self.version})"
+
+
 class HierarchicalMemory:
-    def __init__(self):
-        self.sensory_buffer = []
-        self.working_memory = {}
-        self.episodic_memory = []
-        self.long_term_memory = {}
-        self.meta_memory = {}
+    def __init__(self, capacity=None, policy=None, long_term_bytes=None, promote=True, path=None, **log_options):
+        """
+        Args:
+            capacity: Per-tier item limits, overriding ``Config.MEMORY_CAPACITY``.
+            policy: Eviction policy for working and episodic memory
+                (``"lru"``, ``"lfu"`` or ``"recency"``).
+            long_term_bytes: Size budget for long-term memory, which evicts
+                large, rarely used items first.
+            promote: Promote items evicted from working memory into episodic
+                memory, and from episodic into long-term memory.
+            path: Directory for a ``DurableLog``. When given, every change is
+                logged there and the tiers are recovered from it on start-up;
+                keys and values must then be JSON-serializable.
+            **log_options: Passed to ``DurableLog`` (``sync_interval``, ``compact_bytes``, ...).
+        """
+        capacity = {**Config.MEMORY_CAPACITY, **(capacity or {})}
+        policy = policy or Config.MEMORY_EVICTION_POLICY
+        self.sensory_buffer = RingBuffer(capacity['sensory_buffer'])
+        self.working_memory = BoundedTier(capacity['working_memory'], policy)
+        self.episodic_memory = BoundedTier(capacity['episodic_memory'], policy)
+        self.long_term_memory = BoundedTier(
+            capacity['semantic_memory'], "size",
+            max_bytes=long_term_bytes if long_term_bytes is not None else Config.LONG_TERM_MEMORY_BYTES,
+        )
+        self.meta_memory = CowDict()
+        self._next_episode_id = 0
+        if promote:
+            self.working_memory.on_evict.append(self._promote_to_episodic)
+            self.episodic_memory.on_evict.append(self._promote_to_long_term)
+        # every change bumps the version and is logged (tier, op, key) for diff()
+        self.version = 0
+        self._changes = deque(maxlen=Config.MEMORY_CHANGELOG_SIZE)
+        self.sensory_buffer.on_change.append(self._recorder("sensory_buffer"))
+        self.working_memory.on_change.append(self._recorder("working_memory"))
+        self.episodic_memory.on_change.append(self._recorder("episodic_memory"))
+        self.long_term_memory.on_change.append(self._recorder("long_term_memory"))
+        self._log = None
+        if path is not None:
+            self._log = DurableLog(path, reducer=self._compact_records, **log_options)
+            self._recover()
+
+    def _recorder(self, tier):
+        def record(op, key):
+            self.version += 1
+            self._changes.append((self.version, tier, op, key))
+            if self._log is not None:
+                value = self._peek(self._keyed_tier(tier), key) if op == "set" else None
+                self._log.append([tier, op, key, value])
+        return record
+
+    # ---- persistence ----
+    # log records: [tier, op, key, value]; the sensory buffer logs ("append", item) and ("clear", None)
+    @contextmanager
+    def _hooks_suspended(self):
+        """
+        Lift the tier limits and detach the promotion hooks while changes made
+        elsewhere are applied: their deletes already record every eviction and
+        promotion, so evicting or promoting again would diverge from the source.
+        """
+        bounded = (self.working_memory, self.episodic_memory, self.long_term_memory)
+        saved = [(tier.capacity, tier.max_bytes, tier.on_evict) for tier in bounded]
+        for tier in bounded:
+            tier.capacity, tier.max_bytes, tier.on_evict = float("inf"), None, []
+        try:
+            yield
+        finally:
+            for tier, (capacity, max_bytes, on_evict) in zip(bounded, saved):
+                tier.capacity, tier.max_bytes, tier.on_evict = capacity, max_bytes, on_evict
+
+    def _recover(self):
+        log, self._log = self._log, None
+        try:
+            with self._hooks_suspended():
+                for record in log.replay():
+                    self._apply_logged(*record)
+        finally:
+            self._log = log
+        self.version = max(self.version, log.last_lsn)
+        self._changes.clear()
+
+    def _apply_logged(self, tier, op, key, value):
+        if tier == "sensory_buffer":
+            if op == "append":
+                self.sensory_buffer.append(key)
+            else:
+                self.sensory_buffer.clear()
+            return
+        live = self._keyed_tier(tier)
+        if op == "set":
+            live[key] = value
+        elif op == "del":
+            live.pop(key, None)
+        if tier == "episodic_memory" and isinstance(key, int):
+            self._next_episode_id = max(self._next_episode_id, key + (op != "next"))
+
+    def _compact_records(self, records):
+        """Reduce the log to the final contents of each tier, in insertion order."""
+        tiers = {tier: {} for tier in KEYED_TIERS}
+        sensory = deque(maxlen=self.sensory_buffer.capacity)
+        next_episode_id = 0
+        for tier, op, key, value in records:
+            if tier == "sensory_buffer":
+                if op == "append":
+                    sensory.append(key)
+                else:
+                    sensory.clear()
+                continue
+            if tier == "episodic_memory" and isinstance(key, int):
+                next_episode_id = max(next_episode_id, key + (op != "next"))
+            if op == "set":
+                tiers[tier].pop(key, None)
+                tiers[tier][key] = value
+            elif op == "del":
+                tiers[tier].pop(key, None)
+        yield ["episodic_memory", "next", next_episode_id, None]
+        for item in sensory:
+            yield ["sensory_buffer", "append", item, None]
+        for tier, items in tiers.items():
+            for key, value in items.items():
+                yield [tier, "set", key, value]
+
+    def sync(self):
+        """Block until every change so far is on disk (a no-op without ``path``)."""
+        if self._log is not None:
+            self._log.sync()
+
+    def close(self):
+        """Flush and close the log; the memory must not be changed afterwards."""
+        if self._log is not None:
+            self._log.close()
+
+    def _promote_to_episodic(self, key, value):
+        self.add_to_episodic_memory({"working_memory_key": key, "value": value})
+
+    def _promote_to_long_term(self, episode_id, experience):
+        self.add_to_long_term_memory(f"episode:{episode_id}", experience)
 
     def add_to_sensory_buffer(self, event):
         self.sensory_buffer.append(event)
@@ -13,22 +180,118 @@ class HierarchicalMemory:
         self.sensory_buffer.clear()
 
     def set_working_memory(self, context):
-        self.working_memory = context
+        self.working_memory.clear()
+        self.working_memory.update(context)
 
     def add_to_episodic_memory(self, experience):
-        self.episodic_memory.append(experience)
+        """Store an experience and return its episode id."""
+        episode_id = self._next_episode_id
+        self._next_episode_id += 1
+        self.episodic_memory[episode_id] = experience
+        return episode_id
 
     def add_to_long_term_memory(self, key, value):
         self.long_term_memory[key] = value
 
     def update_meta_memory(self, agent_id, reliability):
         self.meta_memory[agent_id] = reliability
+        self._recorder("meta_memory")("set", agent_id)
+
+    def remove_meta_memory(self, agent_id):
+        """Forget an agent's reliability; returns False if none was stored."""
+        if agent_id not in self.meta_memory:
+            return False
+        del self.meta_memory[agent_id]
+        self._recorder("meta_memory")("del", agent_id)
+        return True
+
+    def _keyed_tier(self, tier):
+        return getattr(self, tier)
 
     def get_memory_snapshot(self):
-        return {
-            "sensory_buffer": self.sensory_buffer,
-            "working_memory": self.working_memory,
-            "episodic_memory": self.episodic_memory,
-            "long_term_memory": self.long_term_memory,
-            "meta_memory": self.meta_memory,
-        }
\ No newline at end of file
+        """Return an immutable ``MemorySnapshot`` of all tiers at the current version."""
+        return MemorySnapshot(self.version, {
+            "sensory_buffer": self.sensory_buffer.snapshot(),
+            "working_memory": self.working_memory.snapshot(),
+            "episodic_memory": self.episodic_memory.snapshot(),
+            "long_term_memory": self.long_term_memory.snapshot(),
+            "meta_memory": self.meta_memory.freeze(),
+        })
+
+    def diff(self, since_version):
+        """
+        Describe what changed after ``since_version``.
+
+        Returns:
+            Dict with ``base_version``, ``version`` and ``full``; then per keyed
+            tier ``{"set": {key: value}, "deleted": [keys]}`` holding the
+            current value of every key touched, and for the sensory buffer
+            ``{"cleared": bool, "appended": [items]}``. If ``since_version`` is
+            older than the retained change log, ``full`` is True and the tiers
+            carry their complete contents instead.
+        """
+        oldest = self._changes[0][0] if self._changes else self.version + 1
+        if since_version < oldest - 1 or since_version > self.version:
+            return self._full_delta()
+        touched = {tier: set() for tier in KEYED_TIERS}
+        cleared, appended = False, []
+        for _, tier, op, key in itertools.islice(self._changes, since_version - oldest + 1, None):
+            if tier != "sensory_buffer":
+                touched[tier].add(key)
+            elif op == "clear":
+                cleared, appended = True, []
+            else:
+                appended.append(key)
+        delta = {"base_version": since_version, "version": self.version, "full": False,
+                 "sensory_buffer": {"cleared": cleared, "appended": appended[-self.sensory_buffer.capacity:]}}
+        for tier, keys in touched.items():
+            live = self._keyed_tier(tier)
+            present = [key for key in keys if key in live]
+            delta[tier] = {
+                "set": {key: self._peek(live, key) for key in present},
+                "deleted": [key for key in keys if key not in live],
+            }
+        return delta
+
+    @staticmethod
+    def _peek(tier, key):
+        return tier.peek(key) if isinstance(tier, BoundedTier) else tier[key]
+
+    def _full_delta(self):
+        delta = {"base_version": None, "version": self.version, "full": True,
+                 "sensory_buffer": {"cleared": True, "appended": list(self.sensory_buffer)}}
+        for tier in KEYED_TIERS:
+            delta[tier] = {"set": dict(self._keyed_tier(tier).items()), "deleted": []}
+        return delta
+
+    def apply_diff(self, delta):
+        """
+        Bring this memory up to date with a ``diff`` produced by another
+        instance. The delta already carries the source's evictions and
+        promotions, so none are run here.
+        """
+        with self._hooks_suspended():
+            sensory = delta["sensory_buffer"]
+            if sensory["cleared"]:
+                self.sensory_buffer.clear()
+            for item in sensory["appended"]:
+                self.sensory_buffer.append(item)
+            for tier in KEYED_TIERS:
+                changes = delta[tier]
+                if tier == "meta_memory":
+                    # meta memory is a plain map; go through the methods that record its changes
+                    deleted = [k for k in self.meta_memory if k not in changes["set"]] if delta["full"] \
+                        else changes["deleted"]
+                    for key in deleted:
+                        self.remove_meta_memory(key)
+                    for key, value in changes["set"].items():
+                        self.update_meta_memory(key, value)
+                    continue
+                live = self._keyed_tier(tier)
+                if delta["full"]:
+                    live.clear()
+                for key in changes["deleted"]:
+                    live.pop(key, None)
+                live.update(changes["set"])
+        if delta["episodic_memory"]["set"]:
+            self._next_episode_id = max(self._next_episode_id, max(delta["episodic_memory"]["set"]) + 1)
@@ -0,0 +1,206 @@
+from array import array
+
+import numpy as np
+
+
+class Record:
+    """
+    Base for compact, fixed-field records.
+
+    Subclasses list their fields in ``__slots__``, so an instance has no
+    per-instance dict and costs a few machine words per field. Fields can be
+    read as attributes or, like the dicts these records replace, with
+    ``record["field"]``. ``typecodes`` maps numeric fields to an ``array``
+    typecode, which ``RecordBatch`` uses to store that column unboxed.
+    """
+
+    __slots__ = ()
+    typecodes = {}
+
+    def __init__(self, *args, **kwargs):
+        slots = self.__slots__
+        if len(args) > len(slots):
+            raise ValueError(f"{type(self).__name__} takes at most {len(slots)} fields.")
+        for name, value in zip(slots, args):
+            setattr(self, name, value)
+        for name in slots[len(args):]:
+            setattr(self, name, kwargs.pop(name, None))
+        if kwargs:
+            raise ValueError(f"Unexpected or repeated fields {sorted(kwargs)} for {type(self).__name__}.")
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def keys(self):
+        return self.__slots__
+
+    def __getitem__(self, name):
+        if name not in self.__slots__:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def get(self, name, default=None):
+        return getattr(self, name) if name in self.__slots__ else default
+
+    def __contains__(self, name):
+        return name in self.__slots__
+
+    def __iter__(self):
+        # like a mapping, iterating yields the field names
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __hash__(self):
+        # consistent with __eq__; raises TypeError if a field is unhashable (e.g. a dict), as a tuple would
+        return hash((type(self),) + self.__getstate__())
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class MemoryEntry(Record):
+    """A stored memory: its text, insertion time and metadata."""
+    __slots__ = ("text", "ts", "meta")
+    typecodes = {"ts": "d"}
+
+
+class Experience(Record):
+    """An archived episode with its id, timestamp and tags."""
+    __slots__ = ("episode_id", "timestamp", "experience", "tags")
+    typecodes = {"episode_id": "q", "timestamp": "d"}
+
+
+class TrainingSignal(Record):
+    """A training signal produced by the Reflector, with its payload."""
+    __slots__ = ("signal", "data")
+
+
+class RecordBatch:
+    """
+    Columnar container for many records of one type.
+
+    Each field is one column: numeric fields (per the record type's
+    ``typecodes``) in an ``array``, the rest in a list. A million records cost
+    a few lists and buffers instead of a million objects, and a batch pickles
+    as a handful of flat buffers, which makes it cheap to send between
+    processes. Indexing or iterating materializes ``Record`` instances on
+    demand.
+    """
+
+    def __init__(self, record_type, columns=None):
+        """
+        Args:
+            record_type: ``Record`` subclass describing the fields.
+            columns: Optional ``{field: values}`` to start from; every field
+                must be present and all columns the same length.
+        """
+        self.record_type = record_type
+        self.fields = record_type.__slots__
+        self._columns = {name: self._new_column(name) for name in self.fields}
+        if columns is not None:
+            if set(columns) != set(self.fields):
+                raise ValueError(f"Columns must be exactly {list(self.fields)}.")
+            for name, values in columns.items():
+                self._columns[name].extend(values.tolist() if isinstance(values, np.ndarray) else values)
+            if len({len(c) for c in self._columns.values()}) > 1:
+                raise ValueError("All columns must have the same length.")
+
+    def _new_column(self, name):
+        typecode = self.record_type.typecodes.get(name)
+        return array(typecode) if typecode else []
+
+    @classmethod
+    def from_records(cls, record_type, records):
+        """Build a batch from records or mappings with the record type's fields."""
+        batch = cls(record_type)
+        batch.extend(records)
+        return batch
+
+    def append(self, record):
+        """Add a record, or any mapping with the same fields."""
+        self._append_row([record[name] for name in self.fields])
+
+    def add(self, *values):
+        """Add one record given as field values, without building it first."""
+        if len(values) != len(self.fields):
+            raise ValueError(f"Expected {len(self.fields)} values, got {len(values)}.")
+        self._append_row(values)
+
+    def _append_row(self, values):
+        # a value a numeric column rejects (None, a str, an overflow) fails mid-row; undo the
+        # columns already appended to so the batch never becomes ragged
+        columns = [self._columns[name] for name in self.fields]
+        for done, (col, value) in enumerate(zip(columns, values)):
+            try:
+                col.append(value)
+            except (TypeError, OverflowError) as e:
+                for appended in columns[:done]:
+                    appended.pop()
+                raise ValueError(f"Invalid value {value!r} for field {self.fields[done]!r}.") from e
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self._columns[self.fields[0]])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordBatch(self.record_type, {name: col[index] for name, col in self._columns.items()})
+        return self.record_type(*(col[index] for col in self._columns.values()))
+
+    def __iter__(self):
+        make = self.record_type
+        for values in zip(*self._columns.values()):
+            yield make(*values)
+
+    def column(self, name):
+        """
+        A field's values: a NumPy copy of numeric columns (a view would stop the
+        array from growing), or the list itself for the others.
+        """
+        col = self._columns[name]
+        if isinstance(col, array):
+            return np.frombuffer(col, dtype=col.typecode).copy() if len(col) else np.zeros(0, dtype=col.typecode)
+        return col
+
+    def take(self, indices):
+        """New batch holding the records at ``indices``, in that order."""
+        batch = RecordBatch(self.record_type)
+        for name, col in self._columns.items():
+            batch._columns[name].extend(col[i] for i in indices)
+        return batch
+
+    def clear(self):
+        self._columns = {name: self._new_column(name) for name in self.fields}
+
+    def to_columns(self):
+        return {name: self.column(name) for name in self.fields}
+
+    def nbytes(self):
+        """Bytes held by the numeric buffers and list slots (not the objects the lists point to)."""
+        return sum(col.itemsize * len(col) if isinstance(col, array) else 8 * len(col)
+                   for col in self._columns.values())
+
+    def __repr__(self):
+        return f"RecordBatch({self.record_type.__name__}, {len(self)} records)"
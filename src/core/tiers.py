@@ -0,0 +1,426 @@
+import heapq
+import itertools
+import math
+import sys
+import time
+from collections import OrderedDict, deque
+from collections.abc import Mapping, MutableMapping
+
+
+def estimate_size(value, _seen=None):
+    """Approximate deep size in bytes of ``value`` (containers are followed, shared objects counted once)."""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset, deque)):
+        size += sum(estimate_size(v, _seen) for v in value)
+    return size
+
+
+class EvictionPolicy:
+    """Decides which key a bounded tier gives up next."""
+
+    name = None
+
+    def insert(self, key, size):
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def touch(self, key):
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def remove(self, key):
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def victim(self):
+        """Return the key to evict next (without removing it)."""
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+
+class LRUPolicy(EvictionPolicy):
+    """Evict the least recently used key."""
+
+    name = "lru"
+
+    def __init__(self):
+        self._order = OrderedDict()
+
+    def insert(self, key, size):
+        self._order[key] = None
+
+    def touch(self, key):
+        self._order.move_to_end(key)
+
+    def remove(self, key):
+        del self._order[key]
+
+    def victim(self):
+        return next(iter(self._order))
+
+
+class LFUPolicy(EvictionPolicy):
+    """Evict the least frequently used key, oldest first among equals (O(1) frequency buckets)."""
+
+    name = "lfu"
+
+    def __init__(self):
+        self._freq = {}
+        self._buckets = {}  # frequency -> keys in recency order
+        self._min_freq = 0
+
+    def insert(self, key, size):
+        self._freq[key] = 1
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_freq = 1
+
+    def _unlink(self, key):
+        freq = self._freq[key]
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        return freq
+
+    def touch(self, key):
+        freq = self._unlink(key) + 1
+        self._freq[key] = freq
+        self._buckets.setdefault(freq, OrderedDict())[key] = None
+
+    def remove(self, key):
+        self._unlink(key)
+        del self._freq[key]
+        if self._buckets and self._min_freq not in self._buckets:
+            self._min_freq = min(self._buckets)
+
+    def victim(self):
+        return next(iter(self._buckets[self._min_freq]))
+
+
+class _LazyHeapPolicy(EvictionPolicy):
+    """Min-heap of priorities with lazy invalidation of stale entries."""
+
+    def __init__(self):
+        self._priority = {}
+        self._heap = []
+        self._counter = itertools.count()
+
+    def _push(self, key, priority):
+        self._priority[key] = priority
+        heapq.heappush(self._heap, (priority, next(self._counter), key))
+        if len(self._heap) > 4 * len(self._priority) + 64:
+            self._heap = [(p, next(self._counter), k) for k, p in self._priority.items()]
+            heapq.heapify(self._heap)
+
+    def remove(self, key):
+        del self._priority[key]
+
+    def victim(self):
+        while True:
+            priority, _, key = self._heap[0]
+            if self._priority.get(key) == priority:
+                return key
+            heapq.heappop(self._heap)
+
+
+class RecencyWeightedPolicy(_LazyHeapPolicy):
+    """
+    Evict the key with the lowest exponentially decayed access count.
+
+    Every access adds 1 and the count halves every ``half_life`` seconds. The
+    count is kept as a log-priority referenced to time zero, so the relative
+    order of keys never changes as time passes and a heap stays valid.
+    """
+
+    name = "recency"
+
+    def __init__(self, half_life=300.0, clock=time.monotonic):
+        super().__init__()
+        self._rate = math.log(2) / half_life
+        self._clock = clock
+
+    def _now(self):
+        return self._rate * self._clock()
+
+    def insert(self, key, size):
+        self._push(key, self._now())
+
+    def touch(self, key):
+        now = self._now()
+        self._push(key, math.log1p(math.exp(self._priority[key] - now)) + now)
+
+
+class SizeAwarePolicy(_LazyHeapPolicy):
+    """
+    GreedyDual-Size: large, rarely used items are evicted before small ones.
+
+    Each key's priority is ``L + 1 / size``, refreshed on access, where ``L``
+    rises to the priority of the last victim so untouched items age out.
+    """
+
+    name = "size"
+
+    def __init__(self):
+        super().__init__()
+        self._sizes = {}
+        self._inflation = 0.0
+
+    def insert(self, key, size):
+        self._sizes[key] = max(1, size)
+        self._push(key, self._inflation + 1.0 / self._sizes[key])
+
+    def touch(self, key):
+        self._push(key, self._inflation + 1.0 / self._sizes[key])
+
+    def remove(self, key):
+        super().remove(key)
+        del self._sizes[key]
+
+    def victim(self):
+        key = super().victim()
+        self._inflation = self._priority[key]
+        return key
+
+
+EVICTION_POLICIES = {
+    policy.name: policy for policy in (LRUPolicy, LFUPolicy, RecencyWeightedPolicy, SizeAwarePolicy)
+}
+
+
+class CowDict(MutableMapping):
+    """
+    Dict split into hash buckets that frozen snapshots share with it.
+
+    ``freeze`` is O(buckets); afterwards the first write to a bucket copies only
+    that bucket, so keeping snapshots costs in proportion to what changes
+    rather than to the size of the map.
+    """
+
+    def __init__(self, items=(), buckets=16):
+        self._buckets = [{} for _ in range(buckets)]
+        self._owned = [True] * buckets
+        self._len = 0
+        self.update(items)
+
+    def _writable(self, index):
+        if not self._owned[index]:
+            self._buckets[index] = dict(self._buckets[index])
+            self._owned[index] = True
+        return self._buckets[index]
+
+    def _rehash(self, buckets):
+        rehashed = [{} for _ in range(buckets)]
+        for bucket in self._buckets:
+            for key, value in bucket.items():
+                rehashed[hash(key) % buckets][key] = value
+        self._buckets = rehashed
+        self._owned = [True] * buckets
+
+    def __getitem__(self, key):
+        return self._buckets[hash(key) % len(self._buckets)][key]
+
+    def __setitem__(self, key, value):
+        bucket = self._writable(hash(key) % len(self._buckets))
+        if key not in bucket:
+            self._len += 1
+        bucket[key] = value
+        if self._len > 8 * len(self._buckets):
+            self._rehash(2 * len(self._buckets))
+
+    def __delitem__(self, key):
+        index = hash(key) % len(self._buckets)
+        if key not in self._buckets[index]:
+            raise KeyError(key)
+        del self._writable(index)[key]
+        self._len -= 1
+
+    def __contains__(self, key):
+        return key in self._buckets[hash(key) % len(self._buckets)]
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._buckets)
+
+    def __len__(self):
+        return self._len
+
+    def freeze(self):
+        """Return an immutable view of the current contents sharing this dict's buckets."""
+        self._owned = [False] * len(self._buckets)
+        return FrozenMap(tuple(self._buckets), self._len)
+
+
+class FrozenMap(Mapping):
+    """Read-only mapping produced by ``CowDict.freeze``; it never changes afterwards."""
+
+    __slots__ = ("_buckets", "_len")
+
+    def __init__(self, buckets, length):
+        self._buckets = buckets
+        self._len = length
+
+    def __getitem__(self, key):
+        return self._buckets[hash(key) % len(self._buckets)][key]
+
+    def __contains__(self, key):
+        return key in self._buckets[hash(key) % len(self._buckets)]
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._buckets)
+
+    def __len__(self):
+        return self._len
+
+    def __repr__(self):
+        return f"FrozenMap({dict(self.items())!r})"
+
+
+class BoundedTier(MutableMapping):
+    """
+    Key/value memory tier holding at most ``capacity`` items (and, optionally,
+    ``max_bytes`` of estimated size).
+
+    Reading an item with ``tier[key]`` or ``get`` counts as an access for the
+    eviction policy; ``peek``, ``items`` and ``values`` do not. When an insert
+    overflows the tier, the policy's victims are removed and passed to every
+    ``on_evict(key, value)`` hook, which is how items are promoted to the next
+    tier. Every insert or removal is also reported to the ``on_change(op, key)``
+    hooks. Contents are held in a ``CowDict`` so ``snapshot`` is cheap.
+    """
+
+    def __init__(self, capacity, policy="lru", max_bytes=None, sizeof=estimate_size):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.policy = EVICTION_POLICIES[policy]() if isinstance(policy, str) else policy
+        self.on_evict = []
+        self.on_change = []
+        self._sizeof = sizeof
+        self._data = CowDict()
+        self._sizes = {}
+        self.total_bytes = 0
+        self.evictions = 0
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        self.policy.touch(key)
+        return value
+
+    def peek(self, key, default=None):
+        return self._data.get(key, default)
+
+    def __setitem__(self, key, value):
+        if key in self._data:
+            self._discard(key)
+        size = self._sizeof(value) if self.max_bytes is not None or isinstance(self.policy, SizeAwarePolicy) else 0
+        self._data[key] = value
+        self._sizes[key] = size
+        self.total_bytes += size
+        self.policy.insert(key, size)
+        self._changed("set", key)
+        self._enforce()
+
+    def __delitem__(self, key):
+        if key not in self._data:
+            raise KeyError(key)
+        self._discard(key)
+
+    def _discard(self, key):
+        self.policy.remove(key)
+        self.total_bytes -= self._sizes.pop(key)
+        value = self._data.pop(key)
+        self._changed("del", key)
+        return value
+
+    def _changed(self, op, key):
+        for hook in self.on_change:
+            hook(op, key)
+
+    def _over(self):
+        return len(self._data) > self.capacity or (
+            self.max_bytes is not None and self.total_bytes > self.max_bytes and len(self._data) > 1
+        )
+
+    def _enforce(self):
+        while self._over():
+            key = self.policy.victim()
+            value = self._discard(key)
+            self.evictions += 1
+            for hook in self.on_evict:
+                hook(key, value)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def items(self):
+        return self._data.items()
+
+    def values(self):
+        return self._data.values()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def clear(self):
+        """Drop every item without running the eviction hooks."""
+        for key in list(self._data):
+            self._discard(key)
+
+    def snapshot(self):
+        """Immutable view of the current contents (structurally shared, O(buckets))."""
+        return self._data.freeze()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)}/{self.capacity}, policy={self.policy.name!r})"
+
+
+class RingBuffer:
+    """
+    Fixed-capacity FIFO buffer; on overflow the oldest item is passed to the
+    ``on_evict`` hooks. Appends and clears are reported to the
+    ``on_change(op, item)`` hooks as ``("append", item)`` and ``("clear", None)``.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.on_evict = []
+        self.on_change = []
+        self._items = deque()
+        self.evictions = 0
+
+    def append(self, item):
+        if len(self._items) >= self.capacity:
+            oldest = self._items.popleft()
+            self.evictions += 1
+            for hook in self.on_evict:
+                hook(None, oldest)
+        self._items.append(item)
+        for hook in self.on_change:
+            hook("append", item)
+
+    def clear(self):
+        self._items.clear()
+        for hook in self.on_change:
+            hook("clear", None)
+
+    def snapshot(self):
+        """Immutable copy of the buffer; O(capacity), which the ring keeps small."""
+        return tuple(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __repr__(self):
+        return f"RingBuffer({list(self._items)!r}, capacity={self.capacity})"
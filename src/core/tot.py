@@ -1,30 +1,311 @@
+import hashlib
+import itertools
+from collections import OrderedDict
+
+from ..config import Config
+
+
+class TranspositionTable:
+    """
+    Bounded LRU cache of expansion and evaluation results keyed by state content.
+
+    States that compare equal under ``key_fn`` (by default a BLAKE2b digest of
+    their ``repr``) share one entry holding their score and child states, so
+    a state reached along several paths is expanded and scored only once. A
+    table can be shared between trees and searches.
+    """
+
+    def __init__(self, capacity=None, key_fn=None):
+        self.capacity = Config.TOT_TRANSPOSITION_CAPACITY if capacity is None else capacity
+        self.key_fn = key_fn
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, state):
+        if self.key_fn is not None:
+            return self.key_fn(state)
+        return hashlib.blake2b(repr(state).encode(), digest_size=16).digest()
+
+    def lookup(self, key, field):
+        """Return the cached ``field`` (``"score"`` or ``"children"``) for ``key``, or None."""
+        entry = self._entries.get(key)
+        if entry is None or field not in entry:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[field]
+
+    def store(self, key, field, value):
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = {}
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._entries.move_to_end(key)
+        entry[field] = value
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"TranspositionTable({len(self)}/{self.capacity}, hits={self.hits}, misses={self.misses})"
+
+
 class TreeOfThoughts:
-    def __init__(self):
-        self.thought_tree = {}
-    
-    def add_thought(self, thought_id, parent_id=None):
+    """
+    Tree of thoughts indexed in both directions.
+
+    ``thought_tree`` maps every thought to its children, kept as an
+    insertion-ordered set (a dict with ``None`` values) so detaching a child is
+    O(1); ``parent`` and ``depth`` give the way back up. Pruning a thought
+    removes its whole subtree in a single pass over the pruned nodes, without
+    touching the rest of the tree.
+
+    ``expander(states)`` returns, for each state, a list of child states and
+    ``evaluator(states)`` returns one score per state. Both take whole batches
+    so model calls can be amortised across the frontier.
+
+    With a ``TranspositionTable``, expansion and evaluation results are reused
+    for equivalent states, and a child equivalent to an existing thought at the
+    same depth is linked to it instead of being duplicated, turning the tree
+    into a DAG. ``parent`` then holds a thought's first parent and
+    ``extra_parents`` the others; a thought is freed only when its last parent
+    is pruned.
+    """
+
+    def __init__(self, expander=None, evaluator=None, transpositions=None):
+        self.expander = expander
+        self.evaluator = evaluator
+        self.transpositions = transpositions
+        self.thought_tree = {}  # thought -> ordered set of children
+        self.parent = {}  # thought -> first parent thought (None for roots)
+        self.extra_parents = {}  # shared thought -> ordered set of its other parents
+        self.depth = {}  # thought -> distance from its root
+        self.thoughts = {}  # thought -> payload (text, state, ...)
+        self.scores = {}  # thought -> evaluation score
+        self._ids = itertools.count()
+        self._by_key = {}  # (content key, depth) -> thought (transpositions only)
+        self._keys = {}  # thought -> content key
+
+    def add_thought(self, thought_id, parent_id=None, thought=None, score=None):
+        if thought_id in self.thought_tree:
+            raise ValueError("Thought ID already exists.")
         if parent_id is None:
-            self.thought_tree[thought_id] = []
+            self.depth[thought_id] = 0
         else:
-            if parent_id in self.thought_tree:
-                self.thought_tree[parent_id].append(thought_id)
-            else:
+            if parent_id not in self.thought_tree:
                 raise ValueError("Parent thought ID does not exist.")
-    
-    def prune_thoughts(self, thought_id):
-        if thought_id in self.thought_tree:
-            del self.thought_tree[thought_id]
-            for thoughts in self.thought_tree.values():
-                if thought_id in thoughts:
-                    thoughts.remove(thought_id)
-    
+            self.thought_tree[parent_id][thought_id] = None
+            self.depth[thought_id] = self.depth[parent_id] + 1
+        self.thought_tree[thought_id] = {}
+        self.parent[thought_id] = parent_id
+        self.thoughts[thought_id] = thought
+        if score is not None:
+            self.scores[thought_id] = score
+        if self.transpositions is not None:
+            key = self.transpositions.key(thought)
+            self._keys[thought_id] = key
+            self._by_key.setdefault((key, self.depth[thought_id]), thought_id)
+
+    def link_thought(self, parent_id, thought_id):
+        """Make existing ``thought_id`` a child of ``parent_id`` as well; it must sit one level below it."""
+        if parent_id not in self.thought_tree or thought_id not in self.thought_tree:
+            raise ValueError("Thought ID does not exist.")
+        if self.depth[thought_id] != self.depth[parent_id] + 1:
+            raise ValueError("A linked thought must be exactly one level below its new parent.")
+        if thought_id in self.thought_tree[parent_id]:
+            return
+        self.thought_tree[parent_id][thought_id] = None
+        self.extra_parents.setdefault(thought_id, {})[parent_id] = None
+
+    def _detach(self, parent_id, thought_id):
+        """Drop ``parent_id`` from the parents of ``thought_id``; return True if none are left."""
+        extra = self.extra_parents.get(thought_id)
+        if not extra:
+            return True
+        if self.parent[thought_id] == parent_id:
+            self.parent[thought_id] = next(iter(extra))
+            del extra[self.parent[thought_id]]
+        else:
+            del extra[parent_id]
+        if not extra:
+            del self.extra_parents[thought_id]
+        return False
+
+    def prune_thoughts(self, thought_id, parent_id=None):
+        """
+        Remove ``thought_id`` and all of its descendants that have no other parent.
+
+        Args:
+            thought_id: The thought to prune.
+            parent_id: If given, only the edge from ``parent_id`` is cut and the
+                thought is removed only if that was its last parent.
+
+        Returns:
+            The number of thoughts removed (0 if ``thought_id`` is unknown).
+        """
+        if thought_id not in self.thought_tree:
+            return 0
+        if parent_id is not None:
+            del self.thought_tree[parent_id][thought_id]
+            if not self._detach(parent_id, thought_id):
+                return 0
+        else:
+            for parent in self.get_parents(thought_id):
+                del self.thought_tree[parent][thought_id]
+            self.extra_parents.pop(thought_id, None)
+        stack = [thought_id]
+        removed = 0
+        while stack:
+            node = stack.pop()
+            for child in self.thought_tree.pop(node):
+                if self._detach(node, child):
+                    stack.append(child)
+            del self.parent[node]
+            del self.thoughts[node]
+            self.scores.pop(node, None)
+            key = (self._keys.pop(node, None), self.depth.pop(node))
+            if self._by_key.get(key) == node:
+                del self._by_key[key]
+            removed += 1
+        return removed
+
+    def set_score(self, thought_id, score):
+        if thought_id not in self.thought_tree:
+            raise ValueError("Thought ID does not exist.")
+        self.scores[thought_id] = score
+
+    def get_score(self, thought_id, default=None):
+        return self.scores.get(thought_id, default)
+
+    def get_children(self, thought_id):
+        return list(self.thought_tree[thought_id])
+
+    def get_parent(self, thought_id):
+        return self.parent[thought_id]
+
+    def get_parents(self, thought_id):
+        parent = self.parent[thought_id]
+        if parent is None:
+            return []
+        return [parent, *self.extra_parents.get(thought_id, ())]
+
+    def get_path(self, thought_id):
+        """Thoughts from the root down to ``thought_id`` (through first parents)."""
+        path = []
+        while thought_id is not None:
+            path.append(thought_id)
+            thought_id = self.parent[thought_id]
+        path.reverse()
+        return path
+
+    def get_roots(self):
+        return [node for node, parent in self.parent.items() if parent is None]
+
     def get_thought_tree(self):
         return self.thought_tree
-    
+
+    def __contains__(self, thought_id):
+        return thought_id in self.thought_tree
+
+    def __len__(self):
+        return len(self.thought_tree)
+
+    def new_id(self):
+        """Return an unused integer thought ID."""
+        thought_id = next(self._ids)
+        while thought_id in self.thought_tree:
+            thought_id = next(self._ids)
+        return thought_id
+
+    def _expand_states(self, states):
+        table = self.transpositions
+        if table is None:
+            return self.expander(states)
+        keys = [table.key(state) for state in states]
+        children = [table.lookup(key, "children") for key in keys]
+        missing = [i for i, cached in enumerate(children) if cached is None]
+        if missing:
+            for i, expanded in zip(missing, self.expander([states[i] for i in missing])):
+                children[i] = list(expanded)
+                table.store(keys[i], "children", children[i])
+        return children
+
+    def expand_thoughts(self, thought_ids):
+        """
+        Expand several thoughts with a single ``expander`` call.
+
+        Returns:
+            For each thought in ``thought_ids``, the list of its child IDs from
+            this expansion (new thoughts, or existing equivalent ones that were
+            linked in when transpositions are enabled).
+        """
+        if self.expander is None:
+            raise ValueError("No expander configured.")
+        thought_ids = list(thought_ids)
+        if not thought_ids:
+            return []
+        children = self._expand_states([self.thoughts[t] for t in thought_ids])
+        added = []
+        for parent_id, states in zip(thought_ids, children):
+            ids = []
+            for state in states:
+                existing = None
+                if self.transpositions is not None:
+                    existing = self._by_key.get((self.transpositions.key(state), self.depth[parent_id] + 1))
+                if existing is not None:
+                    if existing not in self.thought_tree[parent_id]:
+                        self.link_thought(parent_id, existing)
+                        ids.append(existing)
+                    continue
+                child_id = self.new_id()
+                self.add_thought(child_id, parent_id, thought=state)
+                ids.append(child_id)
+            added.append(ids)
+        return added
+
     def expand_thought(self, thought_id):
-        # Placeholder for expansion logic
-        pass
-    
-    def evaluate_thoughts(self):
-        # Placeholder for evaluation logic
-        pass
\ No newline at end of file
+        return self.expand_thoughts([thought_id])[0]
+
+    def evaluate_thoughts(self, thought_ids=None):
+        """
+        Score thoughts with a single ``evaluator`` call.
+
+        Args:
+            thought_ids: Thoughts to score; defaults to every unscored thought.
+
+        Returns:
+            The scores, in the order of ``thought_ids``.
+        """
+        if self.evaluator is None:
+            raise ValueError("No evaluator configured.")
+        if thought_ids is None:
+            thought_ids = [t for t in self.thought_tree if t not in self.scores]
+        thought_ids = list(thought_ids)
+        if not thought_ids:
+            return []
+        table = self.transpositions
+        if table is None:
+            scores = list(self.evaluator([self.thoughts[t] for t in thought_ids]))
+            self.scores.update(zip(thought_ids, scores))
+            return scores
+        missing = {}  # key -> thoughts sharing it
+        for t in thought_ids:
+            key = self._keys[t]
+            score = None if key in missing else table.lookup(key, "score")
+            if score is None:
+                missing.setdefault(key, []).append(t)
+            else:
+                self.scores[t] = score
+        if missing:
+            states = [self.thoughts[group[0]] for group in missing.values()]
+            for (key, group), score in zip(missing.items(), self.evaluator(states)):
+                table.store(key, "score", score)
+                for t in group:
+                    self.scores[t] = score
+        return [self.scores[t] for t in thought_ids]
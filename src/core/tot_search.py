@@ -0,0 +1,228 @@
+import heapq
+import itertools
+import math
+
+from ..config import Config
+from .tot import TreeOfThoughts
+
+
+class SearchResult:
+    """
+    Outcome of a thought search.
+
+    Attributes:
+        best: ID of the highest-scoring thought found.
+        score: Its score.
+        path: Thought payloads from the root down to ``best``.
+        tree: The ``TreeOfThoughts`` built during the search (pruned branches removed).
+        expander_calls: Number of batched expander calls made.
+        evaluator_calls: Number of batched evaluator calls made.
+    """
+
+    def __init__(self, best, score, path, tree, expander_calls, evaluator_calls):
+        self.best = best
+        self.score = score
+        self.path = path
+        self.tree = tree
+        self.expander_calls = expander_calls
+        self.evaluator_calls = evaluator_calls
+
+    def __repr__(self):
+        return f"SearchResult(best={self.best!r}, score={self.score!r}, thoughts={len(self.tree)})"
+
+
+class ThoughtSearch:
+    """
+    Base class for searches over a ``TreeOfThoughts``.
+
+    Nodes are always expanded and scored in batches: one ``expander`` call per
+    group of frontier nodes and one ``evaluator`` call for all of the children
+    they produce. Thoughts at ``max_depth`` are never expanded, and of each
+    batch of new children only the best ``1 - pruning_factor`` fraction is kept
+    (at least one per batch); the rest are pruned from the tree.
+    """
+
+    def __init__(self, expander, evaluator, max_depth=None, pruning_factor=None, batch_size=32,
+                 transpositions=None):
+        """
+        Args:
+            expander: ``expander(states)`` -> list of child-state lists.
+            evaluator: ``evaluator(states)`` -> list of scores (higher is better).
+            max_depth: Deepest level that is generated; defaults to ``Config.TOT_MAX_DEPTH``.
+            pruning_factor: Fraction of each batch of children to discard;
+                defaults to ``Config.TOT_PRUNING_FACTOR``.
+            batch_size: Maximum number of thoughts expanded per expander call.
+            transpositions: Optional ``TranspositionTable`` so equivalent states
+                are expanded and scored once and shared between branches.
+        """
+        self.expander = expander
+        self.evaluator = evaluator
+        self.max_depth = Config.TOT_MAX_DEPTH if max_depth is None else max_depth
+        self.pruning_factor = Config.TOT_PRUNING_FACTOR if pruning_factor is None else pruning_factor
+        if not 0 <= self.pruning_factor < 1:
+            raise ValueError("pruning_factor must be in [0, 1).")
+        self.batch_size = batch_size
+        self.transpositions = transpositions
+
+    def _counted(self, fn, counter):
+        def call(states):
+            self._calls[counter] += 1
+            return fn(states)
+        return call
+
+    def _new_tree(self, root_state):
+        self._calls = {"expander": 0, "evaluator": 0}
+        tree = TreeOfThoughts(self._counted(self.expander, "expander"), self._counted(self.evaluator, "evaluator"),
+                              transpositions=self.transpositions)
+        root = tree.new_id()
+        tree.add_thought(root, thought=root_state)
+        tree.evaluate_thoughts([root])
+        return tree, root
+
+    def _keep_count(self, n):
+        return max(1, math.ceil(n * (1 - self.pruning_factor))) if n else 0
+
+    def _expand(self, tree, thought_ids):
+        """
+        Expand ``thought_ids`` and score their children in one batch each,
+        prune the weakest children, and return the surviving child IDs.
+        """
+        edges = [(p, c) for p, ids in zip(thought_ids, tree.expand_thoughts(thought_ids)) for c in ids]
+        if not edges:
+            return []
+        tree.evaluate_thoughts(dict.fromkeys(c for _, c in edges))
+        edges.sort(key=lambda edge: tree.scores[edge[1]], reverse=True)
+        keep = self._keep_count(len(edges))
+        for parent, child in edges[keep:]:
+            tree.prune_thoughts(child, parent)
+        return list(dict.fromkeys(c for _, c in edges[:keep] if c in tree))
+
+    def _result(self, tree):
+        best = max(tree.scores, key=tree.scores.__getitem__)
+        path = [tree.thoughts[t] for t in tree.get_path(best)]
+        return SearchResult(best, tree.scores[best], path, tree, self._calls["expander"], self._calls["evaluator"])
+
+    def search(self, root_state):
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+
+class BeamSearch(ThoughtSearch):
+    """Level-by-level search keeping the ``beam_width`` best thoughts of each depth."""
+
+    def __init__(self, expander, evaluator, beam_width=8, **kwargs):
+        super().__init__(expander, evaluator, **kwargs)
+        self.beam_width = beam_width
+
+    def search(self, root_state):
+        tree, root = self._new_tree(root_state)
+        beam = [root]
+        for _ in range(self.max_depth):
+            candidates = []
+            for start in range(0, len(beam), self.batch_size):
+                candidates.extend(self._expand(tree, beam[start : start + self.batch_size]))
+            if not candidates:
+                break
+            candidates = list(dict.fromkeys(candidates))
+            candidates.sort(key=tree.scores.__getitem__, reverse=True)
+            for thought_id in candidates[self.beam_width :]:
+                tree.prune_thoughts(thought_id)
+            beam = candidates[: self.beam_width]
+        return self._result(tree)
+
+
+class BestFirstSearch(ThoughtSearch):
+    """
+    Expands the highest-scoring open thoughts first, popping up to
+    ``batch_size`` of them from a heap per step, until ``max_expansions``
+    thoughts have been expanded or the frontier is empty.
+    """
+
+    def __init__(self, expander, evaluator, max_expansions=256, **kwargs):
+        super().__init__(expander, evaluator, **kwargs)
+        self.max_expansions = max_expansions
+
+    def search(self, root_state):
+        tree, root = self._new_tree(root_state)
+        counter = itertools.count()
+        frontier = [(-tree.scores[root], next(counter), root)]
+        expanded = set()
+        while frontier and len(expanded) < self.max_expansions:
+            batch = []
+            while frontier and len(batch) < min(self.batch_size, self.max_expansions - len(expanded)):
+                _, _, thought_id = heapq.heappop(frontier)
+                if thought_id in tree and thought_id not in expanded and tree.depth[thought_id] < self.max_depth:
+                    expanded.add(thought_id)
+                    batch.append(thought_id)
+            if not batch:
+                continue
+            for child in self._expand(tree, batch):
+                heapq.heappush(frontier, (-tree.scores[child], next(counter), child))
+        return self._result(tree)
+
+
+class MCTSSearch(ThoughtSearch):
+    """
+    Monte Carlo tree search with UCT selection.
+
+    Each iteration selects up to ``batch_size`` distinct leaves, using a
+    virtual visit on every selected path so the batch spreads across the tree,
+    expands them together and backs up the best child score of each leaf (the
+    evaluator stands in for rollouts).
+    """
+
+    def __init__(self, expander, evaluator, iterations=64, exploration=1.4, **kwargs):
+        super().__init__(expander, evaluator, **kwargs)
+        self.iterations = iterations
+        self.exploration = exploration
+
+    def _select(self, tree, root, visits, values):
+        path = [root]
+        node = root
+        while tree.thought_tree[node]:
+            log_n = math.log(visits[node] + 1)
+
+            def uct(child):
+                n = visits.get(child, 0)
+                q = values.get(child, 0.0) / n if n else tree.scores[child]
+                return q + self.exploration * math.sqrt(log_n / (n + 1))
+
+            node = max(tree.thought_tree[node], key=uct)
+            path.append(node)
+        return path
+
+    @staticmethod
+    def _backup(path, value, values):
+        for node in path:
+            values[node] = values.get(node, 0.0) + value
+
+    def search(self, root_state):
+        tree, root = self._new_tree(root_state)
+        visits, values, terminal = {}, {}, set()
+        for _ in range(self.iterations):
+            paths = {}
+            for _ in range(self.batch_size):
+                path = self._select(tree, root, visits, values)
+                leaf = path[-1]
+                if leaf in paths:
+                    break
+                for node in path:
+                    visits[node] = visits.get(node, 0) + 1
+                if leaf in terminal or tree.depth[leaf] >= self.max_depth:
+                    terminal.add(leaf)
+                    self._backup(path, tree.scores[leaf], values)
+                else:
+                    paths[leaf] = path
+            self._expand(tree, list(paths))
+            for leaf, path in paths.items():
+                children = tree.thought_tree[leaf]
+                if not children:
+                    terminal.add(leaf)
+                self._backup(path, max((tree.scores[c] for c in children), default=tree.scores[leaf]), values)
+        return self._result(tree)
+
+
+SEARCH_STRATEGIES = {
+    "beam": BeamSearch,
+    "best_first": BestFirstSearch,
+    "mcts": MCTSSearch,
+}
@@ -0,0 +1,403 @@
+import json
+import os
+import re
+import struct
+import threading
+import zlib
+from array import array
+
+from ..config import Config
+
+# every record is framed as: lsn (u64), payload length (u32), crc32 of lsn + payload (u32), payload
+FRAME = struct.Struct("<QII")
+LSN = struct.Struct("<Q")
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 1
+_WAL_NAME = re.compile(r"^wal\.(\d+)\.log$")
+_SEGMENT_NAME = re.compile(r"^segment\.(\d+)\.(seg|idx)$")
+
+
+def encode_frame(lsn, record):
+    payload = json.dumps(record, separators=(",", ":")).encode()
+    return FRAME.pack(lsn, len(payload), zlib.crc32(payload, zlib.crc32(LSN.pack(lsn)))) + payload
+
+
+def read_frames(path):
+    """
+    Yield ``(lsn, record, end_offset)`` for each intact frame of a log or segment file.
+
+    Reading stops at the first short or corrupt frame, which is where a crash
+    tore the final write; ``end_offset`` of the last frame yielded is the
+    length of the valid prefix.
+    """
+    with open(path, "rb") as f:
+        offset = 0
+        while True:
+            header = f.read(FRAME.size)
+            if len(header) < FRAME.size:
+                return
+            lsn, length, crc = FRAME.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length or zlib.crc32(payload, zlib.crc32(LSN.pack(lsn))) != crc:
+                return
+            offset += FRAME.size + length
+            yield lsn, json.loads(payload), offset
+
+
+def _fsync_dir(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class SegmentFile:
+    """
+    Immutable, compacted run of log records.
+
+    ``segment.<n>.seg`` holds the frames and ``segment.<n>.idx`` the byte
+    offset of each, so record ``i`` is one seek away. Segments are written
+    once, fsynced, and only then listed in the manifest.
+    """
+
+    def __init__(self, directory, number, first_lsn, last_lsn, count):
+        self.directory = directory
+        self.number = number
+        self.first_lsn = first_lsn
+        self.last_lsn = last_lsn
+        self.count = count
+        self._offsets = None
+
+    @property
+    def data_path(self):
+        return os.path.join(self.directory, f"segment.{self.number:08d}.seg")
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, f"segment.{self.number:08d}.idx")
+
+    @classmethod
+    def write(cls, directory, number, frames):
+        """Write ``(lsn, record)`` pairs to a new segment; returns it, or None if ``frames`` is empty."""
+        segment = cls(directory, number, None, None, 0)
+        offsets = array("Q")
+        offset = 0
+        with open(segment.data_path, "wb") as f:
+            for lsn, record in frames:
+                frame = encode_frame(lsn, record)
+                f.write(frame)
+                offsets.append(offset)
+                offset += len(frame)
+                if segment.first_lsn is None:
+                    segment.first_lsn = lsn
+                segment.last_lsn = lsn
+            f.flush()
+            os.fsync(f.fileno())
+        if not offsets:
+            os.remove(segment.data_path)
+            return None
+        with open(segment.index_path, "wb") as f:
+            offsets.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        segment.count = len(offsets)
+        segment._offsets = offsets
+        return segment
+
+    def to_dict(self):
+        return {"number": self.number, "first_lsn": self.first_lsn, "last_lsn": self.last_lsn, "count": self.count}
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        """``(lsn, record)`` pairs in log order."""
+        for lsn, record, _ in read_frames(self.data_path):
+            yield lsn, record
+
+    def read(self, i):
+        """Return ``(lsn, record)`` for the ``i``-th record without scanning the file."""
+        if self._offsets is None:
+            offsets = array("Q")
+            with open(self.index_path, "rb") as f:
+                offsets.frombytes(f.read())
+            self._offsets = offsets
+        with open(self.data_path, "rb") as f:
+            f.seek(self._offsets[i])
+            lsn, length, _ = FRAME.unpack(f.read(FRAME.size))
+            return lsn, json.loads(f.read(length))
+
+    def remove(self):
+        for path in (self.data_path, self.index_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def __repr__(self):
+        return f"SegmentFile({self.number}, lsn {self.first_lsn}..{self.last_lsn}, {self.count} records)"
+
+
+class DurableLog:
+    """
+    Write-ahead log of JSON records with background compaction into segments.
+
+    ``append`` frames the record and writes it to the current ``wal.<n>.log``
+    through the file buffer; a background thread flushes and fsyncs every
+    ``sync_interval`` seconds (group commit), so the caller never waits on the
+    disk. With ``sync_interval=0`` every append is fsynced before returning.
+
+    Once the current log file exceeds ``compact_bytes`` it is closed and a
+    background compaction copies the closed log files into an immutable
+    ``SegmentFile``, records the last compacted sequence number in
+    ``manifest.json`` and deletes them. When there are more than
+    ``max_segments`` segments they are merged into one through the owner's
+    ``reducer(records) -> records``, which is where superseded records are
+    dropped. Recovery therefore reads the segments sequentially and replays
+    only the log files written since the last compaction, whose size is
+    bounded by ``compact_bytes``.
+
+    Layout::
+
+        manifest.json           segments, last compacted lsn, next file number
+        segment.<n>.seg / .idx  compacted frames and their byte offsets
+        wal.<n>.log             log files not yet compacted (the tail)
+    """
+
+    def __init__(self, path, sync_interval=None, compact_bytes=None, max_segments=None, reducer=None,
+                 background=True):
+        """
+        Args:
+            path: Directory holding the log; created if missing.
+            sync_interval: Seconds between group-commit fsyncs; defaults to
+                ``Config.WAL_SYNC_INTERVAL``. 0 fsyncs every append.
+            compact_bytes: Log size that triggers compaction; defaults to ``Config.WAL_COMPACT_BYTES``.
+            max_segments: Segment count that triggers a merge; defaults to ``Config.WAL_MAX_SEGMENTS``.
+            reducer: ``reducer(records)`` returning the records to keep when
+                segments are merged; None keeps every record.
+            background: Sync and compact on background threads. When False,
+                call ``sync`` and ``compact`` yourself.
+        """
+        self.path = path
+        self.sync_interval = Config.WAL_SYNC_INTERVAL if sync_interval is None else sync_interval
+        self.compact_bytes = compact_bytes or Config.WAL_COMPACT_BYTES
+        self.max_segments = max_segments or Config.WAL_MAX_SEGMENTS
+        self.reducer = reducer
+        self.background = background
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()  # guards the current log file and the lsn counter
+        self._sync_lock = threading.Lock()  # serializes fsync against closing a log file
+        self._compact_lock = threading.Lock()
+        self._load_manifest()
+        self._last_lsn = self.compacted_lsn
+        self._scan_tail()
+        self._file = None
+        self._dirty = False
+        self._open_log()
+        self._closed = False
+        self._compactor = None
+        self._stop = threading.Event()
+        self._syncer = None
+        if background and self.sync_interval > 0:
+            self._syncer = threading.Thread(target=self._sync_loop, name=f"wal-sync:{path}", daemon=True)
+            self._syncer.start()
+
+    # ---- files ----
+    def _wal_path(self, number):
+        return os.path.join(self.path, f"wal.{number:08d}.log")
+
+    def _load_manifest(self):
+        manifest_path = os.path.join(self.path, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        else:
+            manifest = {"format": FORMAT_VERSION, "segments": [], "compacted_lsn": 0, "next_file": 0}
+        self.segments = [SegmentFile(self.path, **s) for s in manifest["segments"]]
+        self.compacted_lsn = manifest["compacted_lsn"]
+        self._next_file = manifest["next_file"]
+        # drop segments a crashed compaction wrote but never listed
+        listed = {s.number for s in self.segments}
+        for name in os.listdir(self.path):
+            match = _SEGMENT_NAME.match(name)
+            if match and int(match.group(1)) not in listed:
+                os.remove(os.path.join(self.path, name))
+
+    def _write_manifest(self):
+        manifest = {
+            "format": FORMAT_VERSION,
+            "segments": [s.to_dict() for s in self.segments],
+            "compacted_lsn": self.compacted_lsn,
+            "next_file": self._next_file,
+        }
+        tmp = os.path.join(self.path, MANIFEST_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.path, MANIFEST_FILE))
+        _fsync_dir(self.path)
+
+    def _log_files(self):
+        numbers = sorted(int(m.group(1)) for m in map(_WAL_NAME.match, os.listdir(self.path)) if m)
+        return [(n, self._wal_path(n)) for n in numbers]
+
+    def _scan_tail(self):
+        """Find the last lsn in the uncompacted logs and cut off a torn final write."""
+        for number, path in self._log_files():
+            valid = 0
+            for lsn, _, valid in read_frames(path):
+                self._last_lsn = max(self._last_lsn, lsn)
+            if valid < os.path.getsize(path):
+                with open(path, "r+b") as f:
+                    f.truncate(valid)
+            self._next_file = max(self._next_file, number + 1)
+
+    def _open_log(self):
+        self._file_number = self._next_file
+        self._next_file += 1
+        self._file = open(self._wal_path(self._file_number), "ab")
+        self._file_bytes = 0
+
+    # ---- writes ----
+    @property
+    def last_lsn(self):
+        return self._last_lsn
+
+    def append(self, record):
+        """Log a JSON-serializable record and return its sequence number."""
+        with self._lock:
+            if self._closed:
+                raise ValueError(f"Log at {self.path} is closed.")
+            self._last_lsn += 1
+            lsn = self._last_lsn
+            frame = encode_frame(lsn, record)
+            self._file.write(frame)
+            self._file_bytes += len(frame)
+            self._dirty = True
+            rotate = self._file_bytes >= self.compact_bytes
+        if self.sync_interval == 0:
+            self.sync()
+        if rotate and self.background:
+            self._start_compaction()
+        return lsn
+
+    def sync(self):
+        """Flush and fsync everything appended so far."""
+        with self._lock:
+            if not self._dirty or self._file is None:
+                return
+            self._file.flush()
+            self._dirty = False
+            f = self._file
+        with self._sync_lock:
+            if not f.closed:
+                os.fsync(f.fileno())
+
+    def _sync_loop(self):
+        while not self._stop.wait(self.sync_interval):
+            self.sync()
+
+    def _rotate(self):
+        """Start a new log file; returns False if the current one is empty."""
+        with self._lock:
+            if not self._file_bytes:
+                return False
+            old = self._file
+            old.flush()
+            self._dirty = False
+            self._open_log()
+        with self._sync_lock:
+            os.fsync(old.fileno())
+            old.close()
+        return True
+
+    # ---- compaction ----
+    def _start_compaction(self):
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self.compact, name=f"wal-compact:{self.path}", daemon=True)
+        self._compactor.start()
+
+    def compact(self):
+        """
+        Move the log written so far into a new segment, then merge segments if
+        there are more than ``max_segments``.
+
+        Returns:
+            The number of records compacted.
+        """
+        with self._compact_lock:
+            self._rotate()
+            closed = [(n, p) for n, p in self._log_files() if n != self._file_number]
+            if not closed:
+                return 0
+            frames = ((lsn, record) for _, path in closed for lsn, record, _ in read_frames(path)
+                      if lsn > self.compacted_lsn)
+            segment = SegmentFile.write(self.path, self._take_file_number(), frames)
+            if segment is not None:
+                self.segments.append(segment)
+                self.compacted_lsn = segment.last_lsn
+            self._write_manifest()
+            for _, path in closed:
+                os.remove(path)
+            if len(self.segments) > self.max_segments:
+                self._merge()
+            return 0 if segment is None else segment.count
+
+    def _take_file_number(self):
+        with self._lock:
+            number = self._next_file
+            self._next_file += 1
+        return number
+
+    def _merge(self):
+        old = self.segments
+        records = (record for segment in old for _, record in segment)
+        if self.reducer is not None:
+            records = self.reducer(records)
+        # merged records are stamped with the last lsn they cover
+        merged = SegmentFile.write(self.path, self._take_file_number(),
+                                   ((old[-1].last_lsn, record) for record in records))
+        self.segments = [] if merged is None else [merged]
+        self._write_manifest()
+        for segment in old:
+            segment.remove()
+
+    # ---- recovery ----
+    def replay(self):
+        """
+        Yield every record still in the log, oldest first: the compacted
+        segments, then the log tail. Meant for startup, before new appends.
+        """
+        for segment in list(self.segments):
+            for _, record in segment:
+                yield record
+        self.sync()
+        for _, path in self._log_files():
+            for lsn, record, _ in read_frames(path):
+                if lsn > self.compacted_lsn:
+                    yield record
+
+    def close(self):
+        """Stop the background threads, fsync the log and close it."""
+        if self._closed:
+            return
+        self._stop.set()
+        if self._syncer is not None:
+            self._syncer.join()
+        if self._compactor is not None:
+            self._compactor.join()
+        self.sync()
+        with self._lock:
+            self._closed = True
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return (f"DurableLog({self.path!r}, {len(self.segments)} segments, "
+                f"compacted_lsn={self.compacted_lsn}, last_lsn={self._last_lsn})")
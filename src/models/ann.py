@@ -0,0 +1,437 @@
+import heapq
+import math
+
+import numpy as np
+
+from .vector_store import VectorStore, top_k_indices
+
+
+def _normalize(matrix):
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    return matrix / (np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-8)
+
+
+def _grow(array, size):
+    """Return ``array`` resized to at least ``size`` entries, doubling capacity."""
+    if size <= array.shape[0]:
+        return array
+    capacity = max(1, array.shape[0])
+    while capacity < size:
+        capacity *= 2
+    grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[: array.shape[0]] = array
+    return grown
+
+
+class ANNIndex:
+    """
+    Interface shared by the vector indexes.
+
+    Entries are addressed by integer ids chosen by the caller and compared by
+    cosine similarity. Adding an id that is already present replaces its vector.
+    """
+
+    def __init__(self, dim):
+        self.dim = dim
+
+    def __len__(self):
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def add(self, ids, vectors):
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def remove(self, ids):
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def search(self, query, k=10):
+        """
+        Find the ``k`` entries most similar to ``query``.
+
+        Returns:
+            Tuple ``(ids, scores)`` of arrays ordered best first.
+        """
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def search_many(self, queries, k=10):
+        """Run ``search`` for each query row; returns a list of ``(ids, scores)``."""
+        return [self.search(q, k) for q in np.atleast_2d(queries)]
+
+
+class ExactIndex(ANNIndex):
+    """Brute-force index: one matrix product per query, deletes are tombstones."""
+
+    def __init__(self, dim, initial_capacity=1024):
+        super().__init__(dim)
+        self._store = VectorStore(dim, initial_capacity=initial_capacity)
+        self._ids = np.zeros(self._store.capacity, dtype=np.int64)
+        self._live = np.zeros(self._store.capacity, dtype=bool)
+        self._rows = {}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, ids, vectors):
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        self.remove([i for i in ids.tolist() if i in self._rows])
+        rows = self._store.add_many(vectors)
+        self._ids = _grow(self._ids, self._store.capacity)
+        self._live = _grow(self._live, self._store.capacity)
+        self._ids[rows.start : rows.stop] = ids
+        self._live[rows.start : rows.stop] = True
+        self._rows.update(zip(ids.tolist(), rows))
+
+    def remove(self, ids):
+        for i in ids:
+            row = self._rows.pop(int(i), None)
+            if row is not None:
+                self._live[row] = False
+        if len(self._store) > 64 and len(self._rows) < len(self._store) // 2:
+            self._compact()
+
+    def _compact(self):
+        n = len(self._store)
+        keep = np.flatnonzero(self._live[:n])
+        vectors, ids = self._store.vectors[keep], self._ids[keep]
+        self._store = VectorStore(self.dim, initial_capacity=max(1024, len(keep)))
+        self._ids = np.zeros(self._store.capacity, dtype=np.int64)
+        self._live = np.zeros(self._store.capacity, dtype=bool)
+        self._rows = {}
+        if len(keep):
+            self.add(ids, vectors)
+
+    def _masked_scores(self, queries):
+        scores = self._store.scores(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        scores[:, ~self._live[: len(self._store)]] = -np.inf
+        return scores
+
+    def search(self, query, k=10):
+        return self.search_many(query, k)[0]
+
+    def search_many(self, queries, k=10):
+        scores = self._masked_scores(queries)
+        rows = top_k_indices(scores, k)
+        results = []
+        for row_ids, row_scores in zip(rows, np.take_along_axis(scores, rows, axis=1)):
+            valid = np.isfinite(row_scores)
+            results.append((self._ids[row_ids[valid]], row_scores[valid]))
+        return results
+
+
+class _InvertedList:
+    """Growable (ids, vectors) bucket with O(1) swap-remove."""
+
+    def __init__(self, dim):
+        self.vectors = np.zeros((16, dim), dtype=np.float32)
+        self.ids = np.zeros(16, dtype=np.int64)
+        self.size = 0
+
+    def append(self, ids, vectors):
+        end = self.size + len(ids)
+        self.vectors = _grow(self.vectors, end)
+        self.ids = _grow(self.ids, end)
+        self.vectors[self.size : end] = vectors
+        self.ids[self.size : end] = ids
+        start, self.size = self.size, end
+        return start
+
+    def remove_at(self, pos):
+        """Remove the entry at ``pos``; returns the id moved into its place, if any."""
+        last = self.size - 1
+        moved = None
+        if pos != last:
+            self.vectors[pos] = self.vectors[last]
+            self.ids[pos] = self.ids[last]
+            moved = int(self.ids[pos])
+        self.size = last
+        return moved
+
+
+def spherical_kmeans(data, k, iterations=10, seed=0):
+    """Cluster unit vectors by cosine similarity; returns unit-norm centroids."""
+    rng = np.random.RandomState(seed)
+    centroids = data[rng.choice(len(data), k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        empty = np.bincount(assign, minlength=k) == 0
+        # reseed empty clusters with random points so every list stays useful
+        sums[empty] = data[rng.choice(len(data), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class IVFIndex(ANNIndex):
+    """
+    Inverted-file index: a k-means coarse quantizer partitions the vectors into
+    ``nlist`` lists and a query scans only the ``nprobe`` closest lists.
+
+    Until ``train_size`` vectors have been added the index behaves as an
+    ``ExactIndex``; it then trains itself and moves everything into the lists.
+    Raising ``nprobe`` trades latency for recall.
+    """
+
+    def __init__(self, dim, nlist=256, nprobe=8, train_size=None, kmeans_iterations=10, seed=0):
+        super().__init__(dim)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size or nlist * 39
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+        self.centroids = None
+        self._lists = []
+        self._where = {}  # id -> (list number, position)
+        self._pending = ExactIndex(dim)
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    def __len__(self):
+        return len(self._where) if self.is_trained else len(self._pending)
+
+    def _contents(self):
+        """Ids and unit vectors of every entry, buffered or already in the lists."""
+        if not self.is_trained:
+            pending = self._pending
+            live = np.flatnonzero(pending._live[: len(pending._store)])
+            return pending._ids[live], pending._store.vectors[live]
+        lists = [bucket for bucket in self._lists if bucket.size]
+        if not lists:
+            return np.empty(0, dtype=np.int64), np.empty((0, self.dim), dtype=np.float32)
+        return (np.concatenate([bucket.ids[: bucket.size] for bucket in lists]),
+                np.concatenate([bucket.vectors[: bucket.size] for bucket in lists]))
+
+    def train(self, vectors=None):
+        """
+        Fit the coarse quantizer (on ``vectors`` or the stored entries) and
+        assign every entry to a list. Calling it again on a trained index
+        refits the quantizer, e.g. after the data has drifted, and reassigns
+        the entries already in the lists.
+        """
+        ids, stored = self._contents()
+        sample = _normalize(vectors) if vectors is not None else stored
+        if len(sample) < self.nlist:
+            raise ValueError("Not enough vectors to train the IVF quantizer.")
+        limit = self.nlist * 256
+        if len(sample) > limit:
+            sample = sample[np.random.RandomState(self.seed).choice(len(sample), limit, replace=False)]
+        self.centroids = spherical_kmeans(sample, self.nlist, self.kmeans_iterations, self.seed)
+        self._lists = [_InvertedList(self.dim) for _ in range(self.nlist)]
+        self._where = {}
+        if len(ids):
+            self._insert(ids, stored)
+        self._pending = None
+
+    def _insert(self, ids, vectors):
+        assign = np.argmax(vectors @ self.centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        bounds = np.flatnonzero(np.diff(assign[order])) + 1
+        for group in np.split(order, bounds):
+            list_no = int(assign[group[0]])
+            start = self._lists[list_no].append(ids[group], vectors[group])
+            for offset, i in enumerate(ids[group].tolist()):
+                self._where[i] = (list_no, start + offset)
+
+    def add(self, ids, vectors):
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        if not self.is_trained:
+            self._pending.add(ids, vectors)
+            if len(self._pending) >= self.train_size:
+                self.train()
+            return
+        self.remove([i for i in ids.tolist() if i in self._where])
+        self._insert(ids, _normalize(vectors))
+
+    def remove(self, ids):
+        if not self.is_trained:
+            self._pending.remove(ids)
+            return
+        for i in ids:
+            location = self._where.pop(int(i), None)
+            if location is None:
+                continue
+            list_no, pos = location
+            moved = self._lists[list_no].remove_at(pos)
+            if moved is not None:
+                self._where[moved] = (list_no, pos)
+
+    def search(self, query, k=10):
+        if not self.is_trained:
+            return self._pending.search(query, k)
+        q = _normalize(query)[0]
+        probes = top_k_indices(self.centroids @ q, self.nprobe)
+        ids, scores = [], []
+        for list_no in probes:
+            bucket = self._lists[list_no]
+            if bucket.size:
+                scores.append(bucket.vectors[: bucket.size] @ q)
+                ids.append(bucket.ids[: bucket.size])
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        ids, scores = np.concatenate(ids), np.concatenate(scores)
+        best = top_k_indices(scores, k)
+        return ids[best], scores[best]
+
+
+class HNSWIndex(ANNIndex):
+    """
+    Hierarchical navigable small-world graph index.
+
+    ``M`` bounds the out-degree per layer, ``ef_construction`` the candidate list
+    used while linking new nodes and ``ef_search`` the one used by queries; a
+    larger ``ef_search`` gives higher recall at higher latency. Removed (or
+    replaced) entries stay in the graph for navigation and are filtered out of
+    results; once they make up more than ``rebuild_ratio`` of the nodes, the
+    graph is rebuilt from the live entries so memory and search cost stay
+    proportional to what is stored.
+    """
+
+    def __init__(self, dim, M=16, ef_construction=100, ef_search=64, seed=0, rebuild_ratio=0.5):
+        super().__init__(dim)
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.rebuild_ratio = rebuild_ratio
+        self._store = VectorStore(dim)
+        self._rng = np.random.RandomState(seed)
+        self._level_mult = 1.0 / math.log(max(M, 2))
+        self._node_ids = []  # node -> external id
+        self._nodes = {}  # external id -> live node
+        self._links = []  # node -> per-level neighbour lists
+        self._entry = None
+        self._max_level = -1
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def _max_degree(self, level):
+        return 2 * self.M if level == 0 else self.M
+
+    def _search_layer(self, q, entry_points, ef, level):
+        vectors = self._store.vectors
+        visited = set(entry_points)
+        sims = (vectors[entry_points] @ q).tolist()
+        candidates = [(-s, n) for s, n in zip(sims, entry_points)]
+        heapq.heapify(candidates)
+        results = [(s, n) for s, n in zip(sims, entry_points)]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+        while candidates:
+            neg_sim, node = heapq.heappop(candidates)
+            if -neg_sim < results[0][0] and len(results) >= ef:
+                break
+            neighbours = [n for n in self._links[node][level] if n not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+            for n, s in zip(neighbours, (vectors[neighbours] @ q).tolist()):
+                if len(results) < ef or s > results[0][0]:
+                    heapq.heappush(candidates, (-s, n))
+                    heapq.heappush(results, (s, n))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+        return results
+
+    def _shrink(self, node, level):
+        links = self._links[node][level]
+        if len(links) <= self._max_degree(level):
+            return
+        vectors = self._store.vectors
+        sims = vectors[links] @ vectors[node]
+        keep = top_k_indices(sims, self._max_degree(level))
+        self._links[node][level] = [links[i] for i in keep]
+
+    def _descend(self, q, level):
+        entry = [self._entry]
+        for lev in range(self._max_level, level, -1):
+            entry = [max(self._search_layer(q, entry, 1, lev))[1]]
+        return entry
+
+    def _add_one(self, ext_id, vector):
+        node = self._store.add(vector)
+        q = self._store.get(node)
+        level = int(-math.log(1.0 - self._rng.random_sample()) * self._level_mult)
+        self._node_ids.append(ext_id)
+        self._nodes[ext_id] = node
+        self._links.append([[] for _ in range(level + 1)])
+        if self._entry is None:
+            self._entry, self._max_level = node, level
+            return
+        entry = self._descend(q, level)
+        for lev in range(min(level, self._max_level), -1, -1):
+            found = self._search_layer(q, entry, self.ef_construction, lev)
+            neighbours = [n for _, n in heapq.nlargest(self.M, found)]
+            self._links[node][lev] = neighbours
+            for n in neighbours:
+                self._links[n][lev].append(node)
+                self._shrink(n, lev)
+            entry = [n for _, n in found]
+        if level > self._max_level:
+            self._entry, self._max_level = node, level
+
+    def add(self, ids, vectors):
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        for ext_id, vector in zip(np.atleast_1d(ids).tolist(), vectors):
+            self._nodes.pop(ext_id, None)
+            self._add_one(ext_id, vector)
+        self._maybe_rebuild()
+
+    def remove(self, ids):
+        for i in ids:
+            self._nodes.pop(int(i), None)
+        self._maybe_rebuild()
+
+    def _maybe_rebuild(self):
+        total = len(self._node_ids)
+        if total > 64 and total - len(self._nodes) > self.rebuild_ratio * total:
+            self.rebuild()
+
+    def rebuild(self):
+        """Rebuild the graph from the live entries only, dropping removed nodes."""
+        live = sorted(self._nodes.items(), key=lambda item: item[1])
+        vectors = self._store.vectors[[node for _, node in live]]
+        self._store = VectorStore(self.dim, initial_capacity=max(1, len(live)))
+        self._node_ids, self._nodes, self._links = [], {}, []
+        self._entry, self._max_level = None, -1
+        for (ext_id, _), vector in zip(live, vectors):
+            self._add_one(ext_id, vector)
+
+    def search(self, query, k=10):
+        if not self._nodes:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        q = _normalize(query)[0]
+        found = self._search_layer(q, self._descend(q, 0), max(self.ef_search, k), 0)
+        hits = []
+        for s, n in heapq.nlargest(len(found), found):
+            ext_id = self._node_ids[n]
+            if self._nodes.get(ext_id) == n:
+                hits.append((ext_id, s))
+                if len(hits) == k:
+                    break
+        ids = np.array([h[0] for h in hits], dtype=np.int64)
+        return ids, np.array([h[1] for h in hits], dtype=np.float32)
+
+
+INDEX_TYPES = {
+    "exact": ExactIndex,
+    "ivf": IVFIndex,
+    "hnsw": HNSWIndex,
+}
+
+
+def create_index(kind, dim, **params):
+    """Instantiate a registered index type by name (see ``INDEX_TYPES``)."""
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{kind}'. Available: {sorted(INDEX_TYPES)}")
+    return INDEX_TYPES[kind](dim, **params)
+
+
+def recall_at_k(approximate_ids, exact_ids):
+    """Mean fraction of the exact top-k ids recovered by the approximate search."""
+    hits = [
+        len(set(np.asarray(a).tolist()) & set(np.asarray(e).tolist())) / max(1, len(e))
+        for a, e in zip(approximate_ids, exact_ids)
+    ]
+    return float(np.mean(hits)) if hits else 0.0
@@ -1,31 +1,203 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+from .ann import ANNIndex, create_index
+from .mmap_store import MmapVectorStore
+from .vector_store import VectorStore, top_k_indices
+
+
+class _EmbeddingsView(Mapping):
+    """Read-only mapping of key to vector over a model's store; vectors are read on lookup."""
+
+    __slots__ = ("_model",)
+
+    def __init__(self, model):
+        self._model = model
+
+    def __getitem__(self, key):
+        vector = self._model.get_embedding(key)
+        if vector is None:
+            raise KeyError(key)
+        # a copy of the row, frozen so that in-place edits fail instead of being silently lost
+        vector.setflags(write=False)
+        return vector
+
+    def __contains__(self, key):
+        return key in self._model._rows
+
+    def __iter__(self):
+        return iter(self._model._rows)
+
+    def __len__(self):
+        return len(self._model._rows)
+
+
 class EmbeddingModel:
-    def __init__(self, embedding_size):
+    def __init__(self, embedding_size, index=None, path=None, readonly=False, **index_params):
+        """
+        Args:
+            embedding_size: Dimension of every stored vector.
+            index: Optional ANN index (an ``ANNIndex`` or a registered type name
+                such as ``"ivf"`` or ``"hnsw"``) used by ``most_similar_vector``.
+            path: Optional directory of a persistent, memory-mapped store; it is
+                created if missing and reopened (without re-embedding) otherwise.
+            readonly: Open ``path`` read-only, e.g. from a second process.
+            index_params: Keyword arguments for the index when given by name.
+        """
         self.embedding_size = embedding_size
-        self.embeddings = {}
+        # raw vectors in one float32 matrix with cached row norms; the store's
+        # records hold the key of each row
+        if path is not None:
+            self._store = MmapVectorStore(path, embedding_size, normalize=False, readonly=readonly)
+        else:
+            self._store = VectorStore(embedding_size, normalize=False)
+        if isinstance(index, str):
+            index = create_index(index, embedding_size, **index_params)
+        self.index: ANNIndex = index
+        self._index_ids = {}  # key -> id in the index
+        self._index_keys = {}  # id in the index -> key
+        self._next_index_id = 0
+        self._reload()
+
+    @classmethod
+    def open(cls, path, index=None, readonly=False, **index_params):
+        """Open an existing persistent store, taking the embedding size from disk."""
+        store = MmapVectorStore(path, readonly=True)
+        embedding_size = store.dim
+        store.close()
+        return cls(embedding_size, index=index, path=path, readonly=readonly, **index_params)
+
+    def _reload(self):
+        """Build the key map, and the ANN index if any, from rows already in the store."""
+        self._rows = {key: row for row, key in enumerate(self._store.records) if key is not None}
+        if self.index is not None and self._rows:
+            ids = list(range(len(self._rows)))
+            self._next_index_id = len(ids)
+            self._index_ids = dict(zip(self._rows, ids))
+            self._index_keys = dict(zip(ids, self._rows))
+            self.index.add(ids, self._store.vectors[list(self._rows.values())])
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def embeddings(self):
+        """Read-only mapping of key to vector; use ``add_embedding`` to write."""
+        return _EmbeddingsView(self)
 
     def add_embedding(self, key, vector):
         if len(vector) != self.embedding_size:
             raise ValueError("Vector size must match the embedding size.")
-        self.embeddings[key] = vector
+        if key in self._rows:
+            self._store.set(self._rows[key], vector)
+        else:
+            self._rows[key] = self._store.add(vector, key)
+        if self.index is not None:
+            self._unindex(key)
+            index_id = self._next_index_id
+            self._next_index_id += 1
+            self._index_ids[key] = index_id
+            self._index_keys[index_id] = key
+            self.index.add([index_id], [vector])
+
+    def remove_embedding(self, key):
+        row = self._rows.pop(key, None)
+        if row is not None:
+            if self._store.remove(row) is not None:
+                self._rows[self._store.records[row]] = row
+            if self._store.maybe_compact():
+                self._rows = {k: r for r, k in enumerate(self._store.records) if k is not None}
+        self._unindex(key)
+
+    def refresh(self):
+        """Pick up embeddings written to the persistent store by another process."""
+        if not isinstance(self._store, MmapVectorStore):
+            return
+        self._store.refresh()
+        self._rows = {k: r for r, k in enumerate(self._store.records) if k is not None}
+        if self.index is not None:
+            for key in [k for k in self._index_ids if k not in self._rows]:
+                self._unindex(key)
+            for key in [k for k in self._rows if k not in self._index_ids]:
+                self._index_ids[key] = self._next_index_id
+                self._index_keys[self._next_index_id] = key
+                self.index.add([self._next_index_id], self._store.get(self._rows[key]))
+                self._next_index_id += 1
+
+    def flush(self):
+        """Make a persistent store durable; a no-op for in-memory models."""
+        if isinstance(self._store, MmapVectorStore):
+            self._store.flush()
+
+    def _unindex(self, key):
+        index_id = self._index_ids.pop(key, None)
+        if index_id is not None:
+            del self._index_keys[index_id]
+            self.index.remove([index_id])
 
     def get_embedding(self, key):
-        return self.embeddings.get(key, None)
+        row = self._rows.get(key)
+        return None if row is None else self._store.get(row).copy()
+
+    def _rows_for(self, keys):
+        try:
+            return np.fromiter((self._rows[k] for k in keys), dtype=np.intp, count=len(keys))
+        except KeyError as e:
+            raise KeyError(f"No embedding stored for key {e.args[0]!r}.") from None
+
+    def similarity_matrix(self, keys_a, keys_b=None):
+        """
+        Cosine similarity between every key in ``keys_a`` and every key in
+        ``keys_b`` (``keys_a`` itself when omitted) as one matrix product.
+
+        Returns:
+            Array of shape ``(len(keys_a), len(keys_b))``.
+        """
+        rows_a = self._rows_for(keys_a)
+        rows_b = rows_a if keys_b is None else self._rows_for(keys_b)
+        vectors, norms = self._store.vectors, self._store.norms
+        product = vectors[rows_a] @ vectors[rows_b].T
+        return product / (np.outer(norms[rows_a], norms[rows_b]) + 1e-8)
+
+    def _top_k(self, scores, k, exclude=None):
+        if exclude is not None:
+            scores[exclude] = -np.inf
+            k = min(k, len(scores) - 1)
+        rows = top_k_indices(scores, k)
+        return [(self._store.records[r], float(scores[r])) for r in rows if np.isfinite(scores[r])]
+
+    def most_similar(self, key, k=5):
+        """Return the ``k`` (key, similarity) pairs closest to a stored key, excluding itself."""
+        row = self._rows_for([key])[0]
+        return self._top_k(self._store.scores(self._store.get(row)), k, exclude=row)
+
+    def most_similar_vector(self, vector, k=5):
+        """
+        Return the ``k`` (key, similarity) pairs closest to ``vector``.
+
+        Uses the ANN index when one is configured, otherwise an exact scan.
+        """
+        if self.index is not None:
+            ids, scores = self.index.search(vector, k)
+            return [(self._index_keys[i], float(s)) for i, s in zip(ids.tolist(), scores)]
+        return self._top_k(self._store.scores(vector), k)
 
     def similarity(self, key1, key2):
-        vec1 = self.get_embedding(key1)
-        vec2 = self.get_embedding(key2)
-        if vec1 is None or vec2 is None:
+        row1, row2 = self._rows.get(key1), self._rows.get(key2)
+        if row1 is None or row2 is None:
             return None
-        return self.cosine_similarity(vec1, vec2)
+        return self.cosine_similarity(self._store.get(row1), self._store.get(row2))
 
     @staticmethod
     def cosine_similarity(vec1, vec2):
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        norm_a = sum(a ** 2 for a in vec1) ** 0.5
-        norm_b = sum(b ** 2 for b in vec2) ** 0.5
+        vec1 = np.asarray(vec1, dtype=np.float64)
+        vec2 = np.asarray(vec2, dtype=np.float64)
+        norm_a = np.linalg.norm(vec1)
+        norm_b = np.linalg.norm(vec2)
         if norm_a == 0 or norm_b == 0:
             return 0.0
-        return dot_product / (norm_a * norm_b)
+        return float(vec1 @ vec2 / (norm_a * norm_b))
 
 class SemanticMemory:
     def __init__(self):
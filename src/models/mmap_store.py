@@ -0,0 +1,254 @@
+import json
+import os
+
+import numpy as np
+
+from ..core.records import Record
+from .vector_store import VectorStore
+
+META_FILE = "meta.json"
+FORMAT_VERSION = 1
+
+
+def _record_to_json(obj):
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _encode(entry):
+    return json.dumps(entry, default=_record_to_json)
+
+
+class MmapVectorStore(VectorStore):
+    """
+    ``VectorStore`` persisted to a directory and memory-mapped on open.
+
+    Layout (``<gen>`` is bumped by every compaction)::
+
+        meta.json             dimension, normalization flag, current generation
+        vectors.<gen>.f32     float32 rows, preallocated and grown in place
+        norms.<gen>.f32       cached row norms
+        records.<gen>.jsonl   append-only log: {"r": record} per added row,
+                              {"d": row} per removal
+
+    Opening maps the vector files without reading them, so actors on the same
+    node share one copy in the page cache. Removed rows stay as tombstones,
+    excluded from search, until ``compact`` rewrites the live rows into a new
+    generation. Records must be JSON-serializable or ``Record`` instances;
+    with ``record_type`` they are read back as that ``Record`` class.
+    """
+
+    def __init__(self, path, dim=None, normalize=True, readonly=False, initial_capacity=1024, compact_ratio=0.25,
+                 record_type=None):
+        self.path = path
+        self.record_type = record_type
+        self.readonly = readonly
+        self.compact_ratio = compact_ratio
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if dim is not None and dim != meta["dim"]:
+                raise ValueError(f"Store at {path} has dimension {meta['dim']}, not {dim}.")
+            dim, normalize, generation = meta["dim"], meta["normalize"], meta["generation"]
+        else:
+            if readonly:
+                raise FileNotFoundError(f"No vector store found at {path}.")
+            if dim is None:
+                raise ValueError("dim is required to create a new store.")
+            os.makedirs(path, exist_ok=True)
+            generation = 0
+            self._create_generation(generation, dim, max(1, initial_capacity))
+            self._write_meta(dim, normalize, generation)
+        super().__init__(dim, initial_capacity=1, normalize=normalize)
+        self._open(generation)
+
+    def _file(self, name, generation):
+        return os.path.join(self.path, f"{name}.{generation}.{'jsonl' if name == 'records' else 'f32'}")
+
+    def _create_generation(self, generation, dim, capacity):
+        for name, width in (("vectors", dim), ("norms", 1)):
+            with open(self._file(name, generation), "wb") as f:
+                f.truncate(capacity * width * 4)
+        open(self._file("records", generation), "a").close()
+
+    def _write_meta(self, dim, normalize, generation):
+        meta = {"format": FORMAT_VERSION, "dim": dim, "normalize": normalize, "generation": generation}
+        tmp = os.path.join(self.path, META_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.path, META_FILE))
+
+    def _map(self):
+        mode = "r" if self.readonly else "r+"
+        capacity = os.path.getsize(self._file("norms", self.generation)) // 4
+        self._vectors = np.memmap(self._file("vectors", self.generation), dtype=np.float32,
+                                  mode=mode, shape=(capacity, self.dim))
+        self._norms = np.memmap(self._file("norms", self.generation), dtype=np.float32,
+                                mode=mode, shape=(capacity,))
+        live = np.zeros(capacity, dtype=bool)
+        live[: self._size] = self._live[: self._size]
+        self._live = live
+
+    def _open(self, generation):
+        self.generation = generation
+        self.records = []
+        self._size = 0
+        self._dead = 0
+        self._live = np.zeros(0, dtype=bool)
+        self._log_offset = 0
+        self._replay()
+        self._map()
+        if self._size > self.capacity:
+            raise ValueError(f"Store at {self.path} is corrupt: more records than vectors.")
+        self._log = None if self.readonly else open(self._file("records", generation), "a")
+
+    def _replay(self):
+        """Apply log lines written since the last replay (by this or another process)."""
+        with open(self._file("records", self.generation), "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        data = data[: data.rfind(b"\n") + 1]  # ignore a torn final line
+        self._log_offset += len(data)
+        first_new = self._size
+        removed = []
+        for line in data.decode().splitlines():
+            entry = json.loads(line)
+            if "r" in entry:
+                record = entry["r"]
+                if self.record_type is not None and record is not None:
+                    record = self.record_type.from_dict(record)
+                self.records.append(record)
+            else:
+                removed.append(entry["d"])
+        self._size = len(self.records)
+        live = np.zeros(max(self._size, len(self._live)), dtype=bool)
+        live[:first_new] = self._live[:first_new]
+        live[first_new : self._size] = True
+        for row in removed:
+            if live[row]:
+                live[row] = False
+                self.records[row] = None
+                self._dead += 1
+        self._live = live
+
+    def refresh(self):
+        """
+        Pick up rows appended by another process since this store was opened.
+
+        Returns:
+            True if the store was reopened because a compaction replaced its
+            files (row numbers may have changed), False otherwise.
+        """
+        with open(os.path.join(self.path, META_FILE)) as f:
+            generation = json.load(f)["generation"]
+        if generation != self.generation:
+            self.close()
+            self._open(generation)
+            return True
+        self._replay()
+        if self._size > self.capacity:
+            self._map()
+        return False
+
+    def _reserve(self, n):
+        needed = self._size + n
+        if needed <= self.capacity:
+            return
+        new_capacity = self.capacity
+        while new_capacity < needed:
+            new_capacity *= 2
+        self._vectors.flush()
+        self._norms.flush()
+        for name, width in (("vectors", self.dim), ("norms", 1)):
+            with open(self._file(name, self.generation), "r+b") as f:
+                f.truncate(new_capacity * width * 4)
+        self._map()
+
+    def _check_writable(self):
+        if self.readonly:
+            raise ValueError(f"Store at {self.path} is opened read-only.")
+
+    def add_many(self, matrix, records=None):
+        self._check_writable()
+        rows = super().add_many(matrix, records)
+        self._live[rows.start : rows.stop] = True
+        # vectors are written before their log lines, so a crash never exposes a missing row
+        self._log.write("".join(_encode({"r": r}) + "\n" for r in self.records[rows.start : rows.stop]))
+        self._log.flush()
+        return rows
+
+    def set(self, row, vector):
+        self._check_writable()
+        super().set(row, vector)
+
+    def remove(self, row):
+        """Tombstone ``row``; it keeps its number until the next compaction. Returns None."""
+        self._check_writable()
+        if not 0 <= row < self._size or not self._live[row]:
+            raise IndexError("Row out of range.")
+        self._live[row] = False
+        self.records[row] = None
+        self._dead += 1
+        self._log.write(json.dumps({"d": row}) + "\n")
+        self._log.flush()
+        return None
+
+    def live_rows(self):
+        """Row numbers that are not tombstoned."""
+        return np.flatnonzero(self._live[: self._size])
+
+    def scores(self, query):
+        scores = super().scores(query)
+        if self._dead:
+            scores[..., ~self._live[: self._size]] = -np.inf
+        return scores
+
+    def maybe_compact(self):
+        if self.readonly or not self._size or self._dead / self._size <= self.compact_ratio:
+            return False
+        self.compact()
+        return True
+
+    def compact(self):
+        """Rewrite the live rows into a new generation and drop the old files."""
+        self._check_writable()
+        keep = np.flatnonzero(self._live[: self._size])
+        old, new = self.generation, self.generation + 1
+        self._create_generation(new, self.dim, max(1, len(keep)))
+        for name, source in (("vectors", self._vectors), ("norms", self._norms)):
+            target = np.memmap(self._file(name, new), dtype=np.float32, mode="r+",
+                               shape=(max(1, len(keep)),) + source.shape[1:])
+            for start in range(0, len(keep), 65536):
+                chunk = keep[start : start + 65536]
+                target[start : start + len(chunk)] = source[chunk]
+            target.flush()
+            del target
+        with open(self._file("records", new), "w") as f:
+            f.write("".join(_encode({"r": self.records[i]}) + "\n" for i in keep.tolist()))
+            f.flush()
+            os.fsync(f.fileno())
+        self._write_meta(self.dim, self.normalize, new)
+        self.close()
+        for name in ("vectors", "norms", "records"):
+            os.remove(self._file(name, old))
+        self._open(new)
+
+    def flush(self):
+        """Make all writes durable (msync the maps, fsync the log)."""
+        if self.readonly:
+            return
+        self._vectors.flush()
+        self._norms.flush()
+        self._log.flush()
+        os.fsync(self._log.fileno())
+
+    def close(self):
+        if self._log is not None:
+            self.flush()
+            self._log.close()
+            self._log = None
+        self._vectors = self._norms = None
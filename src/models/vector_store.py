@@ -0,0 +1,164 @@
+import numpy as np
+
+
+def top_k_indices(scores, k):
+    """
+    Return the indices of the ``k`` largest scores, best first.
+
+    Uses ``argpartition`` so only the selected slice is sorted. ``scores`` may be
+    a 1-D array or a 2-D array of per-query rows, in which case selection is done
+    along the last axis.
+    """
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.intp)
+    if k < n:
+        part = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        part = np.broadcast_to(np.arange(n), scores.shape).copy()
+    order = np.argsort(-np.take_along_axis(scores, part, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(part, order, axis=-1)
+
+
+class VectorStore:
+    """
+    Contiguous, growable float32 matrix of row vectors with exact cosine top-k.
+
+    Rows are stored L2-normalized (when ``normalize`` is set) so a search is a
+    single matrix-vector product. Otherwise the raw rows are kept and their norms
+    are cached at insert time. Capacity doubles on demand, so appends are
+    amortized O(1) and never copy per entry. ``records`` holds one optional
+    payload per row (a key, a metadata dict, ...) and moves with its row.
+    """
+
+    def __init__(self, dim, initial_capacity=1024, normalize=True):
+        self.dim = dim
+        self.normalize = normalize
+        self._vectors = np.zeros((max(1, initial_capacity), dim), dtype=np.float32)
+        self._norms = np.zeros(max(1, initial_capacity), dtype=np.float32)
+        self._size = 0
+        self.records = []
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        return self._vectors.shape[0]
+
+    @property
+    def vectors(self):
+        """View of the populated rows (no copy)."""
+        return self._vectors[: self._size]
+
+    @property
+    def norms(self):
+        """L2 norm of each populated row as it was inserted."""
+        return self._norms[: self._size]
+
+    def _reserve(self, n):
+        needed = self._size + n
+        if needed <= self.capacity:
+            return
+        new_capacity = self.capacity
+        while new_capacity < needed:
+            new_capacity *= 2
+        grown = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        grown[: self._size] = self._vectors[: self._size]
+        self._vectors = grown
+        norms = np.zeros(new_capacity, dtype=np.float32)
+        norms[: self._size] = self._norms[: self._size]
+        self._norms = norms
+
+    def _prepare(self, matrix):
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        if matrix.shape[1] != self.dim:
+            raise ValueError("Vector size must match the store dimension.")
+        norms = np.linalg.norm(matrix, axis=1)
+        if self.normalize:
+            matrix = matrix / (norms[:, None] + 1e-8)
+        return matrix, norms
+
+    def add(self, vector, record=None):
+        """Append a single vector and return its row index."""
+        return self.add_many(vector, [record])[0]
+
+    def add_many(self, matrix, records=None):
+        """Append a batch of vectors and return the range of their row indices."""
+        matrix, norms = self._prepare(matrix)
+        n = matrix.shape[0]
+        self._reserve(n)
+        start = self._size
+        self._vectors[start : start + n] = matrix
+        self._norms[start : start + n] = norms
+        self._size += n
+        self.records.extend(records if records is not None else [None] * n)
+        return range(start, start + n)
+
+    def get(self, row):
+        return self._vectors[row]
+
+    def set(self, row, vector):
+        """Overwrite an existing row in place."""
+        if not 0 <= row < self._size:
+            raise IndexError("Row out of range.")
+        matrix, norms = self._prepare(vector)
+        self._vectors[row] = matrix[0]
+        self._norms[row] = norms[0]
+
+    def remove(self, row):
+        """
+        Delete ``row`` by moving the last row into its slot (O(1)).
+
+        Returns:
+            The former index of the row that now lives at ``row``, or None when
+            the removed row was the last one.
+        """
+        if not 0 <= row < self._size:
+            raise IndexError("Row out of range.")
+        last = self._size - 1
+        self._size = last
+        moved_record = self.records.pop()
+        if row == last:
+            return None
+        self._vectors[row] = self._vectors[last]
+        self._norms[row] = self._norms[last]
+        self.records[row] = moved_record
+        return last
+
+    def live_rows(self):
+        """Row numbers holding an entry; every populated row, since removals here are never deferred."""
+        return np.arange(self._size)
+
+    def maybe_compact(self):
+        """Reclaim space left by removals if worthwhile; returns True when rows were renumbered."""
+        return False
+
+    def scores(self, query):
+        """Cosine similarity of ``query`` (1-D) or each query row (2-D) to every stored row."""
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query, axis=-1, keepdims=True) + 1e-8)
+        scores = self.vectors @ query if query.ndim == 1 else query @ self.vectors.T
+        if not self.normalize:
+            scores /= self.norms + 1e-8
+        return scores
+
+    def search(self, query, top_k=3):
+        """
+        Find the ``top_k`` rows most similar to ``query``.
+
+        Returns:
+            Tuple ``(rows, scores)`` ordered best first.
+        """
+        scores = self.scores(query)
+        rows = top_k_indices(scores, top_k)
+        return rows, scores[rows]
+
+    def search_many(self, queries, top_k=3):
+        """Batched ``search``: one matrix product for all query rows."""
+        scores = self.scores(np.atleast_2d(queries))
+        rows = top_k_indices(scores, top_k)
+        return rows, np.take_along_axis(scores, rows, axis=1)
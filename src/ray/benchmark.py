@@ -0,0 +1,215 @@
+"""
+benchmark.py
+
+End-to-end benchmark of the agent pipeline in main.py on a local Ray cluster.
+
+For every combination of reasoner count, memory size, top_k and task rate it
+builds a fresh pipeline (sharded memory -> reasoners -> evaluator -> meta
+agent), preloads the memory, then issues tasks open-loop at the given rate
+and measures each task's latency from its scheduled start to completion.
+Per-stage time (embed, add, query, memory round trip, score) is read from the
+actors' stage timers. With ``--trace-dir`` every actor also records tracing
+spans: a merged Chrome trace is written to ``<dir>/trace.json`` and span
+latency percentiles are added to each case.
+
+Run:
+    python benchmark.py --reasoners 1,4 --memory-sizes 1000,100000 --top-k 3 --rates 10,50 --out bench.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+import ray
+
+# make the ``src`` package importable when this file is run as a script
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.ray.main import EvaluatorAgent, MemoryAgent, MetaAgent, ReasonerAgent, init_ray
+from src.ray.memory_service import ShardedMemory
+from src.utils import tracing
+from src.utils.metrics import Metrics
+
+
+def _ints(text: str) -> List[int]:
+    return [int(x) for x in text.split(",") if x]
+
+
+def _floats(text: str) -> List[float]:
+    return [float(x) for x in text.split(",") if x]
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def merge_stages(summaries: List[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """Combine StageTimer summaries from several actors."""
+    merged: Dict[str, Dict[str, float]] = {}
+    for summary in summaries:
+        for stage, s in summary.items():
+            m = merged.setdefault(stage, {"count": 0, "total_s": 0.0, "max_ms": 0.0})
+            m["count"] += s["count"]
+            m["total_s"] += s["total_s"]
+            m["max_ms"] = max(m["max_ms"], s["max_ms"])
+    for m in merged.values():
+        m["mean_ms"] = 1000 * m["total_s"] / m["count"] if m["count"] else 0.0
+    return merged
+
+
+def build_pipeline(n_reasoners: int, n_shards: int, top_k: int):
+    memory = ShardedMemory(lambda name: MemoryAgent.remote(name=name), n_shards=n_shards)
+    reasoners = [ReasonerAgent.remote(name=f"R-{i}", memory=memory, top_k=top_k) for i in range(n_reasoners)]
+    evaluator = EvaluatorAgent.remote(name="Eval")
+    # a threaded meta agent so tasks issued at a fixed rate can overlap
+    meta = MetaAgent.options(max_concurrency=64).remote(name="Meta", reasoners=reasoners, evaluator=evaluator)
+    return memory, reasoners, evaluator, meta
+
+
+def preload(memory: ShardedMemory, size: int, chunk: int = 10000):
+    for start in range(0, size, chunk):
+        texts = [f"prior memory {i} about topic {i % 101}" for i in range(start, min(size, start + chunk))]
+        ray.get(memory.add_batch(texts))
+
+
+def run_load(meta, n_tasks: int, rate: float, timeout: float) -> Dict[str, Any]:
+    """Issue n_tasks at ``rate`` tasks/sec (open loop) and time each one."""
+    interval = 1.0 / rate
+    pending: Dict[ray.ObjectRef, float] = {}
+    latencies, partial = [], 0
+    start = time.perf_counter()
+    issued = 0
+    while issued < n_tasks or pending:
+        now = time.perf_counter()
+        while issued < n_tasks and start + issued * interval <= now:
+            ref = meta.coordinate_task.remote(f"benchmark task {issued}", timeout=timeout, result_format="compact")
+            pending[ref] = start + issued * interval
+            issued += 1
+        # block until a task finishes or the next one is due
+        wait_for = max(0.0, start + issued * interval - time.perf_counter()) if issued < n_tasks else None
+        if not pending:
+            time.sleep(wait_for or 0.0)
+            continue
+        ready, _ = ray.wait(list(pending), num_returns=1, timeout=wait_for)
+        if ready:
+            ready, _ = ray.wait(list(pending), num_returns=len(pending), timeout=0)
+        done_at = time.perf_counter()
+        for ref in ready:
+            latencies.append(done_at - pending.pop(ref))
+            partial += bool(ray.get(ref)["partial"])
+    wall = time.perf_counter() - start
+    lat_ms = 1000 * np.asarray(latencies)
+    return {
+        "tasks": n_tasks,
+        "wall_s": wall,
+        "tasks_per_sec": n_tasks / wall,
+        "partial": partial,
+        "latency_ms": {
+            "mean": float(lat_ms.mean()),
+            "p50": float(np.percentile(lat_ms, 50)),
+            "p95": float(np.percentile(lat_ms, 95)),
+            "p99": float(np.percentile(lat_ms, 99)),
+            "max": float(lat_ms.max()),
+        },
+    }
+
+
+def run_case(n_reasoners: int, memory_size: int, top_k: int, rate: float, n_tasks: int, n_shards: int,
+             timeout: float) -> Dict[str, Any]:
+    memory, reasoners, evaluator, meta = build_pipeline(n_reasoners, n_shards, top_k)
+    t0 = time.perf_counter()
+    preload(memory, memory_size)
+    preload_s = time.perf_counter() - t0
+    shard_actors = [a for replicas in memory.shards.values() for a in replicas]
+    # warm up actors and caches, then measure from clean timers
+    ray.get(meta.coordinate_task.remote("warm-up", timeout=timeout))
+    ray.get([a.reset_stats.remote() for a in shard_actors + reasoners + [evaluator]])
+    result = run_load(meta, n_tasks, rate, timeout)
+    result.update({
+        "reasoners": n_reasoners,
+        "memory_size": memory_size,
+        "top_k": top_k,
+        "rate": rate,
+        "shards": n_shards,
+        "preload_s": preload_s,
+        "stages": merge_stages(ray.get([a.stats.remote() for a in shard_actors + reasoners + [evaluator]])),
+    })
+    # span metrics are only collected when tracing is on; fetching them also flushes the trace files
+    span_metrics = [m for m in ray.get([a.span_metrics.remote() for a in [meta, evaluator] + reasoners + shard_actors])
+                    if m is not None]
+    if span_metrics:
+        merged = Metrics()
+        for m in span_metrics:
+            merged.merge(m)
+        result["spans"] = merged.get_metrics_summary()["agents"]
+    for actor in [meta, evaluator] + reasoners + shard_actors:
+        ray.kill(actor)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Ray agent pipeline.")
+    parser.add_argument("--reasoners", type=_ints, default=[1, 4])
+    parser.add_argument("--memory-sizes", type=_ints, default=[1000, 100000])
+    parser.add_argument("--top-k", type=_ints, default=[3])
+    parser.add_argument("--rates", type=_floats, default=[10.0, 50.0], help="tasks per second")
+    parser.add_argument("--tasks", type=int, default=200, help="tasks per case")
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-task deadline passed to coordinate_task")
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--trace-dir", help="record tracing spans from every actor into this directory")
+    parser.add_argument("--trace-sample-rate", type=float, default=1.0)
+    args = parser.parse_args()
+
+    if args.trace_dir:
+        # picked up by init_ray and handed to every actor process
+        os.environ["COGNITION_TRACE_FILE"] = os.path.join(os.path.abspath(args.trace_dir), "trace-{pid}.json")
+        os.environ["COGNITION_TRACE_METRICS"] = "1"
+        os.environ["COGNITION_TRACE_SAMPLE_RATE"] = str(args.trace_sample_rate)
+    init_ray()
+    results = []
+    for n_reasoners in args.reasoners:
+        for memory_size in args.memory_sizes:
+            for top_k in args.top_k:
+                for rate in args.rates:
+                    case = run_case(n_reasoners, memory_size, top_k, rate, args.tasks, args.shards, args.timeout)
+                    lat = case["latency_ms"]
+                    print(f"reasoners={n_reasoners} memory={memory_size} top_k={top_k} rate={rate:g}/s -> "
+                          f"{case['tasks_per_sec']:.1f} tasks/s p50={lat['p50']:.1f}ms "
+                          f"p95={lat['p95']:.1f}ms p99={lat['p99']:.1f}ms")
+                    results.append(case)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "ray": ray.__version__,
+        "cpus": os.cpu_count(),
+        "config": vars(args),
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.out}")
+    if args.trace_dir:
+        trace_path = os.path.join(args.trace_dir, "trace.json")
+        n = tracing.merge_chrome_traces(sorted(glob.glob(os.path.join(args.trace_dir, "trace-*.json"))), trace_path)
+        print(f"wrote {trace_path} ({n} spans)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+ingest.py
+
+Streaming bulk loader for the memory service. A corpus is read in chunks
+(JSON Lines, or Parquet when pyarrow is installed) and each chunk is sent to
+the shards as ``add_batch`` calls, with at most ``max_in_flight`` chunks
+outstanding so a large corpus never piles up in the object store.
+
+A corpus record is a mapping with a ``text`` field; the remaining fields (or
+its ``meta`` field, if present) become the memory's metadata.
+
+Run:
+    python ingest.py corpus.jsonl --shards 4 --chunk-size 10000 --persist-dir data/memory
+
+Without ``--persist-dir`` the shards are in-memory actors that exit with the
+command, so the run only measures ingest throughput.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Tuple
+
+import ray
+
+# make the ``src`` package importable when this file is run as a script
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+Chunk = Tuple[List[str], List[Dict[str, Any]]]
+
+
+def _split(record: Dict[str, Any], text_field: str):
+    meta = record.get("meta")
+    if meta is None:
+        meta = {k: v for k, v in record.items() if k != text_field}
+    return record[text_field], meta
+
+
+def iter_jsonl(path: str, chunk_size: int = 10000, text_field: str = "text") -> Iterator[Chunk]:
+    """Yield ``(texts, metadata)`` chunks from a JSON Lines file, skipping blank lines."""
+    texts, metas = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            text, meta = _split(json.loads(line), text_field)
+            texts.append(text)
+            metas.append(meta)
+            if len(texts) >= chunk_size:
+                yield texts, metas
+                texts, metas = [], []
+    if texts:
+        yield texts, metas
+
+
+def iter_parquet(path: str, chunk_size: int = 10000, text_field: str = "text") -> Iterator[Chunk]:
+    """Yield ``(texts, metadata)`` chunks from a Parquet file, one record batch at a time."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet corpora requires pyarrow (pip install pyarrow).") from e
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        records = [_split(r, text_field) for r in batch.to_pylist()]
+        yield [t for t, _ in records], [m for _, m in records]
+
+
+def iter_corpus(path: str, chunk_size: int = 10000, text_field: str = "text") -> Iterator[Chunk]:
+    """Pick the reader from the file extension (``.parquet`` / ``.pq``, anything else is JSON Lines)."""
+    if os.path.splitext(path)[1].lower() in (".parquet", ".pq"):
+        return iter_parquet(path, chunk_size, text_field)
+    return iter_jsonl(path, chunk_size, text_field)
+
+
+def ingest(memory, chunks: Iterable[Chunk], max_in_flight: int = 8) -> Dict[str, Any]:
+    """
+    Stream chunks into a ShardedMemory (or anything with a ref-returning
+    ``add_batch``), blocking before a chunk is sent whenever ``max_in_flight``
+    chunks already have writes outstanding. A chunk is one write per replica of every shard it
+    touches, and it completes when all of them have.
+
+    Returns:
+        ``{"records": n, "chunks": n, "seconds": s, "records_per_sec": r}``.
+    """
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be at least 1.")
+    start = time.perf_counter()
+    in_flight: Deque[List[ray.ObjectRef]] = deque()  # the refs of each outstanding chunk, oldest first
+    records = n_chunks = 0
+    for texts, metas in chunks:
+        while len(in_flight) >= max_in_flight:
+            ray.get(in_flight.popleft())  # surface write errors early
+        in_flight.append(memory.add_batch(texts, metas))
+        records += len(texts)
+        n_chunks += 1
+    for refs in in_flight:
+        ray.get(refs)
+    seconds = time.perf_counter() - start
+    return {"records": records, "chunks": n_chunks, "seconds": seconds,
+            "records_per_sec": records / seconds if seconds else 0.0}
+
+
+def main():
+    from src.ray.main import MemoryAgent, init_ray
+    from src.ray.memory_service import ShardedMemory
+
+    parser = argparse.ArgumentParser(description="Bulk-load a corpus into a sharded memory service.")
+    parser.add_argument("path", help="JSON Lines or Parquet corpus")
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--replicas", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--persist-dir", default=None,
+                        help="keep each replica's memory under <dir>/<shard>/<replica>; without it nothing is kept")
+    args = parser.parse_args()
+
+    def shard_factory(name):
+        # replica names are "shard-<i>/r<j>", so a rerun with the same layout reopens the same stores
+        persist_path = os.path.join(args.persist_dir, name) if args.persist_dir else None
+        return MemoryAgent.remote(name=name, persist_path=persist_path)
+
+    init_ray()
+    memory = ShardedMemory(shard_factory, n_shards=args.shards, replicas=args.replicas)
+    stats = ingest(memory, iter_corpus(args.path, args.chunk_size, args.text_field), args.max_in_flight)
+    if args.persist_dir:
+        ray.get([r.flush.remote() for replicas in memory.shards.values() for r in replicas])
+    else:
+        print("note: no --persist-dir given, the ingested memories are discarded on exit")
+    print(json.dumps(stats, indent=2))
+    print(json.dumps(memory.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
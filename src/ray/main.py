@@ -9,12 +9,36 @@ Run:
     python distributed_agents.py
 """
 
+import asyncio
+import hashlib
+import os
+import sys
 import ray
 import numpy as np
 import time
 import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
 from typing import List, Dict, Any
 
+# Make the ``src`` package importable when this file is run as a script; the
+# same path is handed to Ray workers through the runtime environment.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.config import Config
+from src.core.records import MemoryEntry, RecordBatch
+from src.models.ann import create_index
+from src.models.mmap_store import MmapVectorStore
+from src.models.vector_store import VectorStore
+from src.utils import tracing
+from src.ray.memory_service import ShardedMemory
+from src.ray.scoring import CompositeScorer, EvaluatorPool, GoalSimilarityScorer, HeuristicScorer, Scorer, rank
+
+# tracing is off unless requested through COGNITION_TRACE_* (init_ray passes them on to workers)
+tracing.configure_from_env()
+
 # -------------------------
 # Utilities / Simple Embedder
 # -------------------------
@@ -22,86 +46,322 @@ class SimpleEmbedder:
     """
     A tiny deterministic "embedder" used for demonstration.
     Replace with a real model embedder (OpenAI / sentence-transformers / etc.)
+
+    Each text is reduced to a 256-bit BLAKE2b digest whose bits (as +/-1) are
+    projected through a fixed random matrix. The digest is stable across
+    processes (unlike the salted built-in ``hash``), so every Ray worker maps a
+    text to the same vector, and a batch embeds with one matrix product.
+    Recently seen texts are served from a bounded LRU cache keyed by digest.
     """
-    def __init__(self, dim=64, seed=0):
+    def __init__(self, dim=64, seed=0, cache_size=4096):
         self.dim = dim
         rng = np.random.RandomState(seed)
         # A deterministic projection matrix
         self.proj = rng.randn(dim, 256)
+        self._proj_t = np.ascontiguousarray(self.proj.T, dtype=np.float32)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @staticmethod
+    def digest(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=32).digest()
 
     def text_to_vector(self, text: str) -> np.ndarray:
-        # Create a simple hash-based vector (deterministic)
-        h = abs(hash(text)) % (10**9)
-        rng = np.random.RandomState(h)
-        vec = rng.randn(self.dim).astype(np.float32)
-        # normalize
-        vec = vec / (np.linalg.norm(vec) + 1e-8)
-        return vec
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed many texts at once; returns a (len(texts), dim) float32 array of unit vectors."""
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        missing: Dict[bytes, List[int]] = {}
+        for i, text in enumerate(texts):
+            key = self.digest(text)
+            vec = self._cache.get(key)
+            if vec is not None:
+                self._cache.move_to_end(key)
+                out[i] = vec
+            else:
+                missing.setdefault(key, []).append(i)
+        # hits and misses both count positions, so hits + misses == texts embedded
+        misses = sum(len(pos) for pos in missing.values())
+        self.cache_hits += len(texts) - misses
+        self.cache_misses += misses
+        if missing:
+            keys = list(missing)
+            digests = np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(len(keys), 32)
+            signs = np.unpackbits(digests, axis=1).astype(np.float32) * 2.0 - 1.0
+            vecs = signs @ self._proj_t
+            # normalize
+            vecs /= np.linalg.norm(vecs, axis=1, keepdims=True) + 1e-8
+            for key, vec in zip(keys, vecs):
+                out[missing[key]] = vec
+                self._cache[key] = vec.copy()
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return out
+
+class StageTimer:
+    """
+    Accumulates wall time per named stage: ``with timer.time("embed"): ...``.
+    Each stage is also a tracing span, nested under the current one.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._stages: Dict[str, List[float]] = {}  # stage -> [count, total seconds, max seconds]
+
+    @contextmanager
+    def time(self, stage: str):
+        start = time.perf_counter()
+        try:
+            with tracing.span(stage):
+                yield
+        finally:
+            elapsed = time.perf_counter() - start
+            acc = self._stages.setdefault(stage, [0, 0.0, 0.0])
+            acc[0] += 1
+            acc[1] += elapsed
+            acc[2] = max(acc[2], elapsed)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            stage: {"count": n, "total_s": total, "mean_ms": 1000 * total / n, "max_ms": 1000 * peak}
+            for stage, (n, total, peak) in self._stages.items()
+        }
 
 # -------------------------
 # Memory Agent (stateful)
 # -------------------------
 @ray.remote
 class MemoryAgent:
-    def __init__(self, name: str, embed_dim: int = 64):
+    def __init__(self, name: str, embed_dim: int = 64, index: str = None, index_params: Dict[str, Any] = None,
+                 persist_path: str = None):
         self.name = name
         self.id = str(uuid.uuid4())
-        self.store: List[Dict[str, Any]] = []  # list of dicts: {text, vec, ts}
-        self.embedder = SimpleEmbedder(dim=embed_dim, seed=hash(self.id) & 0xffff)
+        # vectors live in one pre-normalized float32 matrix; the record of row i
+        # is a slotted MemoryEntry(text, ts, meta). With persist_path the matrix
+        # is a memory-mapped file that is reopened, not rebuilt, on restart.
+        if persist_path:
+            self.store = MmapVectorStore(persist_path, dim=embed_dim, record_type=MemoryEntry)
+        else:
+            self.store = VectorStore(dim=embed_dim)
+        # optional approximate index ("ivf", "hnsw", ...) keyed by row; None means exact search
+        self.index_kind, self.index_params = index, index_params or {}
+        self.index = create_index(index, embed_dim, **self.index_params) if index else None
+        if self.index is not None and len(self.store):
+            # a reopened persistent store may hold tombstones; only live rows are indexed
+            live = self.store.live_rows()
+            self.index.add(live, self.store.vectors[live])
+        # a shared seed keeps every memory shard's vectors comparable
+        self.embedder = SimpleEmbedder(dim=embed_dim)
+        self.timer = StageTimer()
         print(f"[MemoryAgent:{self.name}] initialized with id {self.id}")
 
-    def add(self, text: str, metadata: Dict[str, Any] = None):
-        vec = self.embedder.text_to_vector(text)
-        entry = {"text": text, "vec": vec, "ts": time.time(), "meta": metadata or {}}
-        self.store.append(entry)
+    def add(self, text: str, metadata: Dict[str, Any] = None, trace_context: Dict[str, Any] = None):
+        with tracing.span("MemoryAgent.add", parent=trace_context, agent=self.name):
+            with self.timer.time("embed"):
+                vec = self.embedder.text_to_vector(text)
+            with self.timer.time("add"):
+                row = self.store.add(vec, MemoryEntry(text, time.time(), metadata or {}))
+                if self.index is not None:
+                    self.index.add([row], vec)
         return {"status": "ok", "stored": text}
 
-    def query(self, text: str, top_k: int = 3):
-        if not self.store:
-            return []
-        qvec = self.embedder.text_to_vector(text)
-        # compute cosine similarity
-        sims = []
-        for item in self.store:
-            sim = float(np.dot(qvec, item["vec"]) / ((np.linalg.norm(item["vec"]) + 1e-8)))
-            sims.append(sim)
-        idx = np.argsort(sims)[::-1][:top_k]
-        results = [{"text": self.store[i]["text"], "score": float(sims[i]), "meta": self.store[i]["meta"]} for i in idx]
-        return results
-
-    def dump(self):
-        # return raw memory contents (for inspection)
-        return [{"text": x["text"], "ts": x["ts"], "meta": x["meta"]} for x in self.store]
+    def _insert(self, records: List[MemoryEntry]):
+        # one embedding batch, one store append and one index update for all records
+        if records:
+            with self.timer.time("embed"):
+                vecs = self.embedder.embed_batch([r.text for r in records])
+            with self.timer.time("add"):
+                rows = self.store.add_many(vecs, records)
+                if self.index is not None:
+                    self.index.add(np.asarray(rows), vecs)
+        return {"status": "ok", "stored": len(records)}
+
+    def add_batch(self, texts: List[str], metadata: Any = None):
+        """
+        Add many texts in one vectorized call. ``metadata`` is either one dict
+        shared by all texts or a list with one dict per text.
+        """
+        if metadata is None or isinstance(metadata, dict):
+            metadata = [metadata] * len(texts)
+        if len(metadata) != len(texts):
+            raise ValueError("metadata must have one entry per text.")
+        now = time.time()
+        return self._insert([MemoryEntry(t, now, m or {}) for t, m in zip(texts, metadata)])
+
+    def import_entries(self, entries: Any):
+        """
+        Insert entries exported by another agent (a ``dump`` batch, or any
+        iterable of ``{text, ts, meta}`` mappings), keeping their timestamps.
+        """
+        return self._insert([MemoryEntry(e["text"], e["ts"], e["meta"]) for e in entries])
+
+    def remove_texts(self, texts: List[str]):
+        """Delete every memory whose text is in ``texts``; returns how many were removed."""
+        targets = set(texts)
+        removed = 0
+        # walk backwards so the rows swapped into freed slots have already been checked
+        for row in range(len(self.store) - 1, -1, -1):
+            entry = self.store.records[row]
+            if entry is None or entry.text not in targets:
+                continue
+            moved = self.store.remove(row)
+            if self.index is not None:
+                self.index.remove([row] if moved is None else [row, moved])
+                if moved is not None:
+                    self.index.add([row], self.store.get(row))
+            removed += 1
+        if self.store.maybe_compact() and self.index is not None:
+            # compaction renumbers rows (and reopens the store), so the row-keyed
+            # index is rebuilt from the live rows of the compacted store
+            live = self.store.live_rows()
+            self.index = create_index(self.index_kind, self.store.dim, **self.index_params)
+            self.index.add(live, self.store.vectors[live])
+        return {"status": "ok", "removed": removed}
+
+    def size(self) -> int:
+        return len(self.store.live_rows())
+
+    def query(self, text: str, top_k: int = 3, trace_context: Dict[str, Any] = None):
+        with tracing.span("MemoryAgent.query", parent=trace_context, agent=self.name):
+            return self.query_many([text], top_k=top_k)[0]
+
+    def add_and_query(self, text: str, metadata: Dict[str, Any] = None, top_k: int = 3,
+                      trace_context: Dict[str, Any] = None):
+        """Store ``text`` and return its top_k related memories in one round trip."""
+        with tracing.span("MemoryAgent.add_and_query", parent=trace_context, agent=self.name):
+            self.add(text, metadata)
+            return self.query(text, top_k=top_k)
+
+    def query_many(self, texts: List[str], top_k: int = 3):
+        """
+        Retrieve the top_k most similar memories for each text with a single
+        matrix product over the whole store.
+        """
+        if not self.store.records:
+            return [[] for _ in texts]
+        with self.timer.time("embed"):
+            qvecs = self.embedder.embed_batch(texts)
+        return self.query_vectors(qvecs, top_k=top_k)
+
+    def query_vectors(self, qvecs: np.ndarray, top_k: int = 3):
+        """
+        Like query_many but for precomputed (n, dim) query vectors. Passing a
+        ray.put reference makes Ray hand this actor a zero-copy, read-only view
+        of the array from the object store, shared by every shard queried.
+        """
+        qvecs = np.atleast_2d(qvecs)
+        if not self.store.records:
+            return [[] for _ in qvecs]
+        with self.timer.time("query"):
+            if self.index is not None:
+                hits = self.index.search_many(qvecs, k=top_k)
+                rows, scores = [h[0] for h in hits], [h[1] for h in hits]
+            else:
+                rows, scores = self.store.search_many(qvecs, top_k=top_k)
+        # removed rows of a persistent store score -inf and have no entry
+        return [
+            [{"text": self.store.records[i].text, "score": float(s), "meta": self.store.records[i].meta}
+             for i, s in zip(row_ids, row_scores) if np.isfinite(s) and self.store.records[i] is not None]
+            for row_ids, row_scores in zip(rows, scores)
+        ]
+
+    def export_vectors(self):
+        """
+        Return ``(texts, vectors)`` for the live memories. The float32 matrix
+        travels through the object store without pickling, and the caller's
+        ray.get maps it zero-copy.
+        """
+        live = self.store.live_rows()
+        return [self.store.records[i].text for i in live], np.ascontiguousarray(self.store.vectors[live])
+
+    def flush(self):
+        # make a persistent store durable; no-op for in-memory agents
+        if isinstance(self.store, MmapVectorStore):
+            self.store.flush()
+        return {"status": "ok", "entries": self.size()}
+
+    def stats(self):
+        return self.timer.summary()
+
+    def reset_stats(self):
+        self.timer.reset()
+
+    def span_metrics(self):
+        return tracing.span_metrics()
+
+    def dump(self) -> RecordBatch:
+        # return raw memory contents as a columnar batch (for inspection and rebalancing)
+        return RecordBatch.from_records(MemoryEntry, (x for x in self.store.records if x is not None))
 
 # -------------------------
 # Reasoner Agent
 # -------------------------
 @ray.remote
 class ReasonerAgent:
-    def __init__(self, name: str, memory_agent: ray.actor.ActorHandle):
+    """
+    Async actor: observations are handled concurrently, up to ``max_in_flight``
+    at a time, and waiting on memory never blocks the actor's event loop.
+
+    ``memory`` is either a ShardedMemory client or a single MemoryAgent handle.
+    """
+    def __init__(self, name: str, memory: Any, max_in_flight: int = 32, top_k: int = 3):
         self.name = name
-        self.memory_agent = memory_agent
-        print(f"[ReasonerAgent:{self.name}] created and linked to memory agent {memory_agent}")
+        self.memory = memory
+        self.top_k = top_k
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self.timer = StageTimer()
+        print(f"[ReasonerAgent:{self.name}] created and linked to memory {memory}")
+
+    def set_memory(self, memory: Any):
+        """Switch to another memory client, e.g. after shards were added."""
+        self.memory = memory
+        return {"status": "ok"}
+
+    async def _add_and_query(self, observation: str, top_k: int = 3):
+        metadata = {"source": self.name}
+        trace_context = tracing.inject()
+        if isinstance(self.memory, ShardedMemory):
+            return await self.memory.add_and_query(observation, metadata, top_k=top_k, trace_context=trace_context)
+        return await self.memory.add_and_query.remote(observation, metadata, top_k=top_k,
+                                                      trace_context=trace_context)
 
-    def perceive_and_act(self, observation: str):
+    async def perceive_and_act(self, observation: str, trace_context: Dict[str, Any] = None):
         """
         Perceive: store observation in memory
         Act: retrieve related memories and "reason" to produce an action (text)
         """
-        # Store observation
-        ray.get(self.memory_agent.add.remote(observation, {"source": self.name}))
-        # Query memory for related context
-        related = ray.get(self.memory_agent.query.remote(observation, top_k=3))
-        # Very simple "reasoning": summarize by concatenation / scoring
-        introspection = f"Reasoner({self.name}) got observation: '{observation}'"
-        if related:
-            introspection += " | related memories:\n"
-            for r in related:
-                introspection += f"  - ({r['score']:.3f}) {r['text']}\n"
-        # Create an "action" (for demo purpose, return a planned step)
-        action = f"[PLAN by {self.name}] based on '{observation}' -> propose: '{self._propose(observation, related)}'"
+        with tracing.span("ReasonerAgent.perceive_and_act", parent=trace_context, agent=self.name):
+            with tracing.span("queue"):
+                await self._slots.acquire()
+            try:
+                # Store observation and query memory for related context in one round trip
+                with self.timer.time("memory"):
+                    related = await self._add_and_query(observation, top_k=self.top_k)
+            finally:
+                self._slots.release()
+            # Very simple "reasoning": summarize by concatenation / scoring
+            introspection = f"Reasoner({self.name}) got observation: '{observation}'"
+            if related:
+                introspection += " | related memories:\n"
+                for r in related:
+                    introspection += f"  - ({r['score']:.3f}) {r['text']}\n"
+            # Create an "action" (for demo purpose, return a planned step)
+            action = f"[PLAN by {self.name}] based on '{observation}' -> propose: '{self._propose(observation, related)}'"
         return {"introspection": introspection, "action": action, "related": related}
 
+    def stats(self):
+        return self.timer.summary()
+
+    def reset_stats(self):
+        self.timer.reset()
+
+    def span_metrics(self):
+        return tracing.span_metrics()
+
     def _propose(self, observation: str, related: List[Dict[str, Any]]):
         # mock proposal logic: choose strongest related memory or propose new idea
         if related and related[0]["score"] > 0.1:
@@ -114,80 +374,193 @@ class ReasonerAgent:
 # -------------------------
 @ray.remote
 class EvaluatorAgent:
-    def __init__(self, name: str):
+    def __init__(self, name: str, scorer: Scorer = None):
         self.name = name
+        # default: the toy heuristic (shorter is better, 'investigate' adds novelty)
+        self.scorer = scorer or HeuristicScorer()
+        self.timer = StageTimer()
         print(f"[EvaluatorAgent:{self.name}] ready")
 
-    def score_actions(self, actions: List[str]) -> List[Dict[str, Any]]:
+    def score_actions(self, actions: List[str], goal: str = None, top_k: int = None,
+                      trace_context: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """
-        Score actions on a toy heuristic: shorter is better, presence of keyword 'investigate' is higher novelty.
-        Returns list with {action, score}
+        Score the whole batch of actions with the configured scorer.
+        Returns list with {action, score}, best first (only the best top_k if given).
         """
-        scored = []
-        for a in actions:
-            score = 1.0 / (len(a) + 1)
-            if "investigate" in a:
-                score += 0.2
-            scored.append({"action": a, "score": float(score)})
-        # sort descending by score
-        scored.sort(key=lambda x: x["score"], reverse=True)
-        return scored
+        if not actions:
+            return []
+        with tracing.span("EvaluatorAgent.score_actions", parent=trace_context, agent=self.name,
+                          actions=len(actions)):
+            with self.timer.time("score"):
+                return rank(actions, self.scorer.score(actions, goal), top_k)
+
+    def stats(self):
+        return self.timer.summary()
+
+    def reset_stats(self):
+        self.timer.reset()
+
+    def span_metrics(self):
+        return tracing.span_metrics()
 
 # -------------------------
 # Meta-Agent (coordinator)
 # -------------------------
 @ray.remote
 class MetaAgent:
-    def __init__(self, name: str, reasoners: List[ray.actor.ActorHandle], evaluator: ray.actor.ActorHandle):
+    def __init__(self, name: str, reasoners: List[ray.actor.ActorHandle], evaluator: Any):
+        # evaluator: an EvaluatorAgent handle or an EvaluatorPool of replicas
         self.name = name
         self.reasoners = reasoners
         self.evaluator = evaluator
         print(f"[MetaAgent:{self.name}] initialized with {len(reasoners)} reasoner(s)")
 
-    def coordinate_task(self, task: str):
+    def _score(self, actions: List[str], task: str, top_k: int = None):
+        trace_context = tracing.inject()
+        if isinstance(self.evaluator, EvaluatorPool):
+            return self.evaluator.score_actions(actions, goal=task, top_k=top_k, trace_context=trace_context)
+        return self.evaluator.score_actions.remote(actions, goal=task, top_k=top_k, trace_context=trace_context)
+
+    def span_metrics(self):
+        return tracing.span_metrics()
+
+    def coordinate_task(self, task: str, quorum: int = None, timeout: float = None, result_format: str = "full",
+                        top_k: int = None):
         """
         Broadcast task to all reasoners, collect proposals, ask evaluator to rank, then pick winner.
+
+        Proposals are gathered with ray.wait as they arrive. Collection stops once
+        ``quorum`` reasoners (default: all of them) have answered or ``timeout``
+        seconds (default: Config.AGENT_TIMEOUT) have passed, whichever comes
+        first; reasoners still running are cancelled and the task is decided on
+        the proposals received so far.
+
+        With ``top_k`` the evaluator returns only the best k scored actions
+        (default: every proposal, ranked).
+
+        ``result_format`` controls how much is sent back to the caller:
+            "full"    every introspection, scored action and raw result by value
+            "compact" chosen action plus actions and a float32 NumPy score array
+                      (no introspections or raw results)
+            "refs"    as "compact", plus ObjectRefs to the reasoners' raw results
+                      (which already live in the object store) and to the
+                      scored list, fetched only if the caller asks for them
         """
-        # 1) ask reasoners to perceive and act
-        futures = [r.perceive_and_act.remote(task) for r in self.reasoners]
-        results = ray.get(futures)
+        if result_format not in ("full", "compact", "refs"):
+            raise ValueError(f"Unknown result_format '{result_format}'.")
+        with tracing.span("MetaAgent.coordinate_task", agent=self.name, reasoners=len(self.reasoners)) as span:
+            result = self._coordinate(task, quorum, timeout, result_format, top_k)
+            span.set_attribute("responded", len(result["responded"]))
+            span.set_attribute("partial", result["partial"])
+        return result
+
+    def _coordinate(self, task: str, quorum: int, timeout: float, result_format: str, top_k: int):
+        n = len(self.reasoners)
+        quorum = n if quorum is None else max(1, min(quorum, n))
+        timeout = Config.AGENT_TIMEOUT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        # 1) ask reasoners to perceive and act, taking answers as they complete
+        trace_context = tracing.inject()
+        pending = {r.perceive_and_act.remote(task, trace_context=trace_context): i
+                   for i, r in enumerate(self.reasoners)}
+        results, result_refs, responded, failed = [], [], [], []
+        with tracing.span("collect_proposals"):
+            while pending and len(responded) < quorum:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                ready, _ = ray.wait(list(pending), num_returns=1, timeout=remaining)
+                for ref in ready:
+                    i = pending.pop(ref)
+                    try:
+                        results.append(ray.get(ref))
+                        result_refs.append(ref)
+                        responded.append(i)
+                    except ray.exceptions.RayError:
+                        failed.append(i)
 
-        # 2) collect actions and introspections
+        # 2) cancel stragglers so they stop using reasoner capacity
+        timed_out = sorted(pending.values())
+        for ref in pending:
+            try:
+                ray.cancel(ref)
+            except Exception:
+                pass
+
+        # 3) collect actions and introspections
         actions = [res["action"] for res in results]
         introspections = [res["introspection"] for res in results]
 
-        # 3) evaluate actions
-        scored = ray.get(self.evaluator.score_actions.remote(actions))
+        # 4) evaluate actions against the task
+        with tracing.span("evaluate", actions=len(actions)):
+            scored_ref = self._score(actions, task, top_k) if actions else None
+            scored = ray.get(scored_ref) if scored_ref is not None else []
 
-        # 4) choose top action
+        # 5) choose top action
         top = scored[0] if scored else None
 
-        return {
+        status = {
+            "partial": len(responded) < n,
+            "responded": responded,
+            "failed": failed,
+            "timed_out": timed_out,
+        }
+        if result_format == "full":
+            return {
+                "task": task,
+                "introspection": introspections,
+                "actions_scored": scored,
+                "chosen": top,
+                "raw_results": results,
+                **status,
+            }
+        compact = {
             "task": task,
-            "introspection": introspections,
-            "actions_scored": scored,
             "chosen": top,
-            "raw_results": results
+            "actions": [s["action"] for s in scored],
+            "scores": np.array([s["score"] for s in scored], dtype=np.float32),
+            **status,
         }
+        if result_format == "refs":
+            compact["raw_results"] = result_refs
+            compact["actions_scored"] = scored_ref
+        return compact
 
 # -------------------------
 # Example run / demo
 # -------------------------
-def demo_run(n_reasoners: int = 3):
-    print("\n=== Starting Ray (demo) ===")
-    # initialize Ray - use local if already running
+def init_ray():
+    """
+    Initialize Ray (reusing a running instance) with the repository root on
+    the workers' import path so actors can use the ``src`` package, including
+    the sibling modules of this file (``src.ray.memory_service``, ...).
+    """
+    pythonpath = os.pathsep.join(p for p in (REPO_ROOT, os.environ.get("PYTHONPATH")) if p)
+    env_vars = {"PYTHONPATH": pythonpath}
+    # forward the tracing settings so every actor process traces the same way
+    env_vars.update({k: v for k, v in os.environ.items() if k.startswith("COGNITION_TRACE_")})
+    runtime_env = {"env_vars": env_vars}
     try:
-        ray.init(ignore_reinit_error=True)
+        ray.init(ignore_reinit_error=True, runtime_env=runtime_env)
     except Exception as e:
         print("[Warning] ray.init() raised:", e)
-        ray.init()
+        ray.init(runtime_env=runtime_env)
+
+
+def demo_run(n_reasoners: int = 3, n_shards: int = 3, replicas: int = 1):
+    print("\n=== Starting Ray (demo) ===")
+    # initialize Ray - use local if already running
+    init_ray()
 
     print("[main] Ray initialized.")
 
-    # Create memory agents and reasoners
-    memory_agents = [MemoryAgent.remote(name=f"Mem-{i}") for i in range(n_reasoners)]
-    reasoners = [ReasonerAgent.remote(name=f"R-{i}", memory_agent=memory_agents[i]) for i in range(n_reasoners)]
-    evaluator = EvaluatorAgent.remote(name="Eval-1")
+    # Create the sharded memory service and reasoners sharing it
+    memory = ShardedMemory(lambda name: MemoryAgent.remote(name=name), n_shards=n_shards, replicas=replicas)
+    reasoners = [ReasonerAgent.remote(name=f"R-{i}", memory=memory) for i in range(n_reasoners)]
+    # Evaluator replicas behind a load balancer: heuristic plus similarity to the task
+    scorer = CompositeScorer([(HeuristicScorer(), 1.0), (GoalSimilarityScorer(SimpleEmbedder()), 0.1)])
+    evaluator = EvaluatorPool([EvaluatorAgent.remote(name=f"Eval-{i}", scorer=scorer) for i in range(2)])
     meta = MetaAgent.remote(name="Meta-1", reasoners=reasoners, evaluator=evaluator)
 
     # Seed some memories in each memory agent to simulate prior knowledge
@@ -198,10 +571,8 @@ def demo_run(n_reasoners: int = 3):
         "Investigate anomalies in the telemetry pipeline.",
         "Autoscaling may increase cost but reduces latency peaks."
     ]
-    # Distribute seeds across memory agents
-    for i, mem in enumerate(memory_agents):
-        for t in seed_texts[i::len(memory_agents)]:
-            ray.get(mem.add.remote(t, {"seed_for": f"mem-{i}"}))
+    # Seeds are routed to their shards by the memory service, one batch per shard
+    ray.get(memory.add_batch(seed_texts, {"seed": True}))
 
     # Main coordination tasks
     tasks = [
@@ -223,11 +594,16 @@ def demo_run(n_reasoners: int = 3):
         print(result["chosen"])
         time.sleep(0.5)
 
+    # Grow the service by one shard and hand the new routing to the reasoners
+    print("\n=== Adding a memory shard ===")
+    print(memory.add_shard())
+    ray.get([r.set_memory.remote(memory) for r in reasoners])
+
     # Inspect memory contents
     print("\n=== Inspecting memories ===")
-    for i, mem in enumerate(memory_agents):
-        mem_dump = ray.get(mem.dump.remote())
-        print(f"[Memory {i}] entries: {len(mem_dump)}")
+    for shard_id, replicas_ in memory.shards.items():
+        mem_dump = ray.get(replicas_[0].dump.remote())
+        print(f"[Memory {shard_id}] entries: {len(mem_dump)}")
         for e in mem_dump:
             print("  -", e["text"])
 
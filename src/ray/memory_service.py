@@ -0,0 +1,182 @@
+"""
+memory_service.py
+
+Client-side routing for a sharded, replicated memory built from ``MemoryAgent``
+actors (see main.py). Texts are placed on shards with a consistent-hash ring,
+every write goes to all replicas of its shard, reads rotate over the replicas,
+and queries are scattered to every shard and merged into one top-k list.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import heapq
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import ray
+
+
+def stable_hash(key: str) -> int:
+    """64-bit hash that is the same in every process (unlike the salted built-in ``hash``)."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent-hash ring with ``vnodes`` virtual nodes per shard, so adding a
+    shard moves only about 1/n of the keys, taken evenly from every other shard.
+    """
+    def __init__(self, vnodes: int = 64):
+        self.vnodes = vnodes
+        self._points: List[int] = []
+        self._owners: List[str] = []
+
+    def add(self, shard_id: str):
+        for v in range(self.vnodes):
+            point = stable_hash(f"{shard_id}#{v}")
+            pos = bisect.bisect(self._points, point)
+            self._points.insert(pos, point)
+            self._owners.insert(pos, shard_id)
+
+    def remove(self, shard_id: str):
+        keep = [(p, o) for p, o in zip(self._points, self._owners) if o != shard_id]
+        self._points = [p for p, _ in keep]
+        self._owners = [o for _, o in keep]
+
+    def node_for(self, key: str) -> str:
+        if not self._points:
+            raise ValueError("The hash ring has no shards.")
+        pos = bisect.bisect(self._points, stable_hash(key)) % len(self._points)
+        return self._owners[pos]
+
+
+class ShardedMemory:
+    """
+    Memory service spread over ``n_shards`` groups of ``replicas`` MemoryAgent actors.
+
+    ``shard_factory(name)`` must return a new MemoryAgent actor handle. The
+    object is a lightweight client (actor handles plus the ring) and can be
+    passed to other actors; after ``add_shard`` hand the updated client to them
+    again so they route with the new ring.
+    """
+    def __init__(self, shard_factory: Callable[[str], Any], n_shards: int = 4, replicas: int = 1, vnodes: int = 64):
+        if n_shards < 1 or replicas < 1:
+            raise ValueError("n_shards and replicas must be at least 1.")
+        self.shard_factory = shard_factory
+        self.replicas = replicas
+        self.ring = HashRing(vnodes)
+        self.shards: Dict[str, List[Any]] = {}
+        self._next_replica: Dict[str, int] = {}
+        for _ in range(n_shards):
+            self._create_shard()
+
+    def _create_shard(self) -> str:
+        shard_id = f"shard-{len(self.shards)}"
+        while shard_id in self.shards:
+            shard_id += "'"
+        self.shards[shard_id] = [self.shard_factory(f"{shard_id}/r{j}") for j in range(self.replicas)]
+        self._next_replica[shard_id] = 0
+        self.ring.add(shard_id)
+        return shard_id
+
+    def shard_for(self, text: str) -> str:
+        return self.ring.node_for(text)
+
+    def _reader(self, shard_id: str):
+        """Pick the next replica of a shard to read from (round robin)."""
+        replicas = self.shards[shard_id]
+        i = self._next_replica[shard_id]
+        self._next_replica[shard_id] = (i + 1) % len(replicas)
+        return replicas[i]
+
+    # ---- writes ----
+    def add(self, text: str, metadata: Dict[str, Any] = None) -> List[ray.ObjectRef]:
+        """Write ``text`` to every replica of its shard; returns the refs to wait on."""
+        return [r.add.remote(text, metadata) for r in self.shards[self.shard_for(text)]]
+
+    def add_batch(self, texts: List[str], metadata: Any = None) -> List[ray.ObjectRef]:
+        """
+        Write many texts with one ``add_batch`` call per replica of each shard
+        they route to. ``metadata`` is one dict for all texts or one per text.
+        Returns the refs to wait on.
+        """
+        if metadata is None or isinstance(metadata, dict):
+            metadata = [metadata] * len(texts)
+        groups: Dict[str, tuple] = {}
+        for text, meta in zip(texts, metadata):
+            group = groups.setdefault(self.shard_for(text), ([], []))
+            group[0].append(text)
+            group[1].append(meta)
+        return [r.add_batch.remote(t, m) for sid, (t, m) in groups.items() for r in self.shards[sid]]
+
+    # ---- reads ----
+    @staticmethod
+    def merge(partials: List[List[Dict[str, Any]]], top_k: int) -> List[Dict[str, Any]]:
+        """Merge per-shard top-k lists into the global top-k."""
+        return heapq.nlargest(top_k, (hit for part in partials for hit in part), key=lambda h: h["score"])
+
+    def query_refs(self, text: str, top_k: int = 3) -> List[ray.ObjectRef]:
+        """Scatter a query to one replica of every shard."""
+        return [self._reader(s).query.remote(text, top_k=top_k) for s in self.shards]
+
+    def query(self, text: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        return self.merge(ray.get(self.query_refs(text, top_k)), top_k)
+
+    def query_vectors(self, vectors: np.ndarray, top_k: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Top-k memories for each row of ``vectors``. The matrix is put in the
+        object store once and every shard reads it zero-copy, instead of it
+        being pickled into each shard's request.
+        """
+        ref = ray.put(np.ascontiguousarray(np.atleast_2d(vectors), dtype=np.float32))
+        partials = ray.get([self._reader(s).query_vectors.remote(ref, top_k=top_k) for s in self.shards])
+        return [self.merge(per_query, top_k) for per_query in zip(*partials)]
+
+    async def add_and_query(self, text: str, metadata: Dict[str, Any] = None, top_k: int = 3,
+                            trace_context: Dict[str, Any] = None):
+        """
+        Store ``text`` and return its top_k related memories across all shards.
+        The owning shard's reader does the write and its part of the query in
+        one call, so the new memory is visible to the query; the other replica
+        writes and shard queries run concurrently with it. ``trace_context``
+        (from ``tracing.inject``) is passed on to every shard call.
+        """
+        owner = self.shard_for(text)
+        reader = self._reader(owner)
+        reads = [reader.add_and_query.remote(text, metadata, top_k=top_k, trace_context=trace_context)]
+        reads += [self._reader(s).query.remote(text, top_k=top_k, trace_context=trace_context)
+                  for s in self.shards if s != owner]
+        writes = [r.add.remote(text, metadata, trace_context=trace_context)
+                  for r in self.shards[owner] if r is not reader]
+        results = await asyncio.gather(*reads, *writes)
+        return self.merge(results[: len(reads)], top_k)
+
+    # ---- membership ----
+    def add_shard(self) -> Dict[str, Any]:
+        """
+        Add a shard and move to it the memories the ring now assigns to it.
+
+        Returns:
+            ``{"shard": id, "moved": count}``.
+        """
+        old_ids = list(self.shards)
+        shard_id = self._create_shard()
+        moved = 0
+        for sid in old_ids:
+            entries = ray.get(self.shards[sid][0].dump.remote())
+            moving = entries.take([i for i, text in enumerate(entries.column("text"))
+                                   if self.shard_for(text) == shard_id])
+            if not len(moving):
+                continue
+            # the batch travels as a few flat columns, not one object per entry
+            ray.get([r.import_entries.remote(moving) for r in self.shards[shard_id]])
+            texts = sorted(set(moving.column("text")))
+            ray.get([r.remove_texts.remote(texts) for r in self.shards[sid]])
+            moved += len(moving)
+        return {"shard": shard_id, "moved": moved}
+
+    def stats(self) -> Dict[str, int]:
+        """Number of entries held by each shard (first replica)."""
+        counts = ray.get([replicas[0].size.remote() for replicas in self.shards.values()])
+        return dict(zip(self.shards, counts))
@@ -0,0 +1,111 @@
+"""
+scoring.py
+
+Batch scorers for EvaluatorAgent (see main.py) and a client-side load
+balancer over several evaluator replicas.
+
+A scorer takes a whole list of candidate actions (and optionally the goal /
+task text) and returns one float per action as a NumPy array, so features are
+computed with array operations rather than per-string Python loops.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import ray
+
+from src.models.vector_store import top_k_indices
+
+
+class Scorer:
+    def score(self, actions: Sequence[str], goal: str = None) -> np.ndarray:
+        """Return a float array with one score per action (higher is better)."""
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+
+class HeuristicScorer(Scorer):
+    """
+    The toy heuristic, vectorized: shorter actions score higher
+    (``1 / (len + 1)``) and each keyword found adds its bonus.
+    """
+    def __init__(self, keywords: Dict[str, float] = None):
+        self.keywords = {"investigate": 0.2} if keywords is None else keywords
+
+    def score(self, actions: Sequence[str], goal: str = None) -> np.ndarray:
+        arr = np.asarray(actions, dtype=str)
+        scores = 1.0 / (np.char.str_len(arr) + 1.0)
+        for keyword, bonus in self.keywords.items():
+            scores += bonus * (np.char.find(arr, keyword) >= 0)
+        return scores
+
+
+class GoalSimilarityScorer(Scorer):
+    """
+    Cosine similarity between each action and the goal, embedded in one batch.
+
+    Fixed ``goals`` can be given up front (their vectors are computed once; an
+    action scores its best match); otherwise the ``goal`` passed to ``score``
+    is used. ``embedder`` needs an ``embed_batch(texts)`` returning unit vectors.
+    """
+    def __init__(self, embedder: Any, goals: Sequence[str] = None):
+        self.embedder = embedder
+        self.goal_vectors = embedder.embed_batch(list(goals)) if goals else None
+
+    def score(self, actions: Sequence[str], goal: str = None) -> np.ndarray:
+        goal_vectors = self.goal_vectors
+        if goal_vectors is None:
+            if goal is None:
+                return np.zeros(len(actions))
+            goal_vectors = self.embedder.embed_batch([goal])
+        return (self.embedder.embed_batch(list(actions)) @ goal_vectors.T).max(axis=1).astype(np.float64)
+
+
+class CompositeScorer(Scorer):
+    """Weighted sum of other scorers: ``CompositeScorer([(HeuristicScorer(), 1.0), (sim, 0.5)])``."""
+    def __init__(self, parts: Sequence[Tuple[Scorer, float]]):
+        self.parts = list(parts)
+
+    def score(self, actions: Sequence[str], goal: str = None) -> np.ndarray:
+        total = np.zeros(len(actions))
+        for scorer, weight in self.parts:
+            total += weight * scorer.score(actions, goal)
+        return total
+
+
+def rank(actions: Sequence[str], scores: np.ndarray, top_k: int = None) -> List[Dict[str, Any]]:
+    """Return ``[{action, score}]`` best first; with ``top_k`` only the best k are selected and sorted."""
+    order = top_k_indices(scores, len(actions) if top_k is None else top_k)
+    return [{"action": actions[i], "score": float(scores[i])} for i in order]
+
+
+class EvaluatorPool:
+    """
+    Client-side load balancer over EvaluatorAgent replicas: each request goes to
+    the replica with the fewest calls from this client still outstanding.
+    Like ShardedMemory, it is a plain object that can be passed to actors.
+    """
+    def __init__(self, replicas: List[Any]):
+        if not replicas:
+            raise ValueError("EvaluatorPool needs at least one replica.")
+        self.replicas = replicas
+        self._outstanding: List[List[ray.ObjectRef]] = [[] for _ in replicas]
+
+    def _pick(self) -> int:
+        for i, refs in enumerate(self._outstanding):
+            if refs:
+                _, self._outstanding[i] = ray.wait(refs, num_returns=len(refs), timeout=0)
+        return min(range(len(self.replicas)), key=lambda i: len(self._outstanding[i]))
+
+    def score_actions(self, actions: List[str], goal: str = None, top_k: int = None,
+                      trace_context: Dict[str, Any] = None) -> ray.ObjectRef:
+        i = self._pick()
+        ref = self.replicas[i].score_actions.remote(actions, goal=goal, top_k=top_k, trace_context=trace_context)
+        self._outstanding[i].append(ref)
+        return ref
+
+    def __getstate__(self):
+        # outstanding refs are local bookkeeping; a copy sent to another actor starts fresh
+        return {"replicas": self.replicas}
+
+    def __setstate__(self, state):
+        self.__init__(state["replicas"])
@@ -0,0 +1,19 @@
+import os
+import sys
+
+# the tests import the package as ``src``, as the Ray scripts do
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def ray_cluster():
+    """A local Ray cluster whose workers can import ``src``; tests using it are skipped without Ray."""
+    ray = pytest.importorskip("ray")
+    ray.init(num_cpus=4, include_dashboard=False, logging_level="ERROR", ignore_reinit_error=True,
+             runtime_env={"env_vars": {"PYTHONPATH": REPO_ROOT}})
+    yield ray
+    ray.shutdown()
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from src.models.ann import ExactIndex, HNSWIndex, IVFIndex, create_index, recall_at_k
+
+DIM = 16
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.RandomState(0)
+    return rng.randn(2000, DIM).astype(np.float32), rng.randn(30, DIM).astype(np.float32)
+
+
+def _recall(index, ids, vectors, queries, k=10):
+    exact = ExactIndex(DIM)
+    exact.add(ids, vectors)
+    return recall_at_k([index.search(q, k)[0] for q in queries], [exact.search(q, k)[0] for q in queries])
+
+
+def test_create_index_rejects_unknown_kinds():
+    assert isinstance(create_index("hnsw", DIM), HNSWIndex)
+    with pytest.raises(ValueError):
+        create_index("lsh", DIM)
+
+
+def test_ivf_trains_itself_and_can_be_retrained(data):
+    vectors, queries = data
+    index = IVFIndex(DIM, nlist=8, nprobe=8, train_size=500)
+    index.add(np.arange(1000), vectors[:1000])
+    assert index.is_trained and len(index) == 1000
+    index.add(np.arange(1000, 2000), vectors[1000:])
+    index.remove(range(100))
+    index.train()
+    assert len(index) == 1900
+    assert _recall(index, np.arange(100, 2000), vectors[100:], queries) == 1.0
+
+
+def test_ivf_training_needs_enough_vectors():
+    index = IVFIndex(DIM, nlist=8)
+    index.add(np.arange(4), np.eye(4, DIM, dtype=np.float32))
+    with pytest.raises(ValueError):
+        index.train()
+
+
+def test_hnsw_recall_and_removal(data):
+    vectors, queries = data
+    index = HNSWIndex(DIM)
+    index.add(np.arange(2000), vectors)
+    assert _recall(index, np.arange(2000), vectors, queries) > 0.9
+    index.remove(range(0, 2000, 2))
+    hits = index.search(queries[0], 10)[0]
+    assert len(hits) == 10 and all(i % 2 for i in hits.tolist())
+
+
+def test_hnsw_rebuilds_once_most_nodes_are_removed(data):
+    vectors, queries = data
+    index = HNSWIndex(DIM, rebuild_ratio=0.5)
+    index.add(np.arange(1000), vectors[:1000])
+    index.remove(range(800))
+    assert len(index) == 200 and len(index._node_ids) == 200
+    for _ in range(3):
+        index.add(np.arange(800, 1000), vectors[800:1000])
+    assert len(index._node_ids) <= 2 * len(index)
+    assert _recall(index, np.arange(800, 1000), vectors[800:1000], queries) > 0.9
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from src.core.dag import DAG
+
+
+def _dag(n):
+    dag = DAG()
+    for i in range(n):
+        dag.add_node(i, {"id": i})
+    return dag
+
+
+def _assert_consistent(dag):
+    order = dag.topological_sort()
+    position = {node: i for i, node in enumerate(order)}
+    assert sorted(order) == sorted(dag.nodes)
+    for from_node, targets in dag.edges.items():
+        for to_node in targets:
+            assert position[from_node] < position[to_node]
+    _, depth = dag.kahn_sort()
+    assert {node: dag.depth(node) for node in dag.nodes} == depth
+    expected = {}
+    for node, d in depth.items():
+        expected.setdefault(d, set()).add(node)
+    assert [set(level) for level in dag.levels()] == [expected[d] for d in range(len(expected))]
+    assert dag.num_levels() == len(expected)
+
+
+def test_cycle_is_rejected_and_leaves_the_graph_unchanged():
+    dag = _dag(4)
+    for edge in ((0, 1), (1, 2), (2, 3)):
+        dag.add_edge(*edge)
+    edges = {node: list(targets) for node, targets in dag.edges.items()}
+    order, levels = dag.topological_sort(), dag.levels()
+    for from_node, to_node in ((3, 0), (2, 1), (1, 1)):
+        with pytest.raises(ValueError):
+            dag.add_edge(from_node, to_node)
+    assert dag.edges == edges
+    assert dag.topological_sort() == order and dag.levels() == levels
+    _assert_consistent(dag)
+
+
+def test_bulk_edges_with_a_cycle_are_all_rolled_back():
+    dag = _dag(3)
+    dag.add_edge(0, 1)
+    with pytest.raises(ValueError):
+        dag.add_edges([(1, 2), (2, 0)])
+    assert dag.edges == {0: [1], 1: [], 2: []}
+    _assert_consistent(dag)
+
+
+def test_unknown_nodes_and_duplicates_are_rejected():
+    dag = _dag(2)
+    with pytest.raises(ValueError):
+        dag.add_edge(0, 5)
+    with pytest.raises(ValueError):
+        dag.add_node(0, {})
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_insertions_keep_order_and_levels_valid(seed):
+    rng = random.Random(seed)
+    dag = _dag(60)
+    # a hidden ranking guarantees acyclic edges, while insertion order fights the current order
+    rank = list(range(60))
+    rng.shuffle(rank)
+    for _ in range(300):
+        a, b = rng.sample(range(60), 2)
+        if rank[a] > rank[b]:
+            a, b = b, a
+        dag.add_edge(a, b)
+        if rng.random() < 0.05:
+            # the reverse of the edge just added always closes a cycle
+            with pytest.raises(ValueError):
+                dag.add_edge(b, a)
+            assert a not in dag.edges[b]
+    _assert_consistent(dag)
+
+
+def test_bulk_load_matches_incremental_insertion():
+    rng = random.Random(7)
+    edges = []
+    for _ in range(200):
+        a, b = sorted(rng.sample(range(50), 2))
+        edges.append((b, a))
+    incremental, bulk = _dag(50), _dag(50)
+    for edge in edges:
+        incremental.add_edge(*edge)
+    bulk.add_edges(edges)
+    _assert_consistent(incremental)
+    _assert_consistent(bulk)
+    assert {n: incremental.depth(n) for n in incremental.nodes} == {n: bulk.depth(n) for n in bulk.nodes}
+
+
+def test_depths_are_rebuilt_after_the_budget_runs_out():
+    dag = _dag(200)
+    for i in range(149):
+        dag.add_edge(i, i + 1)  # chain 0 -> ... -> 149
+    for i in range(150, 159):
+        dag.add_edge(i, i + 1)  # short chain 150 -> ... -> 159
+    assert dag._levels is not None
+    # hanging the long chain below the short one pushes all 150 nodes down, past the budget
+    dag.add_edge(159, 0)
+    assert dag._levels is None
+    assert dag.depth(149) == 159
+    _assert_consistent(dag)
+    # incremental maintenance resumes on the rebuilt levels
+    dag.add_edge(149, 160)
+    assert dag._levels is not None and dag.depth(160) == 160
+    _assert_consistent(dag)
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.agents.planner import Planner
+from src.core.dag import DAG
+from src.core.dag_executor import DAGExecutor, NodeExecutionError
+
+
+class Recorder:
+    """Node callables that log when they start and finish."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = {}
+        self.finished = {}
+
+    def node(self, node_id, delay=0.01, fail=False):
+        def run(inputs):
+            with self.lock:
+                self.started[node_id] = time.perf_counter()
+            time.sleep(delay)
+            if fail:
+                raise RuntimeError(f"{node_id} failed")
+            with self.lock:
+                self.finished[node_id] = time.perf_counter()
+            return node_id + sum(inputs.values())
+        return run
+
+    def async_node(self, node_id, delay=0.01):
+        async def run(inputs):
+            with self.lock:
+                self.started[node_id] = time.perf_counter()
+            await asyncio.sleep(delay)
+            with self.lock:
+                self.finished[node_id] = time.perf_counter()
+            return node_id + sum(inputs.values())
+        return run
+
+
+def _diamond(make):
+    """1 -> (2, 3) -> 4 -> 5, plus an independent 6."""
+    dag = DAG()
+    for node in range(1, 7):
+        dag.add_node(node, make(node))
+    dag.add_edges([(1, 2), (1, 3), (2, 4), (3, 4), (4, 5)])
+    return dag
+
+
+def _assert_dependencies_respected(dag, recorder):
+    for parent, children in dag.edges.items():
+        for child in children:
+            assert recorder.started[child] >= recorder.finished[parent]
+
+
+@pytest.mark.parametrize("backend", ["thread", "asyncio"])
+def test_nodes_start_only_after_their_dependencies(backend):
+    recorder = Recorder()
+    dag = _diamond(recorder.node)
+    result = DAGExecutor(backend=backend, max_concurrency=4).run(dag)
+    _assert_dependencies_respected(dag, recorder)
+    assert result.results == {1: 1, 2: 3, 3: 4, 4: 11, 5: 16, 6: 6}
+    assert set(result.timings) == set(dag.nodes)
+    for timing in result.timings.values():
+        assert timing["finished"] >= timing["submitted"] and timing["duration"] > 0
+    assert result.critical_path == [1, 2, 4, 5]
+
+
+def test_asyncio_backend_awaits_coroutines():
+    recorder = Recorder()
+    dag = _diamond(recorder.async_node)
+    result = DAGExecutor(backend="asyncio").run(dag)
+    _assert_dependencies_respected(dag, recorder)
+    assert result.results[5] == 16
+
+
+@pytest.mark.parametrize("backend", ["thread", "asyncio"])
+def test_a_failing_node_stops_its_descendants(backend):
+    recorder = Recorder()
+    dag = _diamond(lambda node: recorder.node(node, fail=node == 2))
+    with pytest.raises(NodeExecutionError) as failure:
+        DAGExecutor(backend=backend, max_concurrency=4).run(dag)
+    assert failure.value.node_id == 2
+    assert isinstance(failure.value.error, RuntimeError)
+    assert 4 not in recorder.started and 5 not in recorder.started
+
+
+def test_critical_path_nodes_start_first():
+    order = []
+    dag = DAG()
+    for node in ("short", "long1", "long2", "long3"):
+        dag.add_node(node, {"fn": lambda inputs, node=node: order.append(node)})
+    dag.add_edges([("long1", "long2"), ("long2", "long3")])
+    DAGExecutor(backend="thread", max_concurrency=1).run(dag)
+    assert order[0] == "long1"
+
+
+def test_nodes_without_a_callable_are_rejected():
+    dag = DAG()
+    dag.add_node("a", {"description": "no callable"})
+    with pytest.raises(ValueError):
+        DAGExecutor().run(dag)
+    with pytest.raises(ValueError):
+        DAGExecutor(backend="gpu").run(dag)
+
+
+def test_planner_executes_plans():
+    dag = DAG()
+    dag.add_node("fetch", {"fn": lambda inputs: 2})
+    dag.add_node("square", {"fn": lambda inputs: inputs["fetch"] ** 2})
+    dag.add_edge("fetch", "square")
+    result = Planner().execute_plan(dag, max_concurrency=2)
+    assert result.results == {"fetch": 2, "square": 4}
+
+
+def test_ray_backend(ray_cluster):
+    dag = DAG()
+    dag.add_node("a", lambda inputs: 1)
+    dag.add_node("b", lambda inputs: inputs["a"] + 1)
+    dag.add_edge("a", "b")
+    result = DAGExecutor(backend="ray").run(dag)
+    assert result.results == {"a": 1, "b": 2}
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("ray")
+
+from src.ray.main import SimpleEmbedder  # noqa: E402
+
+
+def test_embeddings_are_deterministic_unit_vectors():
+    a, b = SimpleEmbedder(dim=16), SimpleEmbedder(dim=16)
+    vectors = a.embed_batch(["x", "y"])
+    np.testing.assert_array_equal(vectors, b.embed_batch(["x", "y"]))
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_array_equal(a.text_to_vector("y"), vectors[1])
+
+
+def test_cache_counts_every_position():
+    embedder = SimpleEmbedder(dim=16)
+    vectors = embedder.embed_batch(["a", "b", "a", "a"])
+    np.testing.assert_array_equal(vectors[0], vectors[2])
+    assert (embedder.cache_hits, embedder.cache_misses) == (0, 4)
+    embedder.embed_batch(["a", "c", "c"])
+    assert (embedder.cache_hits, embedder.cache_misses) == (1, 6)
+
+
+def test_cache_is_bounded():
+    embedder = SimpleEmbedder(dim=16, cache_size=2)
+    embedder.embed_batch(["a", "b", "c"])
+    assert len(embedder._cache) == 2
+    embedder.embed_batch(["a"])
+    assert embedder.cache_misses == 4
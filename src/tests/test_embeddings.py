@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from src.models.embeddings import EmbeddingModel
+
+
+@pytest.fixture
+def model():
+    model = EmbeddingModel(4)
+    for key, vector in {"x": [1, 0, 0, 0], "x2": [2, 0.1, 0, 0], "y": [0, 1, 0, 0]}.items():
+        model.add_embedding(key, vector)
+    return model
+
+
+def test_similarity_matrix_matches_pairwise_cosine(model):
+    matrix = model.similarity_matrix(["x", "y"], ["x2", "y"])
+    expected = [[model.similarity(a, b) for b in ("x2", "y")] for a in ("x", "y")]
+    np.testing.assert_allclose(matrix, expected, rtol=1e-5, atol=1e-6)
+    with pytest.raises(KeyError):
+        model.similarity_matrix(["missing"])
+
+
+def test_most_similar_excludes_the_key_itself(model):
+    assert [key for key, _ in model.most_similar("x", k=2)] == ["x2", "y"]
+    assert model.most_similar_vector([0, 2, 0, 0], k=1)[0][0] == "y"
+
+
+def test_embeddings_is_a_read_only_view(model):
+    view = model.embeddings
+    assert sorted(view) == ["x", "x2", "y"] and "y" in view and len(view) == 3
+    np.testing.assert_array_equal(view["y"], [0, 1, 0, 0])
+    with pytest.raises(KeyError):
+        view["missing"]
+    with pytest.raises(TypeError):
+        view["z"] = np.zeros(4)
+    with pytest.raises(ValueError):
+        view["x"][0] = 5.0
+    model.add_embedding("z", [0, 0, 1, 0])
+    assert "z" in view
+    model.remove_embedding("x")
+    assert "x" not in view and model.get_embedding("x") is None
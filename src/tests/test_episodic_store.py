@@ -0,0 +1,79 @@
+import pytest
+
+from src.agents.archivist import Archivist
+from src.core.episodic_store import EpisodicStore
+
+
+def _store(n, **options):
+    store = EpisodicStore(segment_size=4, **options)
+    for i in range(n):
+        store.append(f"e{i}", timestamp=float(i), tags={"even" if i % 2 == 0 else "odd", f"m{i % 3}"})
+    return store
+
+
+def test_ids_are_consecutive_and_point_lookups_work():
+    store = _store(10)
+    assert len(store) == 10
+    assert store.get(7) == "e7"
+    assert store.timestamp(7) == 7.0
+    assert store.tags(7) == frozenset({"odd", "m1"})
+    assert store.get(10) is None and 10 not in store
+
+
+def test_time_range_is_half_open_and_ordered():
+    store = _store(10)
+    assert [i for i, _ in store.range(3.0, 7.0)] == [3, 4, 5, 6]
+    assert [i for i, _ in store.range(None, 2.0)] == [0, 1]
+
+
+def test_late_episodes_are_returned_in_time_order():
+    store = EpisodicStore(segment_size=4)
+    for ts in (1.0, 5.0, 3.0, 2.0, 9.0):
+        store.append(ts, timestamp=ts)
+    assert [e for _, e in store.range()] == [1.0, 2.0, 3.0, 5.0, 9.0]
+
+
+def test_query_combines_tags_window_and_predicate():
+    store = _store(12)
+    assert [i for i, _ in store.query(tags={"even", "m0"})] == [0, 6]
+    assert [i for i, _ in store.query(start=4.0, end=11.0, tags={"odd"})] == [5, 7, 9]
+    assert [i for i, _ in store.query(tags={"even"}, predicate=lambda e: e.endswith("4"))] == [4]
+    assert list(store.query(tags={"missing"})) == []
+
+
+def test_count_retention_drops_whole_segments():
+    store = _store(10, max_episodes=5)
+    # segments of 4: [0-3] and [4-7] would leave fewer than 5, so only the first goes
+    assert store.first_id == 4
+    assert len(store) == 6
+    assert store.get(3) is None
+    assert [i for i, _ in store.with_tag("even")] == [4, 6, 8]
+
+
+def test_age_retention_uses_the_clock():
+    now = [100.0]
+    store = EpisodicStore(segment_size=2, max_age=10, clock=lambda: now[0])
+    for ts in (80.0, 81.0, 95.0, 96.0, 99.0):
+        store.append(ts, timestamp=ts)
+    assert [e for _, e in store.range()] == [95.0, 96.0, 99.0]
+
+
+def test_advance_to_only_on_an_empty_store():
+    store = EpisodicStore()
+    store.advance_to(5)
+    assert store.append("x") == 5
+    store.advance_to(6)
+    with pytest.raises(ValueError):
+        store.advance_to(8)
+    with pytest.raises(ValueError):
+        store.advance_to(2)
+
+
+def test_archivist_queries_and_exports():
+    archivist = Archivist(max_episodes=None, retention_seconds=None)
+    for i in range(6):
+        archivist.store_experience({"step": i}, timestamp=float(i), tags={"run"} if i < 4 else {"eval"})
+    assert [i for i, _ in archivist.retrieve_experiences(start=2.0, tags={"run"})] == [2, 3]
+    batch = archivist.export_experiences(tags={"eval"})
+    assert batch.column("episode_id").tolist() == [4, 5]
+    assert [e.experience for e in batch] == [{"step": 4}, {"step": 5}]
@@ -0,0 +1,98 @@
+import json
+import types
+
+import pytest
+
+pytest.importorskip("ray")
+
+from src.ray import ingest as ingest_module  # noqa: E402
+from src.ray.ingest import ingest, iter_corpus, iter_jsonl, iter_parquet  # noqa: E402
+
+RECORDS = [{"text": f"memory {i}", "source": "corpus", "n": i} for i in range(23)]
+
+
+@pytest.fixture
+def jsonl_path(tmp_path):
+    path = tmp_path / "corpus.jsonl"
+    lines = [json.dumps(r) for r in RECORDS]
+    lines.insert(5, "")  # blank lines are skipped
+    lines.append('{"text": "with meta", "meta": {"k": 1}, "ignored": true}')
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 24, 100])
+def test_jsonl_chunks(jsonl_path, chunk_size):
+    chunks = list(iter_jsonl(jsonl_path, chunk_size=chunk_size))
+    assert all(len(texts) == len(metas) for texts, metas in chunks)
+    assert [len(texts) for texts, _ in chunks[:-1]] == [chunk_size] * (len(chunks) - 1)
+    assert 0 < len(chunks[-1][0]) <= chunk_size
+    texts = [t for chunk, _ in chunks for t in chunk]
+    metas = [m for _, chunk in chunks for m in chunk]
+    assert texts == [r["text"] for r in RECORDS] + ["with meta"]
+    assert metas[3] == {"source": "corpus", "n": 3}
+    assert metas[-1] == {"k": 1}
+
+
+def test_corpus_reader_follows_the_extension(jsonl_path):
+    assert list(iter_corpus(jsonl_path, chunk_size=10)) == list(iter_jsonl(jsonl_path, chunk_size=10))
+
+
+def test_parquet_chunks(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "corpus.parquet")
+    pq.write_table(pa.Table.from_pylist(RECORDS), path)
+    chunks = list(iter_corpus(path, chunk_size=10))
+    assert [len(texts) for texts, _ in chunks] == [10, 10, 3]
+    assert [t for texts, _ in chunks for t in texts] == [r["text"] for r in RECORDS]
+    assert chunks[0][1][3] == {"source": "corpus", "n": 3}
+    assert list(iter_parquet(path, chunk_size=10)) == chunks
+
+
+class RecordingMemory:
+    """Stands in for ShardedMemory: each add_batch returns two tokens that finish when fetched."""
+
+    def __init__(self):
+        self.outstanding = set()
+        self.peak = 0
+        self.texts = []
+
+    def add_batch(self, texts, metas):
+        chunk = len(self.texts)
+        self.texts.append(texts)
+        tokens = [(chunk, 0), (chunk, 1)]
+        self.outstanding.add(chunk)
+        self.peak = max(self.peak, len(self.outstanding))
+        return tokens
+
+    def get(self, tokens):
+        self.outstanding.difference_update(chunk for chunk, _ in tokens)
+
+
+@pytest.mark.parametrize("max_in_flight", [1, 3, 8])
+def test_ingest_bounds_chunks_in_flight(monkeypatch, max_in_flight):
+    memory = RecordingMemory()
+    monkeypatch.setattr(ingest_module, "ray", types.SimpleNamespace(get=memory.get))
+    chunks = [([f"t{i}"] * (i + 1), [{}] * (i + 1)) for i in range(20)]
+    stats = ingest(memory, chunks, max_in_flight=max_in_flight)
+    assert memory.peak == max_in_flight
+    assert not memory.outstanding
+    assert stats["chunks"] == 20 and stats["records"] == sum(range(1, 21))
+    assert memory.texts == [texts for texts, _ in chunks]
+
+
+def test_ingest_rejects_an_empty_window():
+    with pytest.raises(ValueError):
+        ingest(RecordingMemory(), [], max_in_flight=0)
+
+
+def test_ingest_into_sharded_memory(ray_cluster, jsonl_path):
+    from src.ray.main import MemoryAgent
+    from src.ray.memory_service import ShardedMemory
+
+    memory = ShardedMemory(lambda name: MemoryAgent.remote(name=name, embed_dim=32), n_shards=2)
+    stats = ingest(memory, iter_jsonl(jsonl_path, chunk_size=4), max_in_flight=2)
+    assert stats["records"] == len(RECORDS) + 1 and stats["chunks"] == 6
+    assert sum(memory.stats().values()) == len(RECORDS) + 1
+    assert memory.query("memory 7", top_k=1)[0]["text"] == "memory 7"
@@ -0,0 +1,70 @@
+from src.core.memory import HierarchicalMemory
+
+CAPACITY = {"working_memory": 3, "episodic_memory": 3}
+TIERS = ("working_memory", "episodic_memory", "long_term_memory")
+
+
+def _state(memory):
+    state = {tier: dict(getattr(memory, tier).items()) for tier in TIERS}
+    state["meta_memory"] = dict(memory.meta_memory)
+    state["sensory_buffer"] = list(memory.sensory_buffer)
+    return state
+
+
+def test_snapshots_are_immutable_and_versioned():
+    memory = HierarchicalMemory(capacity=CAPACITY)
+    memory.working_memory["a"] = 1
+    snapshot = memory.get_memory_snapshot()
+    memory.working_memory["a"] = 2
+    memory.update_meta_memory("agent", 0.5)
+    assert snapshot["working_memory"]["a"] == 1
+    assert "agent" not in snapshot["meta_memory"]
+    assert memory.get_memory_snapshot().version > snapshot.version
+
+
+def test_working_memory_evictions_are_promoted():
+    memory = HierarchicalMemory(capacity=CAPACITY)
+    for i in range(5):
+        memory.working_memory[f"k{i}"] = i
+    assert sorted(memory.working_memory) == ["k2", "k3", "k4"]
+    assert [e["working_memory_key"] for e in memory.episodic_memory.values()] == ["k0", "k1"]
+
+
+def test_incremental_diffs_keep_a_replica_identical():
+    source = HierarchicalMemory(capacity=CAPACITY)
+    # a smaller replica would evict (and promote) on its own if apply_diff let it
+    replica = HierarchicalMemory(capacity={"working_memory": 1, "episodic_memory": 1})
+    version = 0
+    for i in range(12):
+        source.working_memory[f"k{i}"] = i
+        source.add_to_sensory_buffer(i)
+        source.update_meta_memory(f"agent{i % 3}", i)
+        if i % 4 == 3:
+            source.remove_meta_memory(f"agent{(i + 1) % 3}")
+        delta = source.diff(version)
+        replica.apply_diff(delta)
+        version = delta["version"]
+    assert _state(replica) == _state(source)
+
+
+def test_full_diff_replaces_the_replica_contents():
+    source = HierarchicalMemory(capacity=CAPACITY)
+    source.working_memory["a"] = 1
+    source.update_meta_memory("kept", 1)
+    replica = HierarchicalMemory(capacity=CAPACITY)
+    replica.working_memory["stale"] = 0
+    replica.update_meta_memory("stale", 0)
+    replica.apply_diff(source.diff(-10))
+    assert _state(replica) == _state(source)
+
+
+def test_meta_memory_deletions_are_shipped():
+    source, replica = HierarchicalMemory(), HierarchicalMemory()
+    source.update_meta_memory("agent", 0.9)
+    replica.apply_diff(source.diff(0))
+    version = source.version
+    assert source.remove_meta_memory("agent") and not source.remove_meta_memory("agent")
+    delta = source.diff(version)
+    assert delta["meta_memory"]["deleted"] == ["agent"]
+    replica.apply_diff(delta)
+    assert dict(replica.meta_memory) == {}
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("ray")
+
+from src.ray.main import MemoryAgent, ReasonerAgent  # noqa: E402
+
+# the plain classes behind the actors, so agents can be driven in-process
+LocalMemoryAgent = MemoryAgent.__ray_metadata__.modified_class
+LocalReasonerAgent = ReasonerAgent.__ray_metadata__.modified_class
+
+TEXTS = [f"memory {i}" for i in range(40)]
+
+
+def test_reopened_store_indexes_only_live_rows(tmp_path):
+    path = str(tmp_path / "memory")
+    params = {"nlist": 4, "nprobe": 4}
+    agent = LocalMemoryAgent(name="m", embed_dim=32, index="ivf", index_params=params, persist_path=path)
+    agent.add_batch(TEXTS)
+    # a single removal stays below the compaction ratio, so it is left as a tombstone
+    assert agent.remove_texts([TEXTS[5]])["removed"] == 1
+    assert agent.flush()["entries"] == len(TEXTS) - 1
+
+    reopened = LocalMemoryAgent(name="m", embed_dim=32, index="ivf", index_params=params, persist_path=path)
+    assert reopened.store._dead == 1
+    assert reopened.size() == reopened.flush()["entries"] == len(TEXTS) - 1
+    hits = reopened.query(TEXTS[5], top_k=len(TEXTS))
+    assert len(hits) == len(TEXTS) - 1
+    assert TEXTS[5] not in {h["text"] for h in hits}
+    assert reopened.query(TEXTS[6], top_k=1)[0]["text"] == TEXTS[6]
+
+
+def test_add_and_query_sees_the_text_it_adds():
+    agent = LocalMemoryAgent(name="m", embed_dim=32)
+    assert agent.add_and_query("first memory", {"source": "a"}, top_k=3) == [
+        {"text": "first memory", "score": pytest.approx(1.0, abs=1e-5), "meta": {"source": "a"}}]
+    agent.add_batch(TEXTS[:10])
+    hits = agent.add_and_query("a brand new memory", top_k=3)
+    assert len(hits) == 3
+    assert hits[0]["text"] == "a brand new memory" and hits[0]["score"] == pytest.approx(1.0, abs=1e-5)
+    assert agent.size() == 12
+
+
+def test_reasoner_bounds_memory_calls_in_flight():
+    class CountingCall:
+        def __init__(self):
+            self.active = self.peak = 0
+
+        async def remote(self, text, metadata, top_k=3, trace_context=None):
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+            return [{"text": text, "score": 1.0, "meta": metadata}]
+
+    class StubMemory:
+        add_and_query = CountingCall()
+
+    memory = StubMemory()
+    reasoner = LocalReasonerAgent("r", memory, max_in_flight=3)
+
+    async def run():
+        return await asyncio.gather(*(reasoner.perceive_and_act(f"obs {i}") for i in range(12)))
+
+    results = asyncio.run(run())
+    assert memory.add_and_query.peak == 3
+    assert [r["related"][0]["text"] for r in results] == [f"obs {i}" for i in range(12)]
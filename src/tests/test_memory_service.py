@@ -0,0 +1,80 @@
+import pytest
+
+ray = pytest.importorskip("ray")
+
+from src.ray.main import MemoryAgent  # noqa: E402
+from src.ray.memory_service import HashRing, ShardedMemory  # noqa: E402
+
+TEXTS = [f"memory {i}" for i in range(60)]
+
+
+def test_ring_routing_is_stable_and_moves_keys_only_to_new_shards():
+    ring = HashRing(vnodes=32)
+    for shard in ("a", "b", "c"):
+        ring.add(shard)
+    keys = [f"key {i}" for i in range(2000)]
+    before = {k: ring.node_for(k) for k in keys}
+    assert set(before.values()) == {"a", "b", "c"}
+
+    ring.add("d")
+    moved = [k for k in keys if ring.node_for(k) != before[k]]
+    assert all(ring.node_for(k) == "d" for k in moved)
+    assert 0.1 < len(moved) / len(keys) < 0.4
+
+    ring.remove("d")
+    assert {k: ring.node_for(k) for k in keys} == before
+
+
+def test_empty_ring_raises():
+    with pytest.raises(ValueError):
+        HashRing().node_for("x")
+
+
+def _texts_per_shard(memory):
+    return {sid: [sorted(ray.get(r.dump.remote()).column("text")) for r in replicas]
+            for sid, replicas in memory.shards.items()}
+
+
+def _check_placement(memory, texts):
+    placed = _texts_per_shard(memory)
+    for sid, per_replica in placed.items():
+        # every replica of a shard holds the same memories, and only the ones routed to it
+        assert all(replica == per_replica[0] for replica in per_replica)
+        assert all(memory.shard_for(t) == sid for t in per_replica[0])
+    assert sorted(t for per_replica in placed.values() for t in per_replica[0]) == sorted(texts)
+
+
+def test_writes_follow_the_ring_and_reach_every_replica(ray_cluster):
+    memory = ShardedMemory(lambda name: MemoryAgent.remote(name=name, embed_dim=32), n_shards=2, replicas=2)
+    ray.get(memory.add_batch(TEXTS[:40]))
+    ray.get(memory.add(TEXTS[40], {"source": "single"}))
+    _check_placement(memory, TEXTS[:41])
+    hits = memory.query(TEXTS[40], top_k=3)
+    assert hits[0]["text"] == TEXTS[40] and hits[0]["meta"] == {"source": "single"}
+    assert len(hits) == 3
+
+
+def test_add_shard_moves_exactly_the_reassigned_memories(ray_cluster):
+    memory = ShardedMemory(lambda name: MemoryAgent.remote(name=name, embed_dim=32), n_shards=2, replicas=2)
+    ray.get(memory.add_batch(TEXTS))
+    result = memory.add_shard()
+    assert result["moved"] == memory.stats()[result["shard"]] > 0
+    _check_placement(memory, TEXTS)
+    for text in TEXTS[::7]:
+        assert memory.query(text, top_k=1)[0]["text"] == text
+
+
+@pytest.mark.parametrize("index", [None, "hnsw"])
+def test_rebalancing_persistent_shards_survives_compaction(ray_cluster, tmp_path, index):
+    # moving memories off a shard tombstones enough rows to compact its store,
+    # after which rows are renumbered and the index is rebuilt
+    def factory(name):
+        return MemoryAgent.remote(name=name, embed_dim=32, persist_path=str(tmp_path / name), index=index)
+
+    memory = ShardedMemory(factory, n_shards=1, replicas=1)
+    ray.get(memory.add_batch(TEXTS))
+    result = memory.add_shard()
+    assert result["moved"] > 0
+    _check_placement(memory, TEXTS)
+    for text in TEXTS:
+        assert memory.query(text, top_k=1)[0]["text"] == text
@@ -0,0 +1,124 @@
+import time
+
+import numpy as np
+import pytest
+
+ray = pytest.importorskip("ray")
+
+from src.ray.main import EvaluatorAgent, MetaAgent  # noqa: E402
+
+
+def _reasoner(delay):
+    # defined per test so Ray ships the class by value instead of importing this module
+    import asyncio
+
+    @ray.remote
+    class StubReasoner:
+        def __init__(self, name):
+            self.name = name
+            self.cancelled = False
+
+        async def perceive_and_act(self, observation, trace_context=None):
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+            return {"introspection": f"{self.name} saw '{observation}'",
+                    "action": f"investigate {self.name}", "related": []}
+
+        def was_cancelled(self):
+            return self.cancelled
+
+    return StubReasoner
+
+
+def _meta(fast, slow=0, slow_delay=30.0):
+    # names of distinct lengths give every action a distinct heuristic score
+    reasoners = [_reasoner(0.0).remote("fast" + "!" * i) for i in range(fast)]
+    reasoners += [_reasoner(slow_delay).remote(f"slow{i}") for i in range(slow)]
+    return MetaAgent.remote("meta", reasoners, EvaluatorAgent.remote("evaluator")), reasoners
+
+
+def _wait_cancelled(reasoner, limit=10.0):
+    deadline = time.monotonic() + limit
+    while time.monotonic() < deadline:
+        if ray.get(reasoner.was_cancelled.remote()):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_all_reasoners_answer(ray_cluster):
+    meta, _ = _meta(3)
+    result = ray.get(meta.coordinate_task.remote("task", timeout=10))
+    assert sorted(result["responded"]) == [0, 1, 2]
+    assert not result["partial"] and result["timed_out"] == [] and result["failed"] == []
+    assert len(result["introspection"]) == len(result["raw_results"]) == 3
+    scores = [s["score"] for s in result["actions_scored"]]
+    assert scores == sorted(scores, reverse=True)
+    assert result["chosen"] == result["actions_scored"][0]
+
+
+def test_quorum_stops_collection_and_cancels_stragglers(ray_cluster):
+    meta, reasoners = _meta(2, slow=2)
+    start = time.monotonic()
+    result = ray.get(meta.coordinate_task.remote("task", quorum=2, timeout=20))
+    assert time.monotonic() - start < 10
+    assert sorted(result["responded"]) == [0, 1]
+    assert result["partial"] and result["timed_out"] == [2, 3]
+    assert {s["action"] for s in result["actions_scored"]} == {"investigate fast", "investigate fast!"}
+    assert all(_wait_cancelled(r) for r in reasoners[2:])
+
+
+def test_timeout_returns_partial_result_below_quorum(ray_cluster):
+    meta, reasoners = _meta(1, slow=2)
+    start = time.monotonic()
+    result = ray.get(meta.coordinate_task.remote("task", quorum=3, timeout=1.0))
+    assert 1.0 <= time.monotonic() - start < 10
+    assert result["responded"] == [0] and result["timed_out"] == [1, 2]
+    assert result["partial"]
+    assert result["chosen"]["action"] == "investigate fast"
+    assert all(_wait_cancelled(r) for r in reasoners[1:])
+
+
+def test_no_answer_in_time_leaves_nothing_chosen(ray_cluster):
+    meta, _ = _meta(0, slow=1)
+    result = ray.get(meta.coordinate_task.remote("task", timeout=0.5))
+    assert result["responded"] == [] and result["timed_out"] == [0]
+    assert result["chosen"] is None and result["actions_scored"] == []
+
+
+def test_compact_and_refs_result_formats(ray_cluster):
+    meta, _ = _meta(3)
+    full = ray.get(meta.coordinate_task.remote("task", timeout=10))
+    compact = ray.get(meta.coordinate_task.remote("task", timeout=10, result_format="compact"))
+    assert "introspection" not in compact and "raw_results" not in compact
+    assert compact["actions"] == [s["action"] for s in full["actions_scored"]]
+    assert compact["scores"].dtype == np.float32
+    np.testing.assert_allclose(compact["scores"], [s["score"] for s in full["actions_scored"]], rtol=1e-6)
+    assert compact["chosen"] == full["chosen"]
+
+    refs = ray.get(meta.coordinate_task.remote("task", timeout=10, result_format="refs"))
+    assert refs["actions"] == compact["actions"]
+    assert all(isinstance(r, ray.ObjectRef) for r in refs["raw_results"])
+    raw = ray.get(refs["raw_results"])
+    assert sorted(r["action"] for r in raw) == sorted(compact["actions"])
+    assert ray.get(refs["actions_scored"])[0] == refs["chosen"]
+
+
+def test_unknown_result_format_is_rejected(ray_cluster):
+    meta, _ = _meta(1)
+    with pytest.raises(ray.exceptions.RayTaskError) as info:
+        ray.get(meta.coordinate_task.remote("task", result_format="bogus"))
+    assert isinstance(info.value.as_instanceof_cause(), ValueError)
+
+
+def test_top_k_limits_the_scored_actions(ray_cluster):
+    meta, _ = _meta(3)
+    full = ray.get(meta.coordinate_task.remote("task", timeout=10))
+    best = ray.get(meta.coordinate_task.remote("task", timeout=10, top_k=2))
+    assert best["actions_scored"] == full["actions_scored"][:2]
+    assert sorted(best["responded"]) == [0, 1, 2]
+    compact = ray.get(meta.coordinate_task.remote("task", timeout=10, result_format="compact", top_k=1))
+    assert compact["actions"] == [full["chosen"]["action"]] and len(compact["scores"]) == 1
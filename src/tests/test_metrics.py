@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from src.utils.metrics import Metrics, QuantileSketch, RunningStats, SlidingWindow
+
+
+def test_running_stats_match_numpy_and_merge():
+    values = np.random.RandomState(0).randn(1000) * 3 + 5
+    left, right = RunningStats(), RunningStats()
+    for v in values[:400]:
+        left.add(v)
+    for v in values[400:]:
+        right.add(v)
+    merged = left.merge(right)
+    assert merged.count == 1000
+    assert merged.mean == pytest.approx(values.mean())
+    assert merged.stddev == pytest.approx(values.std(ddof=1))
+    assert (merged.min, merged.max) == (values.min(), values.max())
+
+
+def test_sketch_quantiles_are_within_the_relative_accuracy():
+    values = np.random.RandomState(1).lognormal(size=20000)
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for v in values:
+        sketch.add(v)
+    for q in (0.1, 0.5, 0.9, 0.99):
+        assert sketch.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.02)
+    assert sketch.quantile(0) == values.min() and sketch.quantile(1) == values.max()
+
+
+def test_sketch_handles_negative_and_zero_values():
+    rng = np.random.RandomState(2)
+    values = np.concatenate([rng.randn(9000) * 5, np.zeros(1000), rng.uniform(-1e-10, 1e-10, 500)])
+    rng.shuffle(values)
+    left, right = QuantileSketch(0.01), QuantileSketch(0.01)
+    for v in values[:6000]:
+        left.add(v)
+    for v in values[6000:]:
+        right.add(v)
+    sketch = left.merge(right)
+    assert sketch.zeros == np.sum(np.abs(values) <= QuantileSketch.MIN_VALUE) == 1500
+    ordered = np.sort(values)
+    for q in np.linspace(0.01, 0.99, 99):
+        # the sketch answers with the sample at rank q * (n - 1)
+        exact = ordered[int(q * (len(values) - 1))]
+        if abs(exact) <= QuantileSketch.MIN_VALUE:
+            assert sketch.quantile(q) == 0.0
+        else:
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.01 + 1e-9)
+    assert sketch.quantile(0) == values.min() < 0 < sketch.quantile(1) == values.max()
+
+    negatives = QuantileSketch(0.01)
+    for v in (-1000.0, -10.0, -0.5):
+        negatives.add(v)
+    assert negatives.quantile(0.5) == pytest.approx(-10.0, rel=0.01)
+
+
+def test_sketch_accuracy_is_validated():
+    assert QuantileSketch(relative_accuracy=0.05).relative_accuracy == 0.05
+    for bad in (0, 1, -0.1):
+        with pytest.raises(ValueError):
+            QuantileSketch(relative_accuracy=bad)
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+def test_window_never_covers_more_than_its_length():
+    window = SlidingWindow(60, slices=6)
+    for i in range(12000):
+        window.add(1.0, i * 0.01)
+    count = window.aggregate(119.99).stats.count
+    assert 5000 <= count <= 6000
+    assert window.aggregate(200.0).stats.count == 0
+
+
+def test_metrics_summary_and_merge():
+    now = [1000.0]
+    a, b = Metrics(window_seconds=60, clock=lambda: now[0]), Metrics(window_seconds=60, clock=lambda: now[0])
+    for i in range(10):
+        a.record_performance("x", float(i))
+        b.record_performance("y", float(i) * 2)
+    a.merge(b)
+    summary = a.get_metrics_summary()
+    assert summary["total_agents"] == 2
+    assert summary["average_performance"] == pytest.approx(6.75)
+    assert summary["agents"]["y"]["max"] == 18.0
+    assert summary["overall"]["window"]["count"] == 20
+    a.reset_metrics()
+    assert a.get_metrics_summary()["total_agents"] == 0
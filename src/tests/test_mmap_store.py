@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from src.core.records import MemoryEntry
+from src.models.embeddings import EmbeddingModel
+from src.models.mmap_store import MmapVectorStore
+
+
+def _vectors(n, dim=8, seed=0):
+    return np.random.RandomState(seed).randn(n, dim).astype(np.float32)
+
+
+def _normalized(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _hits(store, query):
+    rows, scores = store.search(query, top_k=len(store))
+    return rows[np.isfinite(scores)].tolist()
+
+
+def test_reopen_restores_vectors_and_records(tmp_path):
+    vectors = _vectors(20)
+    store = MmapVectorStore(str(tmp_path), dim=8)
+    store.add_many(vectors, [f"r{i}" for i in range(20)])
+    store.close()
+
+    reopened = MmapVectorStore(str(tmp_path))
+    assert len(reopened) == 20
+    assert reopened.records == [f"r{i}" for i in range(20)]
+    np.testing.assert_allclose(reopened.vectors, _normalized(vectors), rtol=1e-5, atol=1e-6)
+
+
+def test_dimension_mismatch_is_rejected(tmp_path):
+    MmapVectorStore(str(tmp_path), dim=8).close()
+    with pytest.raises(ValueError):
+        MmapVectorStore(str(tmp_path), dim=4)
+
+
+def test_removed_rows_are_excluded_and_survive_reopen(tmp_path):
+    vectors = _vectors(10)
+    store = MmapVectorStore(str(tmp_path), dim=8, compact_ratio=1.0)
+    store.add_many(vectors, list(range(10)))
+    store.remove(3)
+    assert store.records[3] is None
+    # tombstoned rows score -inf until the next compaction
+    assert 3 not in _hits(store, vectors[3])
+    store.close()
+
+    reopened = MmapVectorStore(str(tmp_path), compact_ratio=1.0)
+    assert reopened.records[3] is None
+    assert sorted(_hits(reopened, vectors[3])) == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+
+
+def test_compaction_renumbers_live_rows(tmp_path):
+    vectors = _vectors(10)
+    store = MmapVectorStore(str(tmp_path), dim=8)
+    store.add_many(vectors, list(range(10)))
+    for row in range(0, 10, 2):
+        store.remove(row)
+    assert store.maybe_compact()
+    assert store.records == [1, 3, 5, 7, 9]
+    rows, _ = store.search(vectors[7], top_k=1)
+    assert store.records[rows[0]] == 7
+    store.close()
+    assert MmapVectorStore(str(tmp_path)).records == [1, 3, 5, 7, 9]
+
+
+def test_record_type_round_trips(tmp_path):
+    store = MmapVectorStore(str(tmp_path), dim=8, record_type=MemoryEntry)
+    store.add_many(_vectors(2), [MemoryEntry("a", 1.0, {"k": 1}), MemoryEntry("b", 2.0, None)])
+    store.close()
+    reopened = MmapVectorStore(str(tmp_path), record_type=MemoryEntry)
+    assert reopened.records == [MemoryEntry("a", 1.0, {"k": 1}), MemoryEntry("b", 2.0, None)]
+
+
+def test_readonly_store_refreshes_appended_rows(tmp_path):
+    writer = MmapVectorStore(str(tmp_path), dim=8, initial_capacity=4)
+    writer.add_many(_vectors(2), ["a", "b"])
+    writer.flush()
+    reader = MmapVectorStore(str(tmp_path), readonly=True)
+    with pytest.raises(ValueError):
+        reader.add_many(_vectors(1), ["x"])
+    writer.add_many(_vectors(6, seed=1), list("cdefgh"))
+    writer.flush()
+    assert reader.refresh() is False
+    assert reader.records == list("abcdefgh")
+
+
+def test_embedding_model_reopens_without_reembedding(tmp_path):
+    model = EmbeddingModel(8, path=str(tmp_path))
+    vectors = _vectors(3)
+    for key, vector in zip("abc", vectors):
+        model.add_embedding(key, vector)
+    model.remove_embedding("b")
+    model.flush()
+
+    reopened = EmbeddingModel.open(str(tmp_path))
+    assert sorted(reopened.embeddings) == ["a", "c"]
+    np.testing.assert_allclose(reopened.embeddings["c"], vectors[2], rtol=1e-6)
+    assert reopened.most_similar_vector(vectors[0], k=1)[0][0] == "a"
+
@@ -0,0 +1,64 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from src.core.records import Experience, MemoryEntry, RecordBatch
+
+
+def test_record_behaves_like_a_read_only_mapping():
+    entry = MemoryEntry("hello", 1.5, {"k": 1})
+    assert entry["text"] == entry.text == "hello"
+    assert "ts" in entry and "missing" not in entry
+    assert list(entry) == ["text", "ts", "meta"] and len(entry) == 3
+    assert dict(entry) == {"text": "hello", "ts": 1.5, "meta": {"k": 1}}
+    assert entry.get("missing", 0) == 0
+    with pytest.raises(KeyError):
+        entry["missing"]
+
+
+def test_records_compare_hash_and_pickle_by_value():
+    a, b = Experience(1, 2.0, "x", ("t",)), Experience(1, 2.0, "x", ("t",))
+    assert a == b and hash(a) == hash(b) and len({a, b}) == 1
+    assert a != Experience(2, 2.0, "x", ("t",))
+    assert pickle.loads(pickle.dumps(a)) == a
+    with pytest.raises(TypeError):
+        hash(MemoryEntry("x", 0.0, {"unhashable": True}))
+
+
+def test_record_rejects_unknown_fields():
+    with pytest.raises(ValueError):
+        MemoryEntry("x", 0.0, None, "extra")
+    with pytest.raises(ValueError):
+        MemoryEntry(text="x", colour="red")
+
+
+def test_batch_stores_numeric_columns_unboxed():
+    batch = RecordBatch.from_records(MemoryEntry, [MemoryEntry(f"t{i}", float(i), None) for i in range(5)])
+    assert len(batch) == 5
+    assert batch.column("ts").dtype == np.float64
+    assert batch[2] == MemoryEntry("t2", 2.0, None)
+    assert [e.text for e in batch[1:3]] == ["t1", "t2"]
+    assert [e.text for e in batch.take([4, 0])] == ["t4", "t0"]
+    restored = pickle.loads(pickle.dumps(batch))
+    assert list(restored) == list(batch)
+
+
+def test_rejected_value_leaves_the_batch_rectangular():
+    batch = RecordBatch(MemoryEntry)
+    batch.add("a", 1.0, None)
+    with pytest.raises(ValueError):
+        batch.add("b", None, None)
+    with pytest.raises(ValueError):
+        batch.append({"text": "c", "ts": "late", "meta": None})
+    with pytest.raises(KeyError):
+        batch.append({"text": "d"})
+    assert len(batch) == 1
+    assert {name: len(values) for name, values in batch.to_columns().items()} == {"text": 1, "ts": 1, "meta": 1}
+
+
+def test_columns_must_match_the_record_type():
+    with pytest.raises(ValueError):
+        RecordBatch(MemoryEntry, {"text": ["a"], "ts": [1.0]})
+    with pytest.raises(ValueError):
+        RecordBatch(MemoryEntry, {"text": ["a", "b"], "ts": [1.0], "meta": [None]})
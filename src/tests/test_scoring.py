@@ -0,0 +1,120 @@
+import pickle
+import time
+
+import numpy as np
+import pytest
+
+ray = pytest.importorskip("ray")
+
+from src.ray.scoring import (CompositeScorer, EvaluatorPool, GoalSimilarityScorer,  # noqa: E402
+                             HeuristicScorer, Scorer, rank)
+
+ACTIONS = ["investigate x", "extend y", "a much longer plan to extend z"]
+
+
+class TableEmbedder:
+    """Deterministic unit vectors looked up by text."""
+
+    def __init__(self, table):
+        self.table = {k: np.asarray(v, dtype=np.float32) / np.linalg.norm(v) for k, v in table.items()}
+        self.calls = 0
+
+    def embed_batch(self, texts):
+        self.calls += 1
+        return np.stack([self.table[t] for t in texts])
+
+
+EMBEDDER = TableEmbedder({
+    "goal": [1, 0, 0], "other goal": [0, 1, 0],
+    "on goal": [1, 0, 0], "halfway": [1, 1, 0], "off goal": [0, 0, 1],
+})
+
+
+class ConstantScorer(Scorer):
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=np.float64)
+
+    def score(self, actions, goal=None):
+        return self.values[: len(actions)]
+
+
+def test_base_scorer_is_abstract():
+    with pytest.raises(NotImplementedError):
+        Scorer().score(["a"])
+
+
+def test_heuristic_scores_length_and_keywords():
+    scores = HeuristicScorer().score(ACTIONS)
+    expected = [1 / (len(a) + 1) + (0.2 if "investigate" in a else 0.0) for a in ACTIONS]
+    np.testing.assert_allclose(scores, expected)
+    weighted = HeuristicScorer({"extend": 1.0, "plan": 0.5}).score(ACTIONS)
+    np.testing.assert_allclose(weighted - 1 / (np.array([len(a) for a in ACTIONS]) + 1.0), [0.0, 1.0, 1.5])
+
+
+def test_goal_similarity_uses_the_task_goal():
+    actions = ["on goal", "halfway", "off goal"]
+    scorer = GoalSimilarityScorer(EMBEDDER)
+    np.testing.assert_allclose(scorer.score(actions, "goal"), [1.0, np.sqrt(0.5), 0.0], atol=1e-6)
+    np.testing.assert_array_equal(scorer.score(actions), np.zeros(3))
+
+
+def test_goal_similarity_takes_the_best_fixed_goal():
+    embedder = TableEmbedder(EMBEDDER.table)
+    scorer = GoalSimilarityScorer(embedder, goals=["goal", "other goal"])
+    assert embedder.calls == 1
+    # fixed goals win over the goal passed in, and only the actions are embedded per call
+    scores = scorer.score(["on goal", "halfway", "off goal"], "irrelevant")
+    np.testing.assert_allclose(scores, [1.0, np.sqrt(0.5), 0.0], atol=1e-6)
+    assert embedder.calls == 2
+
+
+def test_composite_is_the_weighted_sum():
+    a, b = ConstantScorer([1.0, 0.0, 2.0]), ConstantScorer([0.5, 1.0, -1.0])
+    np.testing.assert_allclose(CompositeScorer([(a, 1.0), (b, 2.0)]).score(ACTIONS), [2.0, 2.0, 0.0])
+    np.testing.assert_allclose(CompositeScorer([(a, 0.0), (b, -1.0)]).score(ACTIONS), [-0.5, -1.0, 1.0])
+    np.testing.assert_array_equal(CompositeScorer([]).score(ACTIONS), np.zeros(3))
+
+
+def test_rank_orders_best_first_and_keeps_ties():
+    actions = ["a", "b", "c", "d", "e"]
+    scores = np.array([0.1, 0.5, 0.3, 0.5, -1.0])
+    ranked = rank(actions, scores)
+    assert [r["score"] for r in ranked] == [0.5, 0.5, 0.3, 0.1, -1.0]
+    assert {r["action"] for r in ranked[:2]} == {"b", "d"}
+    assert [r["action"] for r in ranked[2:]] == ["c", "a", "e"]
+    assert all(isinstance(r["score"], float) for r in ranked)
+
+    top = rank(actions, scores, top_k=3)
+    assert [r["score"] for r in top] == [0.5, 0.5, 0.3]
+    assert rank(actions, scores, top_k=1)[0]["action"] in {"b", "d"}
+    assert rank(actions, scores, top_k=10) == ranked
+    assert rank(actions, scores, top_k=0) == []
+
+
+def test_pool_needs_a_replica():
+    with pytest.raises(ValueError):
+        EvaluatorPool([])
+
+
+def test_pool_sends_each_call_to_the_least_busy_replica(ray_cluster):
+    @ray.remote
+    class StubEvaluator:
+        def __init__(self, name, delay):
+            self.name, self.delay = name, delay
+
+        def score_actions(self, actions, goal=None, top_k=None, trace_context=None):
+            time.sleep(self.delay)
+            return {"replica": self.name, "actions": actions, "goal": goal, "top_k": top_k}
+
+    pool = EvaluatorPool([StubEvaluator.remote("r0", 1.0), StubEvaluator.remote("r1", 1.0)])
+    refs = [pool.score_actions([f"a{i}"], goal="g", top_k=2) for i in range(4)]
+    results = ray.get(refs)
+    assert [r["replica"] for r in results] == ["r0", "r1", "r0", "r1"]
+    assert results[2] == {"replica": "r0", "actions": ["a2"], "goal": "g", "top_k": 2}
+    # finished calls no longer count, so an idle pool starts over at the first replica
+    assert ray.get(pool.score_actions(["again"]))["replica"] == "r0"
+
+    pool.score_actions(["busy"])
+    copy = pickle.loads(pickle.dumps(pool))
+    assert copy._outstanding == [[], []]
+    assert ray.get(copy.score_actions(["fresh"]))["replica"] == "r0"
@@ -0,0 +1,120 @@
+import pytest
+
+from src.core.memory import HierarchicalMemory
+from src.core.tiers import BoundedTier, LRUPolicy, RecencyWeightedPolicy, estimate_size
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _evictions(tier):
+    evicted = []
+    tier.on_evict.append(lambda key, value: evicted.append(key))
+    return evicted
+
+
+def _play(tier, pattern, clock=None):
+    """Apply ``pattern``: ("set", key, value), ("get", key) or ("wait", seconds)."""
+    evicted = _evictions(tier)
+    for op, *args in pattern:
+        if op == "set":
+            tier[args[0]] = args[1]
+        elif op == "get":
+            tier[args[0]]
+        else:
+            clock.now += args[0]
+    return evicted
+
+
+def test_lru_evicts_the_least_recently_used():
+    tier = BoundedTier(3, "lru")
+    evicted = _play(tier, [("set", "a", 1), ("set", "b", 2), ("set", "c", 3), ("get", "a"),
+                           ("set", "d", 4), ("get", "c"), ("set", "e", 5)])
+    assert evicted == ["b", "a"]
+    assert sorted(tier) == ["c", "d", "e"]
+    # peek is not an access
+    tier.peek("c")
+    _play(tier, [("get", "d"), ("set", "f", 6)])
+    assert "c" not in tier
+
+
+def test_lfu_evicts_the_least_frequently_used_oldest_first():
+    tier = BoundedTier(3, "lfu")
+    evicted = _play(tier, [("set", "a", 1), ("set", "b", 2), ("set", "c", 3), ("get", "a"), ("get", "a"),
+                           ("get", "c"), ("set", "d", 4), ("set", "e", 5)])
+    assert evicted == ["b", "d"]
+    assert sorted(tier) == ["a", "c", "e"]
+    # removing the only least-used key moves the minimum up
+    del tier["e"]
+    assert tier.policy.victim() == "c"
+    # fresh keys start at one use, so the older of two new keys goes first
+    evicted = _play(tier, [("set", "f", 6), ("set", "g", 7)])
+    assert evicted == ["f"]
+
+
+def test_recency_decay_lets_old_frequent_keys_go():
+    clock = FakeClock()
+    tier = BoundedTier(3, RecencyWeightedPolicy(half_life=1.0, clock=clock))
+    evicted = _play(tier, [("set", "a", 1), ("set", "b", 2), ("set", "c", 3), ("get", "a"),
+                           ("wait", 10.0), ("get", "b"), ("set", "d", 4), ("set", "e", 5)], clock)
+    # a's two accesses have decayed below b's single recent one
+    assert evicted == ["c", "a"]
+    assert sorted(tier) == ["b", "d", "e"]
+
+    # with no time passing it behaves like LFU
+    _play(tier, [("get", "d"), ("get", "d"), ("get", "b")], clock)
+    assert tier.policy.victim() == "e"
+
+
+def test_size_policy_evicts_large_cold_items_first():
+    tier = BoundedTier(3, "size", sizeof=len)
+    evicted = _play(tier, [("set", "big", "x" * 100), ("set", "small", "x"), ("set", "mid", "x" * 10),
+                           ("set", "small2", "x"), ("set", "mid2", "x" * 10)])
+    assert evicted == ["big", "mid"]
+    assert sorted(tier) == ["mid2", "small", "small2"]
+    # the last victim's priority lifts later inserts, so untouched small items age out eventually
+    for i in range(20):
+        tier[f"m{i}"] = "x" * 10
+        tier[f"m{i}"]
+    assert "small" not in tier and "small2" not in tier
+
+
+def test_max_bytes_bounds_the_tier():
+    tier = BoundedTier(100, LRUPolicy(), max_bytes=50, sizeof=len)
+    evicted = _evictions(tier)
+    for key in "abcd":
+        tier[key] = "x" * 20
+        assert tier.total_bytes <= 50
+    assert evicted == ["a", "b"] and tier.total_bytes == 40
+    tier["c"] = "x" * 5
+    assert tier.total_bytes == 25
+    # a single item larger than the budget is kept rather than leaving the tier empty
+    tier["huge"] = "x" * 500
+    assert list(tier) == ["huge"] and tier.total_bytes == 500
+
+
+def test_long_term_memory_honours_its_byte_budget():
+    budget = 4000
+    memory = HierarchicalMemory(capacity={"semantic_memory": 1000}, long_term_bytes=budget)
+    long_term = memory.long_term_memory
+    assert long_term.policy.name == "size" and long_term.max_bytes == budget
+    evicted = _evictions(long_term)
+    for i in range(10):
+        memory.add_to_long_term_memory(f"small{i}", f"fact {i}")
+    memory.add_to_long_term_memory("big", "x" * 2500)
+    assert not evicted
+    memory.add_to_long_term_memory("big2", "y" * 2500)
+    assert evicted == ["big"]
+    assert long_term.total_bytes <= budget
+    assert long_term.total_bytes == sum(estimate_size(v) for v in long_term.values())
+    assert all(f"small{i}" in long_term for i in range(10))
+
+
+def test_unknown_policy_name_is_rejected():
+    with pytest.raises(KeyError):
+        BoundedTier(3, "fifo")
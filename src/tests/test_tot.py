@@ -0,0 +1,138 @@
+import pytest
+
+from src.config import Config
+from src.core.tot import TranspositionTable, TreeOfThoughts
+
+
+def _tree():
+    """
+    r -> a -> a1 -> a11
+      -> b -> b1
+    with a1 also linked under b (a diamond through r -> {a, b} -> a1).
+    """
+    tot = TreeOfThoughts()
+    tot.add_thought("r", thought="root", score=0.0)
+    for node, parent in (("a", "r"), ("b", "r"), ("a1", "a"), ("a11", "a1"), ("b1", "b"), ("a2", "a")):
+        tot.add_thought(node, parent, thought=node, score=float(len(node)))
+    tot.link_thought("b", "a1")
+    return tot
+
+
+def test_pruning_a_subtree_removes_every_descendant():
+    tot = _tree()
+    assert tot.prune_thoughts("b") == 2  # b and b1; a1 keeps its first parent a
+    for node in ("b", "b1"):
+        assert node not in tot and node not in tot.scores and node not in tot.parent
+    assert tot.get_children("r") == ["a"]
+    assert tot.get_parents("a1") == ["a"] and "a1" not in tot.extra_parents
+
+
+def test_shared_node_survives_pruning_of_its_first_parent():
+    tot = _tree()
+    assert tot.prune_thoughts("a") == 2  # a and a2
+    assert "a1" in tot and "a11" in tot
+    assert tot.get_parent("a1") == "b" and tot.get_parents("a1") == ["b"]
+    assert "a" not in tot.thought_tree and "a2" not in tot.scores
+    assert set(tot.thought_tree) == {"r", "b", "a1", "a11", "b1"}
+    assert set(tot.scores) == set(tot.thought_tree)
+
+
+def test_cutting_one_edge_keeps_a_node_with_another_parent():
+    tot = _tree()
+    assert tot.prune_thoughts("a1", parent_id="a") == 0
+    assert tot.get_children("a") == ["a2"]
+    assert tot.get_parents("a1") == ["b"]
+    assert tot.prune_thoughts("a1", parent_id="b") == 2
+    assert "a1" not in tot and "a11" not in tot
+    assert tot.get_children("b") == ["b1"]
+
+
+def test_get_path_after_pruning():
+    tot = _tree()
+    tot.prune_thoughts("a")
+    assert tot.get_path("a11") == ["r", "b", "a1", "a11"]
+    assert tot.get_path("b1") == ["r", "b", "b1"]
+    with pytest.raises(KeyError):
+        tot.get_path("a2")
+
+
+def test_pruning_everything_leaves_an_empty_tree():
+    tot = _tree()
+    assert tot.prune_thoughts("r") == 7
+    assert len(tot) == 0 and not tot.scores and not tot.parent and not tot.extra_parents
+    assert tot.prune_thoughts("r") == 0
+
+
+def test_link_and_add_validation():
+    tot = _tree()
+    with pytest.raises(ValueError):
+        tot.add_thought("a", "r")
+    with pytest.raises(ValueError):
+        tot.add_thought("x", "missing")
+    with pytest.raises(ValueError):
+        tot.link_thought("r", "a11")
+
+
+class CountingStubs:
+    """States are sorted letter strings, so "ab" is reached from both "a" and "b"."""
+
+    def __init__(self):
+        self.expanded = []
+        self.evaluated = []
+
+    def expander(self, states):
+        self.expanded.extend(states)
+        return [["".join(sorted(state + letter)) for letter in "abc" if letter not in state] for state in states]
+
+    def evaluator(self, states):
+        self.evaluated.extend(states)
+        return [float(len(state)) for state in states]
+
+
+def test_equivalent_thoughts_share_one_expansion_and_evaluation():
+    stubs, table = CountingStubs(), TranspositionTable(capacity=100)
+    tot = TreeOfThoughts(stubs.expander, stubs.evaluator, transpositions=table)
+    tot.add_thought("root", thought="")
+    level = [t for ids in tot.expand_thoughts(["root"]) for t in ids]
+    level = list(dict.fromkeys(t for ids in tot.expand_thoughts(level) for t in ids))
+    # "ab", "ac" and "bc", each reached from two parents, exist once and are linked twice
+    assert sorted(tot.thoughts[t] for t in level) == ["ab", "ac", "bc"]
+    assert all(len(tot.get_parents(t)) == 2 for t in level)
+    tot.evaluate_thoughts()
+    assert sorted(stubs.evaluated) == ["", "a", "ab", "ac", "b", "bc", "c"]
+
+    # a second tree sharing the table reuses every cached expansion and score
+    hits = table.hits
+    other = TreeOfThoughts(stubs.expander, stubs.evaluator, transpositions=table)
+    other.add_thought(0, thought="")
+    other.expand_thoughts([0])
+    other.evaluate_thoughts()
+    assert stubs.expanded.count("") == 1
+    assert len(stubs.evaluated) == 7
+    assert table.hits > hits
+
+
+def test_duplicates_in_one_batch_are_evaluated_once():
+    stubs, table = CountingStubs(), TranspositionTable(capacity=100)
+    tot = TreeOfThoughts(stubs.expander, stubs.evaluator, transpositions=table)
+    tot.add_thought("x", thought="ab")
+    tot.add_thought("y", thought="ab")  # same content as a separate root
+    assert tot.evaluate_thoughts(["x", "y"]) == [2.0, 2.0]
+    assert stubs.evaluated == ["ab"]
+
+
+def test_table_evicts_least_recently_used_entries_past_its_capacity():
+    table = TranspositionTable(capacity=3)
+    keys = [table.key(f"state {i}") for i in range(5)]
+    for key in keys[:3]:
+        table.store(key, "score", 1.0)
+    assert table.lookup(keys[0], "score") == 1.0  # keys[0] is now the most recent
+    for key in keys[3:]:
+        table.store(key, "score", 2.0)
+    assert len(table) == 3 and table.evictions == 2
+    assert table.lookup(keys[1], "score") is None and table.lookup(keys[2], "score") is None
+    assert table.lookup(keys[0], "score") == 1.0
+
+
+def test_table_capacity_defaults_to_config():
+    assert TranspositionTable().capacity == Config.TOT_TRANSPOSITION_CAPACITY
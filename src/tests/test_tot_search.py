@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from src.core.tot_search import BeamSearch, BestFirstSearch, MCTSSearch
+
+BRANCHING = 3
+
+
+class Stubs:
+    """Deterministic expander and evaluator over digit strings; every state's score comes from a seeded RNG."""
+
+    def __init__(self, seed=0, depth_bonus=0.0):
+        self.rng = random.Random(seed)
+        self.depth_bonus = depth_bonus
+        self.score_of = {}
+        self.expanded = []  # states in the order they were expanded
+
+    def score(self, state):
+        if state not in self.score_of:
+            self.score_of[state] = self.rng.random() + self.depth_bonus * len(state)
+        return self.score_of[state]
+
+    def expander(self, states):
+        self.expanded.extend(states)
+        return [[state + str(i) for i in range(BRANCHING)] for state in states]
+
+    def evaluator(self, states):
+        return [self.score(state) for state in states]
+
+
+def _depth_counts(tree):
+    counts = {}
+    for thought in tree.thought_tree:
+        counts[tree.depth[thought]] = counts.get(tree.depth[thought], 0) + 1
+    return counts
+
+
+def test_beam_search_keeps_at_most_beam_width_per_depth_and_stops_at_max_depth():
+    stubs = Stubs()
+    result = BeamSearch(stubs.expander, stubs.evaluator, beam_width=2, max_depth=4, pruning_factor=0).search("")
+    counts = _depth_counts(result.tree)
+    assert max(counts) == 4
+    assert all(count <= 2 for depth, count in counts.items() if depth)
+    assert all(len(state) < 4 for state in stubs.expanded)
+    by_depth = {}
+    for state in stubs.expanded:
+        by_depth.setdefault(len(state), []).append(state)
+    assert all(len(states) <= 2 for states in by_depth.values())
+    assert result.score == max(result.tree.scores.values())
+    assert result.path[0] == "" and len(result.path) == len(result.tree.get_path(result.best))
+
+
+def test_beam_search_batches_model_calls():
+    stubs = Stubs()
+    result = BeamSearch(stubs.expander, stubs.evaluator, beam_width=3, max_depth=3, pruning_factor=0).search("")
+    # one expander and one evaluator call per level, plus the root's evaluation
+    assert result.expander_calls == 3 and result.evaluator_calls == 4
+
+
+def test_best_first_expands_in_score_order():
+    stubs = Stubs(seed=1)
+    BestFirstSearch(stubs.expander, stubs.evaluator, max_expansions=12, max_depth=4, pruning_factor=0,
+                    batch_size=1).search("")
+    assert len(stubs.expanded) == 12
+    open_states = {""}
+    for state in stubs.expanded:
+        assert stubs.score(state) == max(stubs.score(s) for s in open_states)
+        open_states.remove(state)
+        if len(state) + 1 < 4:
+            open_states.update(state + str(i) for i in range(BRANCHING))
+
+
+def test_best_first_respects_max_depth():
+    stubs = Stubs(seed=2)
+    result = BestFirstSearch(stubs.expander, stubs.evaluator, max_expansions=1000, max_depth=2,
+                             pruning_factor=0).search("")
+    assert len(result.tree) == 1 + BRANCHING + BRANCHING ** 2
+    assert all(len(state) < 2 for state in stubs.expanded)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_mcts_finds_the_best_leaf(seed):
+    # deeper thoughts score higher, so the best thought overall is a leaf
+    stubs = Stubs(seed, depth_bonus=1.0)
+    result = MCTSSearch(stubs.expander, stubs.evaluator, iterations=60, max_depth=3, pruning_factor=0,
+                        batch_size=4).search("")
+    leaves = {s: stubs.score(s) for s in (f"{a}{b}{c}" for a in "012" for b in "012" for c in "012")}
+    best_leaf = max(leaves, key=leaves.get)
+    assert result.tree.thoughts[result.best] == best_leaf
+    assert result.score == leaves[best_leaf]
+    assert result.path == ["", best_leaf[:1], best_leaf[:2], best_leaf]
+
+
+def test_invalid_pruning_factor():
+    with pytest.raises(ValueError):
+        BeamSearch(None, None, pruning_factor=1.0)
@@ -0,0 +1,102 @@
+import pytest
+
+from src.utils import tracing
+from src.utils.tracing import ChromeTraceExporter, MetricsExporter, SpanExporter, Tracer
+
+
+class ListExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+def _tracer(sample_rate=1.0):
+    exporter = ListExporter()
+    return Tracer(sample_rate, [exporter], batch_size=1), exporter
+
+
+def test_nested_spans_share_the_trace_and_link_to_their_parent():
+    tracer, exporter = _tracer()
+    with tracer.span("root", task=1) as root:
+        with tracer.span("child") as child:
+            pass
+    assert [s.name for s in exporter.spans] == ["child", "root"]
+    assert child.context.trace_id == root.context.trace_id
+    assert child.parent_id == root.context.span_id and root.parent_id is None
+    assert root.attributes == {"task": 1}
+    assert root.duration_ns >= child.duration_ns >= 0
+
+
+def test_errors_are_recorded_and_propagated():
+    tracer, exporter = _tracer()
+    with pytest.raises(KeyError):
+        with tracer.span("failing"):
+            raise KeyError("x")
+    assert exporter.spans[0].attributes["error"] == "KeyError"
+
+
+def test_carrier_continues_a_remote_trace():
+    tracer, exporter = _tracer()
+    carrier = {"trace_id": 42, "span_id": 7, "sampled": True}
+    with tracer.span("remote", parent=carrier):
+        with tracer.span("local"):
+            pass
+    local, remote = exporter.spans
+    assert remote.context.trace_id == local.context.trace_id == 42
+    assert remote.parent_id == 7 and local.parent_id == remote.context.span_id
+
+
+def test_unsampled_traces_record_nothing_and_stay_unsampled():
+    tracer, exporter = _tracer(sample_rate=0.0)
+    with tracer.span("root"):
+        with tracer.span("child"):
+            pass
+    assert exporter.spans == []
+
+
+def test_unsampled_carrier_keeps_remote_children_unsampled():
+    tracer, exporter = _tracer(sample_rate=1.0)
+    with tracer.span("remote", parent={"trace_id": 5, "span_id": 9, "sampled": False}):
+        with tracer.span("child"):
+            pass
+    assert exporter.spans == []
+
+
+def test_disabled_tracer_returns_the_noop_span():
+    tracer = Tracer(enabled=False)
+    assert tracer.span("x") is tracing.NOOP_SPAN
+
+
+def test_inject_and_module_level_configuration():
+    exporter = ListExporter()
+    try:
+        tracing.configure(sample_rate=1.0, exporters=[exporter, MetricsExporter()])
+        assert tracing.inject() is None
+        with tracing.span("outer") as outer:
+            carrier = tracing.inject()
+        assert carrier == {"trace_id": outer.context.trace_id, "span_id": outer.context.span_id, "sampled": True}
+        metrics = tracing.span_metrics()
+        assert metrics.get_metrics_summary()["agents"]["outer"]["count"] == 1
+        assert [s.name for s in exporter.spans] == ["outer"]
+    finally:
+        tracing.configure(enabled=False)
+
+
+def test_chrome_trace_files_merge_into_one(tmp_path):
+    exporter = ChromeTraceExporter(str(tmp_path / "trace-{pid}.json"))
+    tracer = Tracer(1.0, [exporter])
+    with tracer.span("a"):
+        with tracer.span("b"):
+            pass
+    tracer.shutdown()
+    paths = list(tmp_path.glob("trace-*.json"))
+    assert len(paths) == 1
+    events = tracing.read_chrome_trace(str(paths[0]))
+    assert sorted(e["name"] for e in events) == ["a", "b"]
+    assert tracing.merge_chrome_traces([str(p) for p in paths], str(tmp_path / "trace.json")) == 2
+    merged = tracing.read_chrome_trace(str(tmp_path / "trace.json"))
+    b = next(e for e in merged if e["name"] == "b")
+    a = next(e for e in merged if e["name"] == "a")
+    assert b["args"]["parent_id"] == a["args"]["span_id"]
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from src.models.vector_store import VectorStore, top_k_indices
+
+
+def _reference(scores, k):
+    return np.argsort(-scores, axis=-1, kind="stable")[..., :k]
+
+
+@pytest.mark.parametrize("k", [1, 3, 7, 10, 25])
+def test_top_k_matches_argsort(k):
+    scores = np.random.default_rng(k).normal(size=10)
+    np.testing.assert_array_equal(top_k_indices(scores, k), _reference(scores, k))
+    batch = np.random.default_rng(k + 1).normal(size=(4, 10))
+    np.testing.assert_array_equal(top_k_indices(batch, k), _reference(batch, k))
+
+
+def test_top_k_with_zero_or_negative_k_is_empty():
+    scores = np.arange(5.0)
+    for k in (0, -1):
+        assert top_k_indices(scores, k).shape == (0,)
+    assert top_k_indices(np.ones((3, 5)), 0).shape == (3, 0)
+    assert top_k_indices(np.array([]), 3).shape == (0,)
+
+
+def test_top_k_ties():
+    scores = np.array([0.5, 0.9, 0.5, 0.1, 0.9, 0.5])
+    # with k >= n every index is kept and ties stay in index order
+    np.testing.assert_array_equal(top_k_indices(scores, 6), _reference(scores, 6))
+    np.testing.assert_array_equal(top_k_indices(scores, 100), _reference(scores, 6))
+    for k in range(1, 6):
+        rows = top_k_indices(scores, k)
+        # a tie straddling the cut may keep any of the tied rows, but the scores are the k best
+        assert len(set(rows.tolist())) == k
+        np.testing.assert_array_equal(scores[rows], np.sort(scores)[::-1][:k])
+
+
+def test_search_matches_brute_force_cosine():
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(50, 8)) * rng.uniform(0.1, 10.0, size=(50, 1))
+    queries = rng.normal(size=(5, 8)) * 3.0
+    unit = data / np.linalg.norm(data, axis=1, keepdims=True)
+    expected = (queries / np.linalg.norm(queries, axis=1, keepdims=True)) @ unit.T
+    for normalize in (True, False):
+        store = VectorStore(dim=8, initial_capacity=4, normalize=normalize)
+        store.add_many(data)
+        assert len(store) == 50 and store.capacity == 64
+        np.testing.assert_allclose(store.norms, np.linalg.norm(data, axis=1), rtol=1e-5)
+        for query, exact in zip(queries, expected):
+            rows, scores = store.search(query, top_k=5)
+            np.testing.assert_array_equal(rows, _reference(exact, 5))
+            np.testing.assert_allclose(scores, exact[rows], atol=1e-5)
+        rows, scores = store.search_many(queries, top_k=5)
+        np.testing.assert_array_equal(rows, _reference(expected, 5))
+        np.testing.assert_allclose(scores, np.take_along_axis(expected, rows, axis=1), atol=1e-5)
+
+
+def test_remove_moves_the_last_row_and_its_record():
+    rng = np.random.default_rng(1)
+    data = rng.normal(size=(5, 4)).astype(np.float32)
+    store = VectorStore(dim=4, normalize=False)
+    store.add_many(data, records=list("abcde"))
+
+    assert store.remove(1) == 4
+    assert store.records == list("aecd") and len(store) == 4
+    np.testing.assert_array_equal(store.get(1), data[4])
+    assert store.norms[1] == pytest.approx(np.linalg.norm(data[4]))
+    rows, _ = store.search(data[4], top_k=1)
+    assert store.records[rows[0]] == "e"
+
+    assert store.remove(3) is None
+    assert store.records == list("aec")
+    np.testing.assert_array_equal(store.vectors, data[[0, 4, 2]])
+    np.testing.assert_array_equal(store.live_rows(), [0, 1, 2])
+    assert not store.maybe_compact()
+    with pytest.raises(IndexError):
+        store.remove(3)
+
+
+def test_rejects_wrong_dimension_and_out_of_range_rows():
+    store = VectorStore(dim=3)
+    with pytest.raises(ValueError):
+        store.add([1.0, 2.0])
+    store.add([1.0, 0.0, 0.0], "x")
+    with pytest.raises(IndexError):
+        store.set(1, [0.0, 1.0, 0.0])
+    store.set(0, [0.0, 2.0, 0.0])
+    np.testing.assert_allclose(store.get(0), [0.0, 1.0, 0.0], atol=1e-6)
@@ -0,0 +1,124 @@
+import os
+
+import pytest
+
+from src.agents.archivist import Archivist
+from src.core.memory import HierarchicalMemory
+from src.core.wal import DurableLog
+
+
+def _log(path, **options):
+    return DurableLog(str(path), sync_interval=0, background=False, **options)
+
+
+def test_replay_returns_records_in_order_across_restarts(tmp_path):
+    with _log(tmp_path) as log:
+        assert [log.append({"n": i}) for i in range(3)] == [1, 2, 3]
+    with _log(tmp_path) as log:
+        assert log.last_lsn == 3
+        log.append({"n": 3})
+        assert [r["n"] for r in log.replay()] == [0, 1, 2, 3]
+
+
+def test_torn_tail_is_truncated_on_open(tmp_path):
+    with _log(tmp_path) as log:
+        for i in range(3):
+            log.append({"n": i})
+    path = sorted(p for p in os.listdir(tmp_path) if p.startswith("wal."))[-1]
+    with open(tmp_path / path, "r+b") as f:
+        f.truncate(os.path.getsize(tmp_path / path) - 3)
+    with _log(tmp_path) as log:
+        assert [r["n"] for r in log.replay()] == [0, 1]
+        assert log.append({"n": 9}) == 3
+        assert [r["n"] for r in log.replay()] == [0, 1, 9]
+
+
+def test_compaction_moves_the_log_into_segments(tmp_path):
+    with _log(tmp_path) as log:
+        for i in range(5):
+            log.append({"n": i})
+        assert log.compact() == 5
+        log.append({"n": 5})
+        assert log.compacted_lsn == 5
+        assert len(log.segments) == 1
+    with _log(tmp_path) as log:
+        assert [r["n"] for r in log.replay()] == [0, 1, 2, 3, 4, 5]
+
+
+def test_merge_applies_the_reducer(tmp_path):
+    def latest_only(records):
+        last = {}
+        for record in records:
+            last[record["k"]] = record
+        return last.values()
+
+    with _log(tmp_path, max_segments=2, reducer=latest_only) as log:
+        for i in range(3):
+            log.append({"k": "a", "v": i})
+            log.append({"k": f"b{i}", "v": i})
+            log.compact()
+        assert len(log.segments) == 1
+    with _log(tmp_path) as log:
+        assert sorted((r["k"], r["v"]) for r in log.replay()) == [("a", 2), ("b0", 0), ("b1", 1), ("b2", 2)]
+
+
+def test_closed_log_rejects_appends(tmp_path):
+    log = _log(tmp_path)
+    log.close()
+    with pytest.raises(ValueError):
+        log.append({})
+
+
+def test_archivist_recovers_episodes_traces_and_clears(tmp_path):
+    options = dict(path=str(tmp_path), max_episodes=None, retention_seconds=None, sync_interval=0)
+    archivist = Archivist(**options)
+    archivist.store_experience({"step": 0}, timestamp=1.0, tags={"a"})
+    archivist.clear_memory()
+    archivist.store_experience({"step": 1}, timestamp=2.0, tags={"a"})
+    archivist.store_experience({"step": 2}, timestamp=3.0)
+    archivist.store_semantic_trace("goal", "explore")
+    archivist.close()
+
+    recovered = Archivist(**options)
+    assert [(i, e["step"]) for i, e in recovered.retrieve_experiences()] == [(1, 1), (2, 2)]
+    assert [i for i, _ in recovered.retrieve_experiences(tags={"a"})] == [1]
+    assert recovered.retrieve_semantic_trace("goal") == "explore"
+    assert recovered.store_experience({"step": 3}) == 3
+    recovered.close()
+
+
+def test_archivist_recovers_after_compaction(tmp_path):
+    options = dict(path=str(tmp_path), max_episodes=None, retention_seconds=None, sync_interval=0,
+                   background=False, max_segments=1)
+    archivist = Archivist(**options)
+    for i in range(4):
+        archivist.store_experience(i, timestamp=float(i))
+        archivist.store_semantic_trace("k", i)
+        archivist._log.compact()
+    archivist.close()
+
+    recovered = Archivist(**options)
+    assert [e for _, e in recovered.retrieve_experiences()] == [0, 1, 2, 3]
+    assert recovered.retrieve_semantic_trace("k") == 3
+    recovered.close()
+
+
+def test_hierarchical_memory_recovers_tiers_without_re_evicting(tmp_path):
+    capacity = {"working_memory": 2, "episodic_memory": 2}
+    memory = HierarchicalMemory(capacity=capacity, path=str(tmp_path), sync_interval=0)
+    for i in range(6):
+        memory.working_memory[f"k{i}"] = i
+    memory.update_meta_memory("agent", 0.9)
+    memory.add_to_sensory_buffer("ping")
+    expected = {tier: dict(getattr(memory, tier).items())
+                for tier in ("working_memory", "episodic_memory", "long_term_memory")}
+    memory.close()
+
+    recovered = HierarchicalMemory(capacity=capacity, path=str(tmp_path), sync_interval=0)
+    for tier, items in expected.items():
+        assert dict(getattr(recovered, tier).items()) == items
+    assert dict(recovered.meta_memory) == {"agent": 0.9}
+    assert list(recovered.sensory_buffer) == ["ping"]
+    next_id = max(expected["episodic_memory"]) + 1
+    assert recovered.add_to_episodic_memory("x") >= next_id
+    recovered.close()
@@ -1,22 +1,351 @@
-class Metrics:
+import math
+import time
+from collections import deque
+
+from ..config import Config
+
+
+class RunningStats:
+    """Count, mean and variance (Welford's algorithm) plus min/max, in constant memory."""
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
     def __init__(self):
-        self.performance_data = []
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Fold ``other`` into this one (Chan et al.'s parallel update); returns self."""
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.mean, self.m2, self.min, self.max = other.count, other.mean, other.m2, other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+    def to_dict(self):
+        empty = not self.count
+        return {"count": self.count, "mean": self.mean, "stddev": self.stddev,
+                "min": None if empty else self.min, "max": None if empty else self.max}
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative error guarantees (DDSketch).
+
+    A nonzero value ``x`` is counted in the logarithmic bucket
+    ``ceil(log_gamma |x|)`` with ``gamma = (1 + a) / (1 - a)``; positive and
+    negative values have separate, mirrored bucket stores. A quantile that
+    falls on a nonzero sample is returned within a relative error ``a`` of it,
+    with its sign. Magnitudes up to ``MIN_VALUE`` are counted as exact zeros,
+    so there the error is absolute (at most ``MIN_VALUE``) instead. Sketches
+    with the same accuracy merge by adding bucket counts. Past ``max_buckets``
+    the buckets of a store nearest zero are collapsed, which only loses
+    accuracy for the smallest magnitudes.
+    """
+
+    __slots__ = ("relative_accuracy", "gamma", "_log_gamma", "max_buckets", "positive", "negative", "zeros",
+                 "count", "min", "max")
+
+    MIN_VALUE = 1e-9  # magnitudes below this count as zero
+
+    def __init__(self, relative_accuracy=None, max_buckets=2048):
+        """
+        Args:
+            relative_accuracy: Relative error bound; defaults to ``Config.METRICS_SKETCH_ACCURACY``.
+            max_buckets: Bucket limit per sign.
+        """
+        a = Config.METRICS_SKETCH_ACCURACY if relative_accuracy is None else relative_accuracy
+        if not 0 < a < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1.")
+        self.relative_accuracy = a
+        self.gamma = (1 + a) / (1 - a)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _key(self, magnitude):
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value, count=1):
+        if value > self.MIN_VALUE:
+            store = self.positive
+            key = self._key(value)
+        elif value < -self.MIN_VALUE:
+            store = self.negative
+            key = self._key(-value)
+        else:
+            self.zeros += count
+            store = None
+        if store is not None:
+            store[key] = store.get(key, 0) + count
+            if len(store) > self.max_buckets:
+                self._collapse(store)
+        self.count += count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def _collapse(self, store):
+        # for positives the lowest keys are the smallest values; for negatives the smallest magnitudes
+        keys = sorted(store)
+        excess = keys[: len(keys) - self.max_buckets + 1]
+        target = keys[len(excess)]
+        store[target] += sum(store.pop(k) for k in excess)
+
+    def merge(self, other):
+        """Fold ``other`` (same accuracy) into this sketch; returns self."""
+        if other.gamma != self.gamma:
+            raise ValueError("Only sketches with the same relative accuracy can be merged.")
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, n in theirs.items():
+                mine[key] = mine.get(key, 0) + n
+            if len(mine) > self.max_buckets:
+                self._collapse(mine)
+        self.zeros += other.zeros
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Approximate ``q``-quantile (0 <= q <= 1), or None if the sketch is empty."""
+        if not self.count:
+            return None
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1.")
+        if q == 0 or q == 1:
+            return self.min if q == 0 else self.max
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return max(self.min, -self._value(key))
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return min(self.max, self._value(key))
+        return self.max
+
+    def quantiles(self, qs):
+        return {q: self.quantile(q) for q in qs}
+
+
+class _Aggregate:
+    """Running stats and a quantile sketch over the same samples."""
+
+    __slots__ = ("stats", "sketch")
+
+    def __init__(self, relative_accuracy=None):
+        self.stats = RunningStats()
+        self.sketch = QuantileSketch(relative_accuracy)
 
-    def record_performance(self, agent_id, metric_value):
-        self.performance_data.append({'agent_id': agent_id, 'metric_value': metric_value})
+    def add(self, value):
+        self.stats.add(value)
+        self.sketch.add(value)
+
+    def merge(self, other):
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def to_dict(self, quantiles):
+        summary = self.stats.to_dict()
+        for q in quantiles:
+            summary[f"p{round(q * 100):d}"] = self.sketch.quantile(q)
+        return summary
+
+
+class SlidingWindow:
+    """
+    Aggregates over the last ``seconds``, kept as ``slices`` time slices.
+
+    Each slice holds its own stats and sketch; a slice is dropped as soon as
+    its start falls out of the window, so memory is bounded by the slice count
+    and the window moves in steps of ``seconds / slices``: it covers between
+    ``seconds - seconds / slices`` and ``seconds``, never more.
+    """
+
+    __slots__ = ("seconds", "width", "relative_accuracy", "_slices")
+
+    def __init__(self, seconds, slices=6, relative_accuracy=None):
+        if seconds <= 0 or slices < 1:
+            raise ValueError("seconds must be positive and slices at least 1.")
+        self.seconds = seconds
+        self.width = seconds / slices
+        self.relative_accuracy = relative_accuracy
+        self._slices = deque()  # (slice start, _Aggregate), oldest first
+
+    def _expire(self, now):
+        while self._slices and self._slices[0][0] < now - self.seconds:
+            self._slices.popleft()
+
+    def _slice(self, start):
+        if self._slices and self._slices[-1][0] == start:
+            return self._slices[-1][1]
+        aggregate = _Aggregate(self.relative_accuracy)
+        if not self._slices or self._slices[-1][0] < start:
+            self._slices.append((start, aggregate))
+        else:
+            # a late sample or a merged slice: keep the slices ordered by start
+            for i, (existing, agg) in enumerate(self._slices):
+                if existing == start:
+                    return agg
+                if existing > start:
+                    self._slices.insert(i, (start, aggregate))
+                    break
+        return aggregate
+
+    def add(self, value, now):
+        start = math.floor(now / self.width) * self.width
+        if start < now - self.seconds:
+            return
+        self._slice(start).add(value)
+        self._expire(now)
+
+    def merge(self, other):
+        if other.width != self.width:
+            raise ValueError("Only windows with the same slice width can be merged.")
+        for start, aggregate in other._slices:
+            self._slice(start).merge(aggregate)
+        return self
+
+    def aggregate(self, now):
+        """Merged stats and sketch of the slices still inside the window at ``now``."""
+        self._expire(now)
+        total = _Aggregate(self.relative_accuracy)
+        for _, aggregate in self._slices:
+            total.merge(aggregate)
+        return total
+
+
+class AgentMetrics:
+    """All-time and sliding-window aggregates for one agent."""
+
+    __slots__ = ("total", "window")
+
+    def __init__(self, window_seconds=None, relative_accuracy=None):
+        self.total = _Aggregate(relative_accuracy)
+        self.window = SlidingWindow(window_seconds, relative_accuracy=relative_accuracy) if window_seconds else None
+
+    def add(self, value, now):
+        self.total.add(value)
+        if self.window is not None:
+            self.window.add(value, now)
+
+    def merge(self, other):
+        self.total.merge(other.total)
+        if self.window is not None and other.window is not None:
+            self.window.merge(other.window)
+        return self
+
+    def summary(self, now, quantiles):
+        summary = self.total.to_dict(quantiles)
+        if self.window is not None:
+            summary["window"] = {"seconds": self.window.seconds, **self.window.aggregate(now).to_dict(quantiles)}
+        return summary
+
+
+class Metrics:
+    """
+    Streaming performance metrics per agent.
+
+    Each sample updates constant-size aggregates: count, mean and variance,
+    min/max, a quantile sketch for percentiles and, optionally, the same over
+    a sliding time window. Nothing grows with the number of samples, and
+    instances from different processes (e.g. Ray actors) combine with
+    ``merge``.
+    """
+
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, window_seconds=None, relative_accuracy=None, clock=time.time):
+        """
+        Args:
+            window_seconds: Length of the sliding window; defaults to
+                ``Config.METRICS_WINDOW_SECONDS``. 0 disables windows.
+            relative_accuracy: Percentile accuracy; defaults to ``Config.METRICS_SKETCH_ACCURACY``.
+            clock: Time source for the sliding windows.
+        """
+        self.window_seconds = Config.METRICS_WINDOW_SECONDS if window_seconds is None else window_seconds
+        self.relative_accuracy = relative_accuracy
+        self.clock = clock
+        self.reset_metrics()
+
+    def _new_agent(self):
+        return AgentMetrics(self.window_seconds, self.relative_accuracy)
+
+    def record_performance(self, agent_id, metric_value, timestamp=None):
+        now = self.clock() if timestamp is None else timestamp
+        agent = self.agents.get(agent_id)
+        if agent is None:
+            agent = self.agents[agent_id] = self._new_agent()
+        agent.add(metric_value, now)
+        self.overall.add(metric_value, now)
 
     def calculate_average_performance(self):
-        if not self.performance_data:
-            return 0
-        total = sum(entry['metric_value'] for entry in self.performance_data)
-        return total / len(self.performance_data)
+        return self.overall.total.stats.mean if self.overall.total.stats.count else 0
 
     def reset_metrics(self):
-        self.performance_data = []
+        self.agents = {}
+        self.overall = self._new_agent()
+
+    def merge(self, other):
+        """Fold in the metrics of another instance (same window and accuracy); returns self."""
+        for agent_id, agent in other.agents.items():
+            mine = self.agents.get(agent_id)
+            if mine is None:
+                mine = self.agents[agent_id] = self._new_agent()
+            mine.merge(agent)
+        self.overall.merge(other.overall)
+        return self
 
     def get_metrics_summary(self):
+        now = self.clock()
         return {
-            'total_agents': len(set(entry['agent_id'] for entry in self.performance_data)),
+            'total_agents': len(self.agents),
             'average_performance': self.calculate_average_performance(),
-            'raw_data': self.performance_data
-        }
\ No newline at end of file
+            'overall': self.overall.summary(now, self.QUANTILES),
+            'agents': {agent_id: agent.summary(now, self.QUANTILES) for agent_id, agent in self.agents.items()},
+        }
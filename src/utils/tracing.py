@@ -0,0 +1,372 @@
+"""
+Low-overhead tracing of nested spans, within a process and across Ray calls.
+
+    from src.utils import tracing
+    tracing.configure(sample_rate=0.1, exporters=[tracing.ChromeTraceExporter("trace-{pid}.json")])
+    with tracing.span("plan", steps=3):
+        with tracing.span("expand"):
+            ...
+
+The current span lives in a ``contextvars`` variable, so nesting follows
+threads and asyncio tasks. To continue a trace in another process, pass
+``tracing.inject()`` along with the call and open the remote span with
+``tracing.span(name, parent=carrier)``. Sampling is decided once per trace,
+at its root. Timings use ``perf_counter_ns``. Tracing is off until
+``configure`` (or ``configure_from_env``) is called; while it is off, or a
+trace is not sampled, ``span`` returns a shared no-op object.
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+
+from ..config import Config
+from .metrics import Metrics
+
+# perf_counter_ns is monotonic but has an arbitrary origin; this offset places spans on the wall clock
+_WALL_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+_current = contextvars.ContextVar("current_span", default=None)
+
+
+class SpanContext:
+    """Identity of a span, as propagated to children: trace id, span id and the sampling decision."""
+
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id, span_id, sampled):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    def to_carrier(self):
+        return {"trace_id": self.trace_id, "span_id": self.span_id, "sampled": self.sampled}
+
+    @classmethod
+    def from_carrier(cls, carrier):
+        return cls(carrier["trace_id"], carrier["span_id"], carrier["sampled"])
+
+
+class Span:
+    """A timed operation; used as a context manager that makes it the current span."""
+
+    __slots__ = ("tracer", "name", "context", "parent_id", "attributes", "start_ns", "end_ns", "pid", "thread_id",
+                 "_token")
+
+    def __init__(self, tracer, name, context, parent_id, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = self.end_ns = 0
+        self.pid = os.getpid()
+        self.thread_id = threading.get_ident()
+        self._token = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    @property
+    def duration_ns(self):
+        return self.end_ns - self.start_ns
+
+    @property
+    def wall_start_ns(self):
+        return self.start_ns + _WALL_OFFSET_NS
+
+    def __enter__(self):
+        self._token = _current.set(self.context)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.perf_counter_ns()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.tracer._finish(self)
+        return False
+
+
+class _UnsampledSpan:
+    """Carries a not-sampled decision to child spans without recording anything."""
+
+    __slots__ = ("context", "_token")
+
+    def __init__(self, context):
+        self.context = context
+
+    def set_attribute(self, key, value):
+        pass
+
+    def __enter__(self):
+        self._token = _current.set(self.context)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set_attribute(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _new_id():
+    return random.getrandbits(63) or 1
+
+
+class SpanExporter:
+    def export(self, spans):
+        """Receive a batch of finished spans."""
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def flush(self):
+        pass
+
+    def shutdown(self):
+        self.flush()
+
+
+class ChromeTraceExporter(SpanExporter):
+    """
+    Appends spans to a file in the Chrome trace event format (complete ``"X"``
+    events), viewable in Perfetto or ``chrome://tracing``.
+
+    The file is written in the format's JSON-array form without the closing
+    bracket, which viewers accept, so events can be appended as they come. A
+    ``{pid}`` in ``path`` gives every process its own file; ``merge_chrome_traces``
+    combines them into one.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._pid = None
+
+    def _open(self):
+        pid = os.getpid()
+        if self._file is None or self._pid != pid:
+            path = self.path.format(pid=pid)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(path, "a")
+            self._pid = pid
+            if self._file.tell() == 0:
+                self._file.write("[\n")
+        return self._file
+
+    @staticmethod
+    def to_event(span):
+        args = {"trace_id": f"{span.context.trace_id:016x}", "span_id": f"{span.context.span_id:016x}"}
+        if span.parent_id is not None:
+            args["parent_id"] = f"{span.parent_id:016x}"
+        args.update(span.attributes)
+        return {"name": span.name, "cat": "span", "ph": "X", "ts": span.wall_start_ns / 1000,
+                "dur": span.duration_ns / 1000, "pid": span.pid, "tid": span.thread_id, "args": args}
+
+    def export(self, spans):
+        f = self._open()
+        f.write("".join(json.dumps(self.to_event(s), default=str) + ",\n" for s in spans))
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def shutdown(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_chrome_trace(path):
+    """Events of a trace file written by ``ChromeTraceExporter`` (or any complete trace JSON)."""
+    with open(path) as f:
+        text = f.read().strip()
+    if not text:
+        return []
+    if text.startswith("[") and not text.endswith("]"):
+        text = text.rstrip(",") + "]"
+    data = json.loads(text)
+    return data["traceEvents"] if isinstance(data, dict) else data
+
+
+def merge_chrome_traces(paths, out_path):
+    """Combine per-process trace files into one complete trace file; returns the event count."""
+    events = [event for path in paths for event in read_chrome_trace(path)]
+    events.sort(key=lambda e: e.get("ts", 0))
+    with open(out_path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return len(events)
+
+
+class MetricsExporter(SpanExporter):
+    """Feeds span durations (in ms) into a ``Metrics``, one series per span name."""
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics if metrics is not None else Metrics()
+
+    def export(self, spans):
+        record = self.metrics.record_performance
+        for span in spans:
+            record(span.name, span.duration_ns / 1e6, timestamp=(span.end_ns + _WALL_OFFSET_NS) / 1e9)
+
+
+class Tracer:
+    """
+    Creates spans, applies sampling and hands finished spans to the exporters
+    in batches (every ``batch_size`` spans or ``flush_interval`` seconds).
+    """
+
+    def __init__(self, sample_rate=None, exporters=(), enabled=True, batch_size=256, flush_interval=1.0):
+        """
+        Args:
+            sample_rate: Fraction of traces recorded; defaults to ``Config.TRACE_SAMPLE_RATE``.
+            exporters: ``SpanExporter`` instances receiving finished spans.
+            enabled: When False, ``span`` always returns the no-op span.
+        """
+        self.sample_rate = Config.TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+        if not 0 <= self.sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1.")
+        self.exporters = list(exporters)
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_export = time.monotonic()
+
+    def span(self, name, parent=None, **attributes):
+        """
+        Open a span under ``parent`` (a carrier from ``inject``), or else under
+        the current span, or else as the root of a new trace.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        remote = parent is not None
+        if remote:
+            parent = SpanContext.from_carrier(parent)
+        else:
+            parent = _current.get()
+        if parent is None:
+            trace_id, parent_id = _new_id(), None
+            sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        else:
+            trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+        if not sampled:
+            # the root of an unsampled trace, or its first span in a new process, makes the
+            # decision current so that children see it and skip; local children need nothing
+            if parent is None:
+                return _UnsampledSpan(SpanContext(trace_id, None, False))
+            return _UnsampledSpan(parent) if remote else NOOP_SPAN
+        return Span(self, name, SpanContext(trace_id, _new_id(), True), parent_id, attributes)
+
+    def _finish(self, span):
+        with self._lock:
+            self._buffer.append(span)
+            if len(self._buffer) < self.batch_size and time.monotonic() - self._last_export < self.flush_interval:
+                return
+            batch, self._buffer = self._buffer, []
+            self._last_export = time.monotonic()
+        self._export(batch)
+
+    def _export(self, batch):
+        for exporter in self.exporters:
+            exporter.export(batch)
+
+    def flush(self):
+        """Export buffered spans and flush every exporter."""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+            self._last_export = time.monotonic()
+        if batch:
+            self._export(batch)
+        for exporter in self.exporters:
+            exporter.flush()
+
+    def shutdown(self):
+        self.flush()
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+
+_tracer = Tracer(enabled=False)
+
+
+def get_tracer():
+    return _tracer
+
+
+def configure(sample_rate=None, exporters=(), enabled=True, **options):
+    """Install a new process-wide tracer (shutting down the previous one) and return it."""
+    global _tracer
+    previous, _tracer = _tracer, Tracer(sample_rate, exporters, enabled, **options)
+    previous.shutdown()
+    return _tracer
+
+
+def configure_from_env():
+    """
+    Enable tracing from environment variables, as set for Ray workers by
+    ``init_ray``: ``COGNITION_TRACE_FILE`` (a Chrome trace path, may contain
+    ``{pid}``), ``COGNITION_TRACE_METRICS`` (``1`` to aggregate span durations
+    into ``Metrics``) and ``COGNITION_TRACE_SAMPLE_RATE``. Does nothing if
+    neither exporter is requested.
+    """
+    exporters = []
+    path = os.environ.get("COGNITION_TRACE_FILE")
+    if path:
+        exporters.append(ChromeTraceExporter(path))
+    if os.environ.get("COGNITION_TRACE_METRICS") == "1":
+        exporters.append(MetricsExporter())
+    if not exporters:
+        return _tracer
+    rate = os.environ.get("COGNITION_TRACE_SAMPLE_RATE")
+    return configure(float(rate) if rate else None, exporters)
+
+
+def span(name, parent=None, **attributes):
+    """Open a span with the process-wide tracer; see ``Tracer.span``."""
+    return _tracer.span(name, parent, **attributes)
+
+
+def inject():
+    """Carrier for the current span, to pass along with a remote call; None outside a trace."""
+    context = _current.get()
+    return None if context is None else context.to_carrier()
+
+
+def flush():
+    _tracer.flush()
+
+
+def span_metrics():
+    """
+    Flush, then return the ``Metrics`` of the tracer's ``MetricsExporter``
+    (None if it has none). Metrics from several processes combine with ``merge``.
+    """
+    _tracer.flush()
+    for exporter in _tracer.exporters:
+        if isinstance(exporter, MetricsExporter):
+            return exporter.metrics
+    return None
+
+
+atexit.register(lambda: _tracer.shutdown())